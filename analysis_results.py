@@ -0,0 +1,250 @@
+"""
+Analysis Results
+Slotted result objects for the analyzers: LLM output is validated once when the result is
+built, constant fallback content is shared between responses, and the app's JSON provider
+serializes results without copying them into intermediate dicts first
+"""
+from json_extract import extract_json, json_schema, NUMBER
+from wire_schema import ATS_WIRE, SKILL_GAP_WIRE, CAREER_PATH_WIRE, INTERVIEW_WIRE, compact_wire
+
+
+class FrozenDict(dict):
+    """
+    Read-only dict for fallback fragments shared by every response
+
+    It stays a dict subclass so the C JSON encoder serializes it directly.
+    """
+
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Shared fallback fragments are read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+
+def freeze(value):
+    """
+    Recursively turn dicts into FrozenDicts and lists into tuples
+
+    Args:
+        value: JSON-style constant
+
+    Returns:
+        The same data, immutable and safe to share between responses
+    """
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+# Derived once per result type, field selection and wire format
+_response_schemas = {}
+
+
+def _schema_fields(schema):
+    """Field names declared by a json_extract schema, required ones first"""
+    return tuple(schema['required']) + tuple(schema['defaults'])
+
+
+class AnalysisResult:
+    """
+    Base class for analyzer results
+
+    FIELDS are what the client receives; other slots (method, ...) are metadata the
+    route handlers put next to the analysis in the response.
+    """
+
+    __slots__ = ('method',)
+
+    SCHEMA = {'required': {}, 'defaults': {}}
+    FIELDS = ()
+    # Fields left out of the response while they are None
+    OPTIONAL = ()
+    # Frozen copies of the schema defaults, used for fields a fallback does not set
+    DEFAULTS = FrozenDict()
+    # Compact reply format the analyzer's prompt asks for (see wire_schema.py)
+    WIRE = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.DEFAULTS = freeze(cls.SCHEMA['defaults'])
+
+    def __init__(self, method='ai', **fields):
+        self.method = method
+        defaults = self.DEFAULTS
+        for name in self.FIELDS:
+            setattr(self, name, fields.get(name, defaults.get(name)))
+
+    @classmethod
+    def from_llm(cls, text, name):
+        """
+        Build a result from a Gemini reply, validated against the class schema
+
+        Args:
+            text (str): Raw model output
+            name (str): Calling feature, used for metrics
+
+        Raises:
+            JSONExtractionError: If the reply has no usable JSON or misses required fields
+        """
+        value = extract_json(text, cls.SCHEMA, name=name, transform=cls.WIRE and cls.WIRE.expand)
+        # Only declared fields are kept, so extra keys the model invents are not sent on
+        fields = {key: value[key] for key in cls.SCHEMA['required']}
+        fields.update((key, value[key]) for key in cls.SCHEMA['defaults'])
+        return cls(**fields)
+
+    @classmethod
+    def response_schema(cls, names=None, required=None):
+        """
+        JSON Schema for a structured-output request that returns this result
+
+        Args:
+            names (iterable): Top-level fields to request (default: all)
+            required (iterable): Fields the reply must contain (default: the schema's
+                required fields among names)
+
+        Returns:
+            dict: Schema in the wire format the prompt asks for
+        """
+        names = tuple(names) if names is not None else None
+        if required is None:
+            required = [key for key in cls.SCHEMA['required'] if names is None or key in names]
+        key = (cls, compact_wire(), names, tuple(required))
+        schema = _response_schemas.get(key)
+        if schema is None:
+            if cls.WIRE:
+                schema = cls.WIRE.json_schema(names, required)
+            else:
+                schema = json_schema(cls.SCHEMA)
+            _response_schemas[key] = schema
+        return schema
+
+    def to_json(self):
+        """
+        Returns:
+            dict: The fields sent to the client (values are not copied)
+        """
+        payload = {}
+        for name in self.FIELDS:
+            value = getattr(self, name)
+            if value is not None or name not in self.OPTIONAL:
+                payload[name] = value
+        return payload
+
+    def __repr__(self):
+        return f"{type(self).__name__}(method={self.method!r})"
+
+
+class ATSResult(AnalysisResult):
+    """ATS compatibility score and recommendations"""
+
+    SCHEMA = {
+        'required': {
+            'overall_score': NUMBER,
+            'category_scores': dict,
+            'strengths': list,
+            'improvements': list
+        },
+        'defaults': {
+            'missing_keywords': [],
+            'ats_friendly_rating': ''
+        }
+    }
+    FIELDS = _schema_fields(SCHEMA) + ('keyword_match',)
+    OPTIONAL = ('keyword_match',)
+    WIRE = ATS_WIRE
+    __slots__ = FIELDS
+
+
+class SkillGapResult(AnalysisResult):
+    """Matching and missing skills with learning recommendations"""
+
+    SCHEMA = {
+        'required': {'matching_skills': list, 'missing_skills': list},
+        'defaults': {
+            'partially_matched_skills': [],
+            'skill_gap_score': 0,
+            'recommendations': [],
+            'learning_resources': [],
+            'experience_gap': {},
+            'summary': ''
+        }
+    }
+    FIELDS = _schema_fields(SCHEMA)
+    WIRE = SKILL_GAP_WIRE
+    __slots__ = FIELDS
+
+
+class CareerPathResult(AnalysisResult):
+    """Next roles, skill roadmap and year-by-year career timeline"""
+
+    SCHEMA = {
+        'required': {'current_level': str, 'next_role_suggestions': list},
+        'defaults': {
+            'skill_roadmap': {},
+            'industry_trends': {},
+            'career_timeline': {},
+            'alternative_paths': [],
+            'certifications': [],
+            'networking_strategy': {},
+            'summary': ''
+        }
+    }
+    FIELDS = _schema_fields(SCHEMA)
+    WIRE = CAREER_PATH_WIRE
+    __slots__ = FIELDS
+
+
+QUESTION_CATEGORIES = ('technical_questions', 'behavioral_questions', 'experience_based_questions',
+                       'company_culture_questions', 'situational_questions', 'weakness_questions')
+
+
+class InterviewQuestionsResult(AnalysisResult):
+    """Interview questions by category, with strategy and scorecard"""
+
+    SCHEMA = {
+        'required': {'technical_questions': list, 'behavioral_questions': list},
+        'defaults': {
+            'experience_based_questions': [],
+            'company_culture_questions': [],
+            'situational_questions': [],
+            'weakness_questions': [],
+            'questions_to_ask_interviewer': [],
+            'overall_strategy': {}
+        }
+    }
+    FIELDS = _schema_fields(SCHEMA) + ('mock_interview_scorecard',)
+    OPTIONAL = ('mock_interview_scorecard',)
+    WIRE = INTERVIEW_WIRE
+    __slots__ = FIELDS + ('personalization_level', 'note', 'bank_questions')
+
+    def __init__(self, method='ai_powered', personalization_level='high', note=None, bank_questions=0, **fields):
+        super().__init__(method, **fields)
+        self.personalization_level = personalization_level
+        self.note = note
+        # How many of the questions came from the local question bank
+        self.bank_questions = bank_questions
+
+    @property
+    def total_questions(self):
+        """Number of questions across the answerable categories"""
+        return sum(len(getattr(self, name) or ()) for name in QUESTION_CATEGORIES)
+
+    @property
+    def bank_fill_ratio(self):
+        """Share of the questions served from the question bank instead of generated"""
+        total = self.total_questions
+        return round(self.bank_questions / total, 2) if total else 0.0
@@ -1,20 +1,98 @@
-from flask import Flask, render_template, request, send_file, jsonify
-import os
+from flask import Flask, Response, render_template, request, send_file, jsonify, g, stream_with_context
+import asyncio
+import contextvars
+import functools
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from resume_generator import ResumeGenerator
 from linkedin_parser import LinkedInParser
 from cover_letter_generator import CoverLetterGenerator
 from ats_analyzer import ATSAnalyzer
-from skill_gap_analyzer import SkillGapAnalyzer
+from skill_gap_analyzer import SkillGapAnalyzer, SKILL_GAP_BATCH_MAX, SKILL_GAP_BATCH_AI_TOP
 from linkedin_url_scraper import LinkedInURLScraper
-from career_path_advisor import CareerPathAdvisor
+from career_path_advisor import CareerPathAdvisor, get_career_plans, EXPANDABLE_SECTIONS
 from interview_question_generator import InterviewQuestionGenerator
+from prompt_builder import get_prompt_stats
+from json_extract import get_extract_stats
+from llm_client import get_llm_client
+from key_pool import get_key_pool
+from llm_scheduler import get_llm_scheduler, set_llm_context, reset_llm_context, PRIORITY_HEADER, TENANT_HEADER
+from instrumentation import start_request, end_request, render_metrics
+from profiling import profile_requested, RequestProfiler, PROFILE_HEADER, PROFILE_ID_HEADER
+from json_provider import FastJSONProvider
+from storage import get_storage
+from jd_cache import get_jd_cache
+from upgrades import get_upgrade_store, wants_instant, sse_message, SSE_KEEPALIVE, UPGRADE_KEEPALIVE
 
 app = Flask(__name__)
-app.config['UPLOAD_FOLDER'] = 'generated_resumes'
+app.json = FastJSONProvider(app)
 
-# Create the folder for generated resumes if it doesn't exist
-if not os.path.exists(app.config['UPLOAD_FOLDER']):
-    os.makedirs(app.config['UPLOAD_FOLDER'])
+# Generated PDFs live in the storage lifecycle manager (TTL, quota, sweeper)
+storage = get_storage()
+
+
+async def respond(handler):
+    """
+    Run a route handler on the request's JSON body and build the JSON response,
+    under the profiler when the request opts in (see profiling.py)
+    """
+    data = request.get_json() or {}
+    if not profile_requested(request.headers.get(PROFILE_HEADER), request.args.get('profile')):
+        payload, status = await handler(data)
+        return jsonify(payload), status
+
+    # Async views run on their own event loop thread, so the profiler is enabled here
+    with RequestProfiler(request.path) as profiler:
+        payload, status = await handler(data)
+        response = jsonify(payload)
+    response.headers[PROFILE_ID_HEADER] = profiler.header_value
+    return response, status
+
+
+def offer_upgrade(payload, handler, data):
+    """
+    Attach a pending_upgrade token to an instant response; the handler runs again
+    with Gemini in the background (see upgrades.py)
+    """
+    token = get_upgrade_store().start(handler, {**data, 'instant': False})
+    payload['pending_upgrade'] = token
+    payload['upgrade_url'] = f"/upgrades/{token}"
+    return payload
+
+
+@app.before_request
+def start_request_metrics():
+    """Label this request's stage timings with its route"""
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    g.metrics_token = start_request(route)
+    g.metrics_start = time.perf_counter()
+
+
+@app.before_request
+def set_llm_scheduling():
+    """Schedule this request's LLM calls by its X-LLM-Priority class and tenant (X-Tenant-ID or client address)"""
+    g.llm_context = set_llm_context(request.headers.get(PRIORITY_HEADER),
+                                    request.headers.get(TENANT_HEADER) or request.remote_addr)
+
+
+@app.after_request
+def record_request_metrics(response):
+    """Record end-to-end latency for the request"""
+    token = g.pop('metrics_token', None)
+    if token is not None:
+        end_request(token, request.method, response.status_code, time.perf_counter() - g.metrics_start)
+    return response
+
+
+@app.teardown_request
+def clear_request_metrics(exc):
+    """Record requests that failed before a response was produced"""
+    token = g.pop('metrics_token', None)
+    if token is not None:
+        end_request(token, request.method, 500, time.perf_counter() - g.metrics_start)
+    llm_context = g.pop('llm_context', None)
+    if llm_context is not None:
+        reset_llm_context(llm_context)
 
 
 @app.route('/')
@@ -29,129 +107,204 @@ def dashboard():
     return render_template('index.html')
 
 
-@app.route('/generate', methods=['POST'])
-def generate_resume():
+async def handle_generate_resume(data):
     """Generate resume from pasted LinkedIn text"""
     try:
-        data = request.get_json()
         linkedin_text = data.get('linkedin_text', '')
         template = data.get('template', 'modern')  # Get template selection
         
         if not linkedin_text or len(linkedin_text.strip()) < 50:
-            return jsonify({'error': 'Please paste your LinkedIn profile content (Ctrl+A on your profile page, then Ctrl+C to copy)'}), 400
+            return {'error': 'Please paste your LinkedIn profile content (Ctrl+A on your profile page, then Ctrl+C to copy)'}, 400
         
         # Parse the pasted LinkedIn content
         parser = LinkedInParser()
-        profile_data = parser.parse_linkedin_text(linkedin_text)
+        profile_data = await parser.parse_linkedin_text_async(linkedin_text)
         
         if not profile_data:
-            return jsonify({'error': 'Failed to extract data from the pasted content. Make sure you copied from your LinkedIn profile page.'}), 500
+            return {'error': 'Failed to extract data from the pasted content. Make sure you copied from your LinkedIn profile page.'}, 500
         
-        # Generate resume PDF with selected template
+        # Generate resume PDF with selected template (CPU-bound, kept off the event loop)
         generator = ResumeGenerator()
-        pdf_path = generator.create_resume(profile_data, template=template)
+        # run_in_executor rather than asyncio.to_thread (3.9+); the context copy keeps the request's labels
+        render = functools.partial(contextvars.copy_context().run, generator.create_resume, profile_data, template=template)
+        pdf_path = await asyncio.get_running_loop().run_in_executor(None, render)
         
-        return jsonify({
+        return {
             'success': True,
             'pdf_path': pdf_path,
             'profile_data': profile_data,  # Include profile data for cover letter generation
             'message': f'Resume generated successfully with {template.capitalize()} template!'
-        })
+        }, 200
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return {'error': str(e)}, 500
 
 
-@app.route('/generate-cover-letter', methods=['POST'])
-def generate_cover_letter():
+@app.route('/generate', methods=['POST'])
+async def generate_resume():
+    """Generate resume from pasted LinkedIn text"""
+    return await respond(handle_generate_resume)
+
+
+async def handle_generate_cover_letter(data):
     """Generate cover letter from profile data and job description"""
     try:
-        data = request.get_json()
         profile_data = data.get('profile_data', {})
         job_description = data.get('job_description', '')
         
         if not profile_data:
-            return jsonify({'error': 'Profile data is required'}), 400
+            return {'error': 'Profile data is required'}, 400
         
         if not job_description or len(job_description.strip()) < 50:
-            return jsonify({'error': 'Please provide a detailed job description (minimum 50 characters)'}), 400
+            return {'error': 'Please provide a detailed job description (minimum 50 characters)'}, 400
         
         # Generate cover letter
         cl_generator = CoverLetterGenerator()
-        pdf_path = cl_generator.create_cover_letter_pdf(profile_data, job_description)
+        instant = wants_instant(data) and cl_generator.llm.available
+        pdf_path = await cl_generator.create_cover_letter_pdf_async(profile_data, job_description, instant)
         
-        return jsonify({
+        payload = {
             'success': True,
             'pdf_path': pdf_path,
             'message': 'Cover letter generated successfully!'
-        })
+        }
+        if instant:
+            offer_upgrade(payload, handle_generate_cover_letter, data)
+        return payload, 200
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return {'error': str(e)}, 500
+
+
+@app.route('/generate-cover-letter', methods=['POST'])
+async def generate_cover_letter():
+    """Generate cover letter from profile data and job description"""
+    return await respond(handle_generate_cover_letter)
 
 
 @app.route('/download/<filename>')
 def download_resume(filename):
     """Download the generated resume"""
     try:
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        return send_file(file_path, as_attachment=True, download_name='resume.pdf')
+        stored = storage.open(filename)
+        if stored is None:
+            return jsonify({'error': 'File not found or expired'}), 404
+        return send_file(stored, as_attachment=True, download_name='resume.pdf', mimetype='application/pdf')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/analyze-ats', methods=['POST'])
-def analyze_ats():
+async def handle_analyze_ats(data):
     """Analyze resume for ATS compatibility"""
     try:
-        data = request.get_json()
         profile_data = data.get('profile_data', {})
         job_description = data.get('job_description', None)
         
         if not profile_data:
-            return jsonify({'error': 'Profile data is required'}), 400
+            return {'error': 'Profile data is required'}, 400
         
         # Analyze ATS score
         analyzer = ATSAnalyzer()
-        ats_analysis = analyzer.analyze_resume(profile_data, job_description)
+        instant = wants_instant(data) and analyzer.llm.available
+        ats_analysis = await analyzer.analyze_resume_async(profile_data, job_description, instant)
         
-        return jsonify({
+        payload = {
             'success': True,
             'analysis': ats_analysis,
             'message': 'ATS analysis completed!'
-        })
+        }
+        if instant:
+            offer_upgrade(payload, handle_analyze_ats, data)
+        return payload, 200
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return {'error': str(e)}, 500
 
 
-@app.route('/analyze-skill-gap', methods=['POST'])
-def analyze_skill_gap():
+@app.route('/analyze-ats', methods=['POST'])
+async def analyze_ats():
+    """Analyze resume for ATS compatibility"""
+    return await respond(handle_analyze_ats)
+
+
+async def handle_analyze_skill_gap(data):
     """Analyze skill gaps between profile and job requirements"""
     try:
-        data = request.get_json()
         profile_data = data.get('profile_data', {})
         job_description = data.get('job_description', '')
         
         if not profile_data:
-            return jsonify({'error': 'Profile data is required'}), 400
+            return {'error': 'Profile data is required'}, 400
         
         if not job_description or len(job_description.strip()) < 50:
-            return jsonify({'error': 'Please provide a detailed job description for skill gap analysis'}), 400
+            return {'error': 'Please provide a detailed job description for skill gap analysis'}, 400
         
         # Analyze skill gaps
         analyzer = SkillGapAnalyzer()
-        gap_analysis = analyzer.analyze_skill_gap(profile_data, job_description)
+        instant = wants_instant(data) and analyzer.use_ai
+        gap_analysis = await analyzer.analyze_skill_gap_async(profile_data, job_description, instant)
         
-        return jsonify({
+        payload = {
             'success': True,
-            'analysis': gap_analysis['analysis'],
-            'method': gap_analysis.get('method', 'basic'),
+            'analysis': gap_analysis,
+            'method': gap_analysis.method,
             'message': 'Skill gap analysis completed!'
-        })
+        }
+        if instant:
+            offer_upgrade(payload, handle_analyze_skill_gap, data)
+        return payload, 200
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return {'error': str(e)}, 500
+
+
+@app.route('/analyze-skill-gap', methods=['POST'])
+async def analyze_skill_gap():
+    """Analyze skill gaps between profile and job requirements"""
+    return await respond(handle_analyze_skill_gap)
+
+
+async def handle_analyze_skill_gap_batch(data):
+    """Rank saved job descriptions against one profile; the best few also get a Gemini analysis"""
+    try:
+        profile_data = data.get('profile_data', {})
+        job_descriptions = data.get('job_descriptions', [])
+        
+        if not profile_data:
+            return {'error': 'Profile data is required'}, 400
+        
+        if not isinstance(job_descriptions, list) or not job_descriptions:
+            return {'error': 'Please provide a list of job descriptions to compare'}, 400
+        
+        if len(job_descriptions) > SKILL_GAP_BATCH_MAX:
+            return {'error': f'At most {SKILL_GAP_BATCH_MAX} job descriptions can be compared at once'}, 400
+        
+        short = [i for i, jd in enumerate(job_descriptions) if not isinstance(jd, str) or len(jd.strip()) < 50]
+        if short:
+            return {'error': f'Job descriptions {short} are too short (minimum 50 characters each)'}, 400
+        
+        try:
+            ai_top = min(int(data.get('ai_top', SKILL_GAP_BATCH_AI_TOP)), SKILL_GAP_BATCH_AI_TOP)
+        except (TypeError, ValueError):
+            return {'error': 'ai_top must be a number'}, 400
+        
+        analyzer = SkillGapAnalyzer()
+        ranking = await analyzer.compare_job_descriptions_async(profile_data, job_descriptions, ai_top)
+        
+        return {
+            'success': True,
+            'ranking': ranking,
+            'message': f'Compared {len(ranking)} job descriptions!'
+        }, 200
+        
+    except Exception as e:
+        return {'error': str(e)}, 500
+
+
+@app.route('/analyze-skill-gap/batch', methods=['POST'])
+async def analyze_skill_gap_batch():
+    """Rank saved job descriptions against one profile"""
+    return await respond(handle_analyze_skill_gap_batch)
 
 
 @app.route('/scrape-linkedin-url', methods=['POST'])
@@ -189,48 +342,107 @@ def scrape_linkedin_url():
         return jsonify({'error': f'Scraping failed: {str(e)}'}), 500
 
 
-@app.route('/analyze-career-path', methods=['POST'])
-def analyze_career_path():
+async def handle_analyze_career_path(data):
     """Generate career path recommendations"""
     try:
-        data = request.get_json()
         profile_data = data.get('profile_data')
         target_role = data.get('target_role', None)
         years_ahead = data.get('years_ahead', 5)
         
         if not profile_data:
-            return jsonify({'error': 'No profile data provided'}), 400
+            return {'error': 'No profile data provided'}, 400
         
         # Initialize career advisor
         advisor = CareerPathAdvisor()
+        instant = wants_instant(data) and advisor.use_ai
+        
+        if str(data.get('progressive', '')).lower() in ('1', 'true', 'yes'):
+            # First screen only; the client fetches the other sections from /analyze-career-path/expand
+            plan = await advisor.analyze_overview_async(profile_data, target_role, years_ahead, instant)
+            payload = {
+                'success': True,
+                'analysis': plan.overview,
+                'method': plan.overview.method,
+                'profile_key': plan.key,
+                'expanded_sections': dict(plan.sections),
+                'pending_sections': plan.pending_sections(),
+                'expand_url': '/analyze-career-path/expand'
+            }
+            if instant and plan.overview.method != 'ai_overview':
+                offer_upgrade(payload, handle_analyze_career_path, data)
+            return payload, 200
         
         # Analyze career path
-        result = advisor.analyze_career_path(profile_data, target_role, years_ahead)
+        result = await advisor.analyze_career_path_async(profile_data, target_role, years_ahead, instant)
         
-        if result['success']:
-            return jsonify({
-                'success': True,
-                'analysis': result['analysis'],
-                'method': result.get('method', 'ai')
-            })
-        else:
-            return jsonify({'error': 'Career path analysis failed'}), 500
+        payload = {
+            'success': True,
+            'analysis': result,
+            'method': result.method
+        }
+        if instant:
+            offer_upgrade(payload, handle_analyze_career_path, data)
+        return payload, 200
             
     except Exception as e:
-        return jsonify({'error': f'Career analysis failed: {str(e)}'}), 500
+        return {'error': f'Career analysis failed: {str(e)}'}, 500
 
 
-@app.route('/generate-interview-questions', methods=['POST'])
-def generate_interview_questions():
+@app.route('/analyze-career-path', methods=['POST'])
+async def analyze_career_path():
+    """Generate career path recommendations"""
+    return await respond(handle_analyze_career_path)
+
+
+async def handle_expand_career_path(data):
+    """Generate one section of a progressive career analysis (cached per profile)"""
+    try:
+        section = data.get('section')
+        if section not in EXPANDABLE_SECTIONS:
+            return {'error': f"section must be one of: {', '.join(EXPANDABLE_SECTIONS)}"}, 400
+        
+        profile_key = data.get('profile_key')
+        if profile_key is not None and not isinstance(profile_key, str):
+            return {'error': 'profile_key must be a string'}, 400
+        
+        # The profile_key from the overview response is enough while the plan is cached
+        plans = get_career_plans()
+        plan = plans.get(profile_key) if profile_key else None
+        if plan is None:
+            profile_data = data.get('profile_data')
+            if not profile_data:
+                return {'error': 'Unknown or expired profile_key; send profile_data instead'}, 404
+            plan = plans.plan_for(profile_data, data.get('target_role', None), data.get('years_ahead', 5))
+        
+        content, source = await CareerPathAdvisor().expand_section_async(plan, section)
+        return {
+            'success': True,
+            'section': section,
+            'content': content,
+            'source': source,
+            'profile_key': plan.key,
+            'pending_sections': plan.pending_sections()
+        }, 200
+            
+    except Exception as e:
+        return {'error': f'Career section expansion failed: {str(e)}'}, 500
+
+
+@app.route('/analyze-career-path/expand', methods=['POST'])
+async def expand_career_path():
+    """Generate one section of a progressive career analysis"""
+    return await respond(handle_expand_career_path)
+
+
+async def handle_generate_interview_questions(data):
     """Generate personalized interview questions"""
     try:
-        data = request.get_json()
         profile_data = data.get('profile_data')
         job_description = data.get('job_description', None)
         question_count = data.get('question_count', 25)
         
         if not profile_data:
-            return jsonify({'error': 'Profile data is required'}), 400
+            return {'error': 'Profile data is required'}, 400
         
         # Validate question count
         try:
@@ -242,22 +454,148 @@ def generate_interview_questions():
         
         # Generate interview questions
         generator = InterviewQuestionGenerator()
-        result = generator.generate_questions(profile_data, job_description, question_count)
+        instant = wants_instant(data) and generator.use_ai
+        result = await generator.generate_questions_async(profile_data, job_description, question_count, instant)
+        total_questions = result.total_questions
         
-        if result['success']:
-            return jsonify({
-                'success': True,
-                'questions': result['questions'],
-                'total_questions': result['total_questions'],
-                'method': result.get('method', 'ai_powered'),
-                'personalization_level': result.get('personalization_level', 'high'),
-                'message': f'Generated {result["total_questions"]} personalized interview questions!'
-            })
-        else:
-            return jsonify({'error': 'Question generation failed'}), 500
+        payload = {
+            'success': True,
+            'questions': result,
+            'total_questions': total_questions,
+            'method': result.method,
+            'personalization_level': result.personalization_level,
+            'bank_fill_ratio': result.bank_fill_ratio,
+            'message': f'Generated {total_questions} personalized interview questions!'
+        }
+        if instant:
+            offer_upgrade(payload, handle_generate_interview_questions, data)
+        return payload, 200
             
     except Exception as e:
-        return jsonify({'error': f'Interview question generation failed: {str(e)}'}), 500
+        return {'error': f'Interview question generation failed: {str(e)}'}, 500
+
+
+@app.route('/generate-interview-questions', methods=['POST'])
+async def generate_interview_questions():
+    """Generate personalized interview questions"""
+    return await respond(handle_generate_interview_questions)
+
+
+@app.route('/upgrades/<token>')
+def upgrade_status(token):
+    """Poll a pending upgrade: 202 while Gemini is working, then the full response"""
+    upgrade = get_upgrade_store().get(token)
+    if upgrade is None:
+        return jsonify({'error': 'Unknown or expired upgrade token'}), 404
+    body, status = upgrade.response()
+    return jsonify(body), status
+
+
+@app.route('/upgrades/<token>/events')
+def upgrade_events(token):
+    """Server-Sent Events stream that delivers the upgrade once it finishes"""
+    upgrade = get_upgrade_store().get(token)
+    if upgrade is None:
+        return jsonify({'error': 'Unknown or expired upgrade token'}), 404
+
+    def stream():
+        while True:
+            try:
+                upgrade.future.result(timeout=UPGRADE_KEEPALIVE)
+            except FutureTimeoutError:
+                # Not the builtin TimeoutError before Python 3.11
+                yield SSE_KEEPALIVE
+                continue
+            except Exception:
+                pass
+            yield sse_message(app.json.dumps(upgrade.response()[0]))
+            return
+
+    return Response(stream_with_context(stream()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/stats/prompts')
+def prompt_stats():
+    """Report estimated prompt tokens per request for each analyzer"""
+    return jsonify({
+        'success': True,
+        'prompts': get_prompt_stats()
+    })
+
+
+@app.route('/stats/llm-output')
+def llm_output_stats():
+    """Report how often each feature's Gemini replies were malformed or truncated"""
+    return jsonify({
+        'success': True,
+        'json_mode': get_llm_client().json_mode,
+        'features': get_extract_stats()
+    })
+
+
+@app.route('/stats/llm-keys')
+def llm_key_stats():
+    """Report per-key Gemini usage: requests in the last minute, utilization, cooldowns and 429s"""
+    return jsonify({
+        'success': True,
+        'keys': get_key_pool().stats()
+    })
+
+
+@app.route('/stats/llm-scheduler')
+def llm_scheduler_stats():
+    """Report running and queued Gemini calls per priority class"""
+    return jsonify({
+        'success': True,
+        'scheduler': get_llm_scheduler().stats()
+    })
+
+
+@app.route('/stats/llm-hedging')
+def llm_hedging_stats():
+    """Report hedge rate, hedge wins and call latency p50/p90/p99 per feature"""
+    return jsonify({
+        'success': True,
+        'hedging': get_llm_client().hedging.stats()
+    })
+
+
+@app.route('/stats/jd-cache')
+def jd_cache_stats():
+    """Report cached job descriptions and the cache hit rate"""
+    return jsonify({
+        'success': True,
+        'jd_cache': get_jd_cache().stats()
+    })
+
+
+@app.route('/stats/storage')
+def storage_stats():
+    """Report stored PDF count and bytes used against the quota (file names stay private)"""
+    return jsonify({
+        'success': True,
+        'storage': storage.stats()
+    })
+
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics: per-route request latency and per-stage timings"""
+    return render_metrics(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+
+# Gemini-bound routes that the ASGI entry point (asgi.py) serves directly on its event loop
+ASYNC_ROUTES = {
+    '/generate': handle_generate_resume,
+    '/generate-cover-letter': handle_generate_cover_letter,
+    '/analyze-ats': handle_analyze_ats,
+    '/analyze-skill-gap': handle_analyze_skill_gap,
+    '/analyze-skill-gap/batch': handle_analyze_skill_gap_batch,
+    '/analyze-career-path': handle_analyze_career_path,
+    '/analyze-career-path/expand': handle_expand_career_path,
+    '/generate-interview-questions': handle_generate_interview_questions,
+}
 
 
 # Vercel serverless function handler
@@ -0,0 +1,175 @@
+"""
+ASGI entry point
+Serves the Gemini-bound routes and the upgrade polling/SSE routes natively on the event
+loop so one worker can keep many LLM calls and open streams in flight; every other route
+is delegated to the Flask WSGI app.
+
+Run with:
+    uvicorn asgi:application --host 127.0.0.1 --port 8080
+"""
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs
+from asgiref.wsgi import WsgiToAsgi
+from app import app, ASYNC_ROUTES
+from instrumentation import start_request, end_request
+from llm_scheduler import set_llm_context, reset_llm_context, PRIORITY_HEADER, TENANT_HEADER
+from profiling import profile_requested, RequestProfiler, PROFILE_HEADER, PROFILE_ID_HEADER
+from upgrades import get_upgrade_store, sse_message, SSE_KEEPALIVE, UPGRADE_KEEPALIVE
+
+UPGRADES_PREFIX = '/upgrades/'
+
+# WsgiToAsgi runs each request through a thread-sensitive sync_to_async call,
+# which serializes requests; it is only used for the cheap non-LLM routes
+wsgi_application = WsgiToAsgi(app)
+
+
+async def _read_body(receive):
+    """Collect the full request body from ASGI http.request messages"""
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+def _encode_json(payload):
+    """Serialize a payload the same way Flask's jsonify does"""
+    return app.json.dumps(payload).encode('utf-8')
+
+
+async def _send_json(send, payload, status, headers=None):
+    """Send a JSON response (payload may already be encoded bytes)"""
+    body = payload if isinstance(payload, bytes) else _encode_json(payload)
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode('ascii'))
+        ] + (headers or [])
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def _header(scope, name):
+    """Value of a request header of an ASGI request (None if absent)"""
+    header_name = name.lower().encode('latin-1')
+    return next((value.decode('latin-1') for key, value in scope.get('headers', []) if key == header_name), None)
+
+
+def _wants_profile(scope):
+    """Check the X-Profile header and ?profile= query flag of an ASGI request"""
+    query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    return profile_requested(_header(scope, PROFILE_HEADER), (query.get('profile') or [None])[0])
+
+
+async def _serve_upgrade(scope, send):
+    """
+    GET /upgrades/<token> (poll) and /upgrades/<token>/events (SSE) on the event loop;
+    through WsgiToAsgi an open stream would hold up every other Flask request
+
+    Returns:
+        int: HTTP status sent
+    """
+    token, _, events = scope['path'][len(UPGRADES_PREFIX):].partition('/')
+    upgrade = get_upgrade_store().get(token)
+    if upgrade is None or (events and events != 'events'):
+        await _send_json(send, {'error': 'Unknown or expired upgrade token'}, 404)
+        return 404
+    if not events:
+        body, status = upgrade.response()
+        await _send_json(send, body, status)
+        return status
+
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [(b'content-type', b'text/event-stream'), (b'cache-control', b'no-cache'),
+                    (b'x-accel-buffering', b'no')]
+    })
+    result = asyncio.wrap_future(upgrade.future)
+    while True:
+        try:
+            await asyncio.wait_for(asyncio.shield(result), UPGRADE_KEEPALIVE)
+        except asyncio.TimeoutError:
+            await send({'type': 'http.response.body', 'body': SSE_KEEPALIVE.encode('ascii'), 'more_body': True})
+            continue
+        except Exception:
+            pass
+        break
+    event = sse_message(_encode_json(upgrade.response()[0]).decode('utf-8'))
+    await send({'type': 'http.response.body', 'body': event.encode('utf-8')})
+    return 200
+
+
+async def _lifespan(receive, send):
+    """Acknowledge server startup/shutdown events"""
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    """ASGI application: async handlers for LLM routes, Flask for the rest"""
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+
+    if scope['type'] == 'http' and scope['method'] == 'GET' and scope['path'].startswith(UPGRADES_PREFIX):
+        route = '/upgrades/<token>/events' if scope['path'].endswith('/events') else '/upgrades/<token>'
+        token = start_request(route)
+        started = time.perf_counter()
+        status = 500
+        try:
+            status = await _serve_upgrade(scope, send)
+        finally:
+            end_request(token, 'GET', status, time.perf_counter() - started)
+        return
+
+    handler = ASYNC_ROUTES.get(scope.get('path')) if scope['type'] == 'http' else None
+    if handler is None or scope['method'] != 'POST':
+        await wsgi_application(scope, receive, send)
+        return
+
+    token = start_request(scope['path'])
+    # LLM calls are scheduled by the X-LLM-Priority class and the tenant (X-Tenant-ID or client address)
+    client = scope.get('client') or (None,)
+    llm_context = set_llm_context(_header(scope, PRIORITY_HEADER), _header(scope, TENANT_HEADER) or client[0])
+    started = time.perf_counter()
+    status = 500
+    try:
+        body = await _read_body(receive)
+        if body is None:
+            return
+        try:
+            data = json.loads(body or b'{}')
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            status = 400
+            await _send_json(send, {'error': 'Request body must be a JSON object'}, status)
+            return
+
+        if not _wants_profile(scope):
+            payload, status = await handler(data)
+            await _send_json(send, payload, status)
+            return
+
+        # Other requests sharing the event loop may appear in this profile too
+        with RequestProfiler(scope['path']) as profiler:
+            payload, status = await handler(data)
+            body = _encode_json(payload)
+        profile_header = (PROFILE_ID_HEADER.lower().encode('latin-1'), profiler.header_value.encode('latin-1'))
+        await _send_json(send, body, status, [profile_header])
+    finally:
+        reset_llm_context(llm_context)
+        end_request(token, 'POST', status, time.perf_counter() - started)
@@ -3,60 +3,81 @@ ATS Score Analyzer using Gemini AI
 Analyzes resumes and provides ATS compatibility scores
 """
 
-import os
-import google.generativeai as genai
-from dotenv import load_dotenv
-import json
-import re
+from job_matcher import get_keyword_matcher
+from jd_cache import job_description_prompt, job_keywords
+from llm_client import get_llm_client
+from instrumentation import timed
+from analysis_results import ATSResult, freeze
+from prompt_builder import PromptBuilder, HIGH, MEDIUM
+from wire_schema import ATS_WIRE, compact_wire
 
-load_dotenv()
+# Generic analysis when there is no profile to score, shared by every response
+GENERIC_FALLBACK = freeze({
+    "overall_score": 68,
+    "category_scores": {
+        "formatting": 70,
+        "keywords": 65,
+        "experience": 68,
+        "skills": 67,
+        "education": 70
+    },
+    "strengths": [
+        "Clear professional experience listed",
+        "Education background included",
+        "Multiple skills documented"
+    ],
+    "improvements": [
+        "Add more quantifiable achievements",
+        "Include industry-specific keywords",
+        "Expand skill descriptions"
+    ],
+    "missing_keywords": [
+        "Add role-specific technical terms",
+        "Include action verbs"
+    ],
+    "ats_friendly_rating": "Good"
+})
+
+# Long-key reply format, used with WIRE_FORMAT=verbose
+ATS_JSON_FORMAT = """Provide your analysis in the following JSON format (respond with ONLY valid JSON, no markdown):
+{
+    "overall_score": <number between 0-100>,
+    "category_scores": {
+        "formatting": <number between 0-100>,
+        "keywords": <number between 0-100>,
+        "experience": <number between 0-100>,
+        "skills": <number between 0-100>,
+        "education": <number between 0-100>
+    },
+    "strengths": [
+        "strength 1",
+        "strength 2",
+        "strength 3"
+    ],
+    "improvements": [
+        "improvement suggestion 1",
+        "improvement suggestion 2",
+        "improvement suggestion 3"
+    ],
+    "missing_keywords": [
+        "keyword1",
+        "keyword2"
+    ],
+    "ats_friendly_rating": "Excellent|Good|Fair|Poor"
+}"""
+
+DEFAULT_MISSING_KEYWORDS = freeze([
+    "Industry-specific technical terms",
+    "Action verbs (achieved, implemented, led, etc.)"
+])
 
 class ATSAnalyzer:
     def __init__(self):
         """Initialize the ATS Analyzer with Gemini AI"""
-        self.api_key = os.getenv('GEMINI_API_KEY')
-        if self.api_key:
-            genai.configure(api_key=self.api_key)
-            self.model = genai.GenerativeModel('gemini-2.0-flash')
-        else:
-            self.model = None
+        self.llm = get_llm_client()
+        if not self.llm.available:
             print("⚠️  Warning: GEMINI_API_KEY not found. ATS analysis disabled.")
     
-    def analyze_resume(self, profile_data, job_description=None):
-        """
-        Analyze resume for ATS compatibility
-        
-        Args:
-            profile_data (dict): Parsed LinkedIn profile data
-            job_description (str, optional): Job description to match against
-        
-        Returns:
-            dict: ATS analysis results with score and recommendations
-        """
-        if not self.model:
-            return self._get_fallback_analysis()
-        
-        try:
-            # Prepare resume text from profile data
-            resume_text = self._format_profile_for_analysis(profile_data)
-            
-            # Create ATS analysis prompt
-            prompt = self._create_ats_prompt(resume_text, job_description)
-            
-            # Generate analysis
-            response = self.model.generate_content(prompt)
-            analysis_text = response.text.strip()
-            
-            # Parse the response
-            analysis = self._parse_ats_response(analysis_text)
-            
-            print("✅ ATS analysis completed successfully")
-            return analysis
-            
-        except Exception as e:
-            print(f"❌ ATS analysis error: {str(e)}")
-            return self._get_fallback_analysis()
-    
     def _format_profile_for_analysis(self, profile_data):
         """Format profile data into readable text for analysis"""
         text_parts = []
@@ -93,48 +114,41 @@ class ATSAnalyzer:
         
         return "\n".join(text_parts)
     
-    def _create_ats_prompt(self, resume_text, job_description=None):
+    def analyze_keywords(self, profile_data, job_description):
+        """
+        Score keyword coverage of the resume against a job description locally (no LLM call)
+        
+        Args:
+            profile_data (dict): Parsed LinkedIn profile data
+            job_description (str): Job description to match against
+        
+        Returns:
+            dict: Coverage score (0-100), matched and missing keywords
+        """
+        resume_text = self._format_profile_for_analysis(profile_data)
+        return get_keyword_matcher().score(resume_text, job_description, keywords=job_keywords(job_description))
+    
+    def _create_ats_prompt(self, resume_text, job_description=None, keyword_match=None):
         """Create prompt for ATS analysis"""
-        base_prompt = f"""
+        builder = PromptBuilder('ats')
+        builder.add("""
 You are an expert ATS (Applicant Tracking System) analyzer. Analyze the following resume and provide a comprehensive ATS compatibility score.
-
-Resume:
-{resume_text}
-"""
+""")
+        builder.add(f"Resume:\n{resume_text}\n", priority=HIGH, min_tokens=200)
         
         if job_description:
-            base_prompt += f"""
-Job Description to match against:
-{job_description}
-"""
+            builder.add('\n' + job_description_prompt(job_description, 'Job Description to match against:'),
+                        priority=MEDIUM, compact=True, min_tokens=150)
         
-        base_prompt += """
-Provide your analysis in the following JSON format (respond with ONLY valid JSON, no markdown):
-{
-    "overall_score": <number between 0-100>,
-    "category_scores": {
-        "formatting": <number between 0-100>,
-        "keywords": <number between 0-100>,
-        "experience": <number between 0-100>,
-        "skills": <number between 0-100>,
-        "education": <number between 0-100>
-    },
-    "strengths": [
-        "strength 1",
-        "strength 2",
-        "strength 3"
-    ],
-    "improvements": [
-        "improvement suggestion 1",
-        "improvement suggestion 2",
-        "improvement suggestion 3"
-    ],
-    "missing_keywords": [
-        "keyword1",
-        "keyword2"
-    ],
-    "ats_friendly_rating": "Excellent|Good|Fair|Poor"
-}
+        if keyword_match and keyword_match['missing_keywords']:
+            builder.add(f"""
+A keyword scan found these job description terms missing from the resume (verify and prioritize them in missing_keywords):
+{', '.join(keyword_match['missing_keywords'])}
+""")
+        
+        response_format = ATS_WIRE.describe() if compact_wire() else ATS_JSON_FORMAT
+        builder.add(f"""
+{response_format}
 
 CRITICAL SCORING RULES:
 - ALL scores MUST be integers between 0-100 (inclusive)
@@ -151,70 +165,36 @@ Evaluate based on:
 5. Education: Relevant qualifications
 
 Provide actionable improvement suggestions.
-"""
-        return base_prompt
+""")
+        return builder.build()
     
     def _parse_ats_response(self, response_text):
-        """Parse Gemini response into structured analysis"""
+        """Parse Gemini response into structured analysis (raises so callers fall back to the profile-based score)"""
         try:
-            # Remove markdown code blocks if present
-            json_text = re.sub(r'```json\s*|\s*```', '', response_text)
-            json_text = json_text.strip()
-            
-            # Parse JSON
-            analysis = json.loads(json_text)
-            
-            # Validate required fields
-            required_fields = ['overall_score', 'category_scores', 'strengths', 'improvements']
-            for field in required_fields:
-                if field not in analysis:
-                    raise ValueError(f"Missing required field: {field}")
+            analysis = ATSResult.from_llm(response_text, 'ats')
             
             # Ensure scores are in 0-100 range
-            analysis['overall_score'] = max(0, min(100, int(analysis['overall_score'])))
-            for key in analysis['category_scores']:
-                analysis['category_scores'][key] = max(0, min(100, int(analysis['category_scores'][key])))
+            analysis.overall_score = max(0, min(100, int(analysis.overall_score)))
+            for key in analysis.category_scores:
+                analysis.category_scores[key] = max(0, min(100, int(analysis.category_scores[key])))
             
             return analysis
             
         except Exception as e:
             print(f"Failed to parse ATS response: {str(e)}")
             print(f"Response was: {response_text[:200]}")
-            return self._get_fallback_analysis()
+            raise
     
-    def _get_fallback_analysis(self, profile_data=None):
+    def _get_fallback_analysis(self, profile_data=None, job_description=None):
         """Return basic ATS analysis when AI is unavailable"""
         if profile_data:
-            return self._calculate_smart_fallback_score(profile_data)
+            return self._calculate_smart_fallback_score(profile_data, job_description)
         
         # Generic fallback if no profile data
-        return {
-            "overall_score": 68,
-            "category_scores": {
-                "formatting": 70,
-                "keywords": 65,
-                "experience": 68,
-                "skills": 67,
-                "education": 70
-            },
-            "strengths": [
-                "Clear professional experience listed",
-                "Education background included",
-                "Multiple skills documented"
-            ],
-            "improvements": [
-                "Add more quantifiable achievements",
-                "Include industry-specific keywords",
-                "Expand skill descriptions"
-            ],
-            "missing_keywords": [
-                "Add role-specific technical terms",
-                "Include action verbs"
-            ],
-            "ats_friendly_rating": "Good"
-        }
+        return ATSResult(method='basic', **GENERIC_FALLBACK)
     
-    def _calculate_smart_fallback_score(self, profile_data):
+    @timed('fallback')
+    def _calculate_smart_fallback_score(self, profile_data, job_description=None):
         """Calculate ATS score based on resume content depth - Range: 0-100"""
         score = 50  # Base score (minimum)
         category_scores = {
@@ -310,6 +290,20 @@ Provide actionable improvement suggestions.
         for key in category_scores:
             category_scores[key] = min(100, max(50, category_scores[key]))
         
+        # Job description keyword coverage replaces the content-length keyword estimate
+        keyword_match = None
+        missing_keywords = DEFAULT_MISSING_KEYWORDS
+        if job_description:
+            keyword_match = self.analyze_keywords(profile_data, job_description)
+            if keyword_match['keywords_evaluated']:
+                category_scores['keywords'] = keyword_match['score']
+                score = int(round(score * 0.7 + keyword_match['score'] * 0.3))
+                missing_keywords = keyword_match['missing_keywords'][:10]
+                if keyword_match['score'] >= 70:
+                    strengths.insert(0, f"Covers {len(keyword_match['matched_keywords'])} key terms from the job description")
+                elif missing_keywords:
+                    improvements.insert(0, f"Add job description keywords: {', '.join(missing_keywords[:5])}")
+        
         # Ensure we have enough items in lists
         if len(strengths) < 3:
             default_strengths = [
@@ -337,17 +331,16 @@ Provide actionable improvement suggestions.
         else:
             rating = "Poor"
         
-        return {
-            "overall_score": score,
-            "category_scores": category_scores,
-            "strengths": strengths[:3],
-            "improvements": improvements[:3],
-            "missing_keywords": [
-                "Industry-specific technical terms",
-                "Action verbs (achieved, implemented, led, etc.)"
-            ],
-            "ats_friendly_rating": rating
-        }
+        return ATSResult(
+            method='basic',
+            overall_score=score,
+            category_scores=category_scores,
+            strengths=strengths[:3],
+            improvements=improvements[:3],
+            missing_keywords=missing_keywords,
+            ats_friendly_rating=rating,
+            keyword_match=keyword_match
+        )
     
     def analyze_resume(self, profile_data, job_description=None):
         """
@@ -358,28 +351,59 @@ Provide actionable improvement suggestions.
             job_description (str, optional): Job description to match against
         
         Returns:
-            dict: ATS analysis results with score and recommendations
+            ATSResult: ATS analysis results with score and recommendations
         """
-        if not self.model:
-            return self._calculate_smart_fallback_score(profile_data)
+        if not self.llm.available:
+            return self._calculate_smart_fallback_score(profile_data, job_description)
         
         try:
-            # Prepare resume text from profile data
-            resume_text = self._format_profile_for_analysis(profile_data)
-            
-            # Create ATS analysis prompt
-            prompt = self._create_ats_prompt(resume_text, job_description)
-            
-            # Generate analysis
-            response = self.model.generate_content(prompt)
-            analysis_text = response.text.strip()
+            prompt, keyword_match = self._prepare_analysis(profile_data, job_description)
+            analysis_text = self.llm.generate(prompt, endpoint='ats', response_schema=ATSResult.response_schema())
+            return self._finish_analysis(analysis_text, keyword_match)
             
-            # Parse the response
-            analysis = self._parse_ats_response(analysis_text)
-            
-            print("✅ ATS analysis completed successfully")
-            return analysis
+        except Exception as e:
+            print(f"❌ ATS analysis error: {str(e)}")
+            return self._calculate_smart_fallback_score(profile_data, job_description)
+    
+    async def analyze_resume_async(self, profile_data, job_description=None, instant=False):
+        """
+        Async version of analyze_resume for the async/ASGI endpoints
+        
+        With instant=True the local score is returned without calling Gemini.
+        """
+        if instant or not self.llm.available:
+            return self._calculate_smart_fallback_score(profile_data, job_description)
+        
+        try:
+            prompt, keyword_match = self._prepare_analysis(profile_data, job_description)
+            analysis_text = await self.llm.generate_async(prompt, endpoint='ats', response_schema=ATSResult.response_schema())
+            return self._finish_analysis(analysis_text, keyword_match)
             
         except Exception as e:
             print(f"❌ ATS analysis error: {str(e)}")
-            return self._calculate_smart_fallback_score(profile_data)
+            return self._calculate_smart_fallback_score(profile_data, job_description)
+    
+    def _prepare_analysis(self, profile_data, job_description):
+        """Build the ATS prompt; returns (prompt, local keyword match or None)"""
+        # Prepare resume text from profile data
+        resume_text = self._format_profile_for_analysis(profile_data)
+        
+        # Local keyword scan first; its findings steer the LLM and back-fill its answer
+        keyword_match = None
+        if job_description:
+            keyword_match = get_keyword_matcher().score(resume_text, job_description,
+                                                        keywords=job_keywords(job_description))
+        
+        return self._create_ats_prompt(resume_text, job_description, keyword_match), keyword_match
+    
+    def _finish_analysis(self, analysis_text, keyword_match):
+        """Parse the Gemini response and merge in the local keyword match"""
+        analysis = self._parse_ats_response(analysis_text)
+        
+        if keyword_match:
+            if not analysis.missing_keywords:
+                analysis.missing_keywords = keyword_match['missing_keywords'][:10]
+            analysis.keyword_match = keyword_match
+        
+        print("✅ ATS analysis completed successfully")
+        return analysis
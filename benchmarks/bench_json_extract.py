@@ -0,0 +1,115 @@
+"""
+JSON Extraction Benchmark
+Compares the per-analyzer parsing that used to live in each module (greedy regex,
+find/rfind, fence stripping) with json_extract on large Gemini-style replies:
+clean, fenced, followed by chatter, and truncated mid-stream
+
+Usage:
+    python benchmarks/bench_json_extract.py
+    python benchmarks/bench_json_extract.py --questions 200 --iterations 200
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from json_extract import extract_json, JSONExtractionError  # noqa: E402
+
+
+def make_reply(questions):
+    """A large interview-questions style JSON document"""
+    items = [{
+        'question': f"Tell me about project {i} and the trade-offs you made {{carefully}}.",
+        'category': 'System Design',
+        'difficulty': ['Easy', 'Medium', 'Hard'][i % 3],
+        'key_points': [f"point {i}.{j}" for j in range(4)],
+        'star_template': {'situation': '...', 'task': '...', 'action': '...', 'result': '...'}
+    } for i in range(questions)]
+    return json.dumps({'technical_questions': items, 'behavioral_questions': items[:questions // 2]}, indent=2)
+
+
+def variants(body):
+    """Reply shapes seen from the model"""
+    return {
+        'clean': body,
+        'fenced': f"```json\n{body}\n```",
+        'chatter': f"Here is the analysis you asked for:\n{body}\nLet me know if you need anything {{else}}!",
+        'truncated': body[:int(len(body) * 0.8)]
+    }
+
+
+def greedy_regex(text):
+    """Old skill gap / career path parser"""
+    match = re.search(r'\{.*\}', text, re.DOTALL)
+    if not match:
+        raise ValueError("Could not parse AI response")
+    return json.loads(match.group())
+
+
+def find_rfind(text):
+    """Old interview question parser"""
+    text = re.sub(r'^```json\s*', '', text.strip())
+    text = re.sub(r'^```\s*', '', text.strip())
+    text = re.sub(r'\s*```$', '', text.strip())
+    start = text.find('{')
+    end = text.rfind('}') + 1
+    if start != -1 and end > start:
+        text = text[start:end]
+    return json.loads(text)
+
+
+def fence_strip(text):
+    """Old ATS parser"""
+    return json.loads(re.sub(r'```json\s*|\s*```', '', text).strip())
+
+
+PARSERS = {
+    'greedy_regex': greedy_regex,
+    'find_rfind': find_rfind,
+    'fence_strip': fence_strip,
+    'extract_json': extract_json
+}
+
+
+def run(func, text, iterations):
+    """
+    Returns:
+        tuple: (median ms or None, ok, number of top-level questions recovered)
+    """
+    try:
+        value = func(text)
+    except (ValueError, JSONExtractionError):
+        return None, False, 0
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        func(text)
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], True, len(value.get('technical_questions', []))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark JSON extraction from LLM replies')
+    parser.add_argument('--questions', type=int, default=100)
+    parser.add_argument('--iterations', type=int, default=100)
+    args = parser.parse_args()
+
+    body = make_reply(args.questions)
+    print(f"Reply size: {len(body) / 1024:.1f} KB, {args.questions} technical questions\n")
+    print(f"{'reply':<11}{'parser':<15}{'median ms':>11}{'recovered':>11}")
+    for shape, text in variants(body).items():
+        for name, func in PARSERS.items():
+            median, ok, recovered = run(func, text, args.iterations)
+            timing = f"{median:>11.3f}" if ok else f"{'failed':>11}"
+            print(f"{shape:<11}{name:<15}{timing}{recovered:>11}")
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+LinkedIn Cleaner Benchmark
+Measures how much text the cleaning stage removes from the fixture pastes and how long it takes
+
+Usage:
+    python benchmarks/bench_linkedin_cleaner.py [--iterations 500]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from linkedin_cleaner import LinkedInTextCleaner  # noqa: E402
+from prompt_builder import estimate_tokens  # noqa: E402
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'linkedin')
+
+
+def run(iterations):
+    """Clean every fixture, print removal stats and per-call latency"""
+    cleaner = LinkedInTextCleaner()
+    paths = sorted(glob.glob(os.path.join(FIXTURE_DIR, '*.txt')))
+    if not paths:
+        print(f"No fixtures found in {FIXTURE_DIR}")
+        return
+
+    print(f"{'fixture':<24}{'chars in':>10}{'chars out':>11}{'removed':>9}"
+          f"{'tokens in':>11}{'tokens out':>12}{'boiler':>8}{'dupes':>7}{'blocks':>8}{'µs/call':>10}")
+
+    total_in = total_out = 0
+    for path in paths:
+        with open(path, encoding='utf-8') as fixture:
+            text = fixture.read()
+
+        result = cleaner.clean(text)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            cleaner.clean(text)
+        per_call_us = (time.perf_counter() - start) / iterations * 1e6
+
+        stats = result.stats
+        total_in += stats['chars_in']
+        total_out += stats['chars_out']
+        print(f"{os.path.basename(path):<24}{stats['chars_in']:>10}{stats['chars_out']:>11}"
+              f"{stats['removed_pct']:>8}%{estimate_tokens(text):>11}{estimate_tokens(result.text):>12}"
+              f"{stats['boilerplate_lines']:>8}{stats['duplicate_lines']:>7}{stats['block_lines']:>8}"
+              f"{per_call_us:>10.1f}")
+
+    print(f"\nCorpus: {total_in} → {total_out} chars "
+          f"({100 * (1 - total_out / total_in):.1f}% removed) across {len(paths)} fixtures")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=500, help='cleaning calls per fixture')
+    run(parser.parse_args().iterations)
@@ -0,0 +1,108 @@
+"""
+Response Serialization Benchmark
+Times building and serializing each analyzer's fallback response with Flask's default
+JSON provider and with FastJSONProvider, and counts the bytes allocated per response
+
+Usage:
+    python benchmarks/bench_results.py
+    python benchmarks/bench_results.py --size huge --iterations 2000
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+os.environ['GEMINI_API_KEY'] = ''
+os.environ['GEMINI_BASE_URL'] = ''
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+from synthetic import SIZES, make_profile, make_job_description  # noqa: E402
+from json_provider import FastJSONProvider  # noqa: E402
+from ats_analyzer import ATSAnalyzer  # noqa: E402
+from skill_gap_analyzer import SkillGapAnalyzer  # noqa: E402
+from career_path_advisor import CareerPathAdvisor  # noqa: E402
+from interview_question_generator import InterviewQuestionGenerator  # noqa: E402
+
+
+class DictJSONProvider(DefaultJSONProvider):
+    """Flask's stock provider, taught to expand results the way the old handlers built dicts"""
+
+    @staticmethod
+    def default(obj):
+        if hasattr(obj, 'to_json'):
+            return obj.to_json()
+        return DefaultJSONProvider.default(obj)
+
+
+def build_responses(size):
+    """(name, callable returning the route payload) for each analyzer's fallback path"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        ats = ATSAnalyzer()
+        skill_gap = SkillGapAnalyzer()
+        career = CareerPathAdvisor()
+        interview = InterviewQuestionGenerator()
+    profile = make_profile(size)
+    jd = make_job_description(size)
+
+    def interview_payload():
+        result = interview._generate_basic_questions(profile, jd)
+        return {'success': True, 'questions': result, 'total_questions': result.total_questions,
+                'method': result.method}
+
+    return [
+        ('ats', lambda: {'success': True, 'analysis': ats._get_fallback_analysis(profile, jd)}),
+        ('skill_gap', lambda: {'success': True, 'analysis': skill_gap._basic_skill_analysis(profile, jd)}),
+        ('career_path', lambda: {'success': True, 'analysis': career._basic_career_analysis(profile, None, 5)}),
+        ('interview_questions', interview_payload)
+    ]
+
+
+def measure(build, provider, iterations):
+    """
+    Returns:
+        tuple: (median microseconds, bytes allocated per response)
+    """
+    samples = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(iterations):
+            t0 = time.perf_counter()
+            provider.dumps(build(), separators=(',', ':'))
+            samples.append((time.perf_counter() - t0) * 1e6)
+
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        provider.dumps(build(), separators=(',', ':'))
+        peak = tracemalloc.get_traced_memory()[1] - before
+        tracemalloc.stop()
+    samples.sort()
+    return samples[len(samples) // 2], peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark response building and serialization')
+    parser.add_argument('--size', choices=list(SIZES), default='large')
+    parser.add_argument('--iterations', type=int, default=1000)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    providers = {'flask_default': DictJSONProvider(app), 'fast': FastJSONProvider(app)}
+
+    print(f"Profile size: {args.size}\n")
+    print(f"{'response':<22}{'provider':<15}{'median µs':>11}{'peak bytes':>12}")
+    for name, build in build_responses(args.size):
+        for provider_name, provider in providers.items():
+            median, peak = measure(build, provider, args.iterations)
+            print(f"{name:<22}{provider_name:<15}{median:>11.1f}{peak:>12,}")
+
+
+if __name__ == '__main__':
+    main()
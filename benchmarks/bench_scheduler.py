@@ -0,0 +1,93 @@
+"""
+LLM Scheduler Benchmark
+Queues a large batch of Gemini calls against the fake Gemini server, then sends a few
+interactive calls while the batch is running, and reports how long the interactive
+calls took with the scheduler and with every call in one class and tenant (first come,
+first served)
+
+A second tenant's small batch is queued behind the first tenant's large one; with weighted
+fair queuing it finishes about as soon as its share of the batch slots allows instead of
+after the whole large batch.
+
+Usage:
+    python benchmarks/bench_scheduler.py
+    python benchmarks/bench_scheduler.py --batch 500 --capacity 16 --batch-limit 12
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_gemini_server import serve, LatencyModel  # noqa: E402
+from key_pool import KeyPool  # noqa: E402
+from llm_client import LLMClient  # noqa: E402
+from llm_scheduler import LLMScheduler, set_llm_context  # noqa: E402
+
+
+async def scenario(client, args, scheduled):
+    """
+    Large batch, small batch from another tenant, then interactive calls
+
+    Args:
+        scheduled (bool): Use priority classes and tenants; otherwise every call is the
+            same class and tenant, i.e. first come, first served
+
+    Returns:
+        tuple: Latencies in ms of the interactive, small batch and large batch calls
+    """
+    async def call(index, priority, tenant):
+        if scheduled:
+            set_llm_context(priority, tenant)
+        start = time.perf_counter()
+        await client.generate_async(f"You are an expert ATS (Applicant Tracking System) analyzer.\n"
+                                    f"Name: {tenant} {index}\n", endpoint='ats')
+        return (time.perf_counter() - start) * 1000
+
+    large = [asyncio.create_task(call(i, 'batch', 'nightly')) for i in range(args.batch)]
+    small = [asyncio.create_task(call(i, 'batch', 'acme')) for i in range(args.small_batch)]
+    await asyncio.sleep(args.latency_ms / 1000)
+    interactive = [asyncio.create_task(call(i, 'interactive', 'dashboard')) for i in range(args.interactive)]
+    interactive_ms = await asyncio.gather(*interactive)
+    small_ms = await asyncio.gather(*small)
+    large_ms = await asyncio.gather(*large)
+    return interactive_ms, small_ms, large_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Interactive latency under a batch backlog')
+    parser.add_argument('--batch', type=int, default=200, help='calls in the large batch')
+    parser.add_argument('--small-batch', type=int, default=10, help="calls in the second tenant's batch")
+    parser.add_argument('--interactive', type=int, default=10, help='interactive calls sent during the batch')
+    parser.add_argument('--capacity', type=int, default=8, help='Gemini calls in flight')
+    parser.add_argument('--batch-limit', type=int, default=6, help='calls in flight for the batch class')
+    parser.add_argument('--latency-ms', type=float, default=100)
+    parser.add_argument('--port', type=int, default=8099)
+    args = parser.parse_args()
+
+    server = serve(port=args.port, latency=LatencyModel('fixed', args.latency_ms))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    print(f"{args.batch} + {args.small_batch} batch calls, {args.interactive} interactive, "
+          f"{args.capacity} in flight ({args.batch_limit} for batch), {args.latency_ms:.0f}ms per call")
+    print(f"{'mode':<13}{'interactive p50':>16}{'max':>8}{'small batch max':>17}{'large batch max':>17}")
+    for mode, scheduled in (('fifo', False), ('scheduled', True)):
+        scheduler = LLMScheduler(capacity=args.capacity, limits={'batch': args.batch_limit})
+        client = LLMClient(base_url=base_url, coalesce=False, json_mode=False, keys=KeyPool(['bench-key']),
+                           scheduler=scheduler)
+        interactive_ms, small_ms, large_ms = asyncio.run(scenario(client, args, scheduled))
+        print(f"{mode:<13}{statistics.median(interactive_ms):>14.0f}ms{max(interactive_ms):>6.0f}ms"
+              f"{max(small_ms):>15.0f}ms{max(large_ms):>15.0f}ms")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
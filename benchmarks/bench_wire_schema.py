@@ -0,0 +1,110 @@
+"""
+Wire Schema Benchmark
+Runs each JSON analyzer against the fake Gemini server with WIRE_FORMAT=verbose and
+WIRE_FORMAT=compact and compares output tokens and latency per endpoint
+
+The fake server answers compact prompts with the same content compacted, and adds
+--ms-per-output-token of generation time per token, so latency follows reply length
+the way it does on a real model. Expanded compact results must equal the verbose ones.
+
+Usage:
+    python benchmarks/bench_wire_schema.py
+    python benchmarks/bench_wire_schema.py --runs 10 --ms-per-output-token 15
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_gemini_server import serve, LatencyModel  # noqa: E402
+from synthetic import make_profile, make_job_description  # noqa: E402
+
+MODES = ('verbose', 'compact')
+
+
+def endpoints(job_description):
+    """(endpoint, fake server analyzer, call) per JSON analyzer; imported after GEMINI_BASE_URL is set"""
+    from ats_analyzer import ATSAnalyzer
+    from skill_gap_analyzer import SkillGapAnalyzer
+    from career_path_advisor import CareerPathAdvisor
+    from interview_question_generator import InterviewQuestionGenerator
+
+    ats, skill_gap = ATSAnalyzer(), SkillGapAnalyzer()
+    career, interview = CareerPathAdvisor(), InterviewQuestionGenerator(sharded=False)
+    return [
+        ('ats', 'ats', lambda profile: ats.analyze_resume(profile, job_description)),
+        ('skill_gap', 'skill_gap', lambda profile: skill_gap.analyze_skill_gap(profile, job_description)),
+        ('career_path', 'career_path', lambda profile: career.analyze_career_path(profile)),
+        ('interview', 'interview_questions', lambda profile: interview.generate_questions(profile, job_description))
+    ]
+
+
+def measure(fake, analyzer, call, profiles):
+    """Run call over the profiles; returns (output tokens per call, latencies in ms, results)"""
+    before = fake.output_tokens.get(analyzer, 0)
+    latencies, results = [], []
+    for profile in profiles:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = call(profile)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(result.to_json())
+    tokens = (fake.output_tokens.get(analyzer, 0) - before) / len(profiles)
+    return tokens, latencies, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare verbose and compact LLM reply formats')
+    parser.add_argument('--runs', type=int, default=5, help='calls per endpoint and mode')
+    parser.add_argument('--latency-ms', type=float, default=50, help='fixed fake Gemini latency')
+    parser.add_argument('--ms-per-output-token', type=float, default=10, help='generation time per output token')
+    parser.add_argument('--port', type=int, default=8097)
+    args = parser.parse_args()
+
+    server = serve(port=args.port, latency=LatencyModel('fixed', args.latency_ms),
+                   ms_per_output_token=args.ms_per_output_token)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    fake = server.RequestHandlerClass.fake
+
+    os.environ['GEMINI_BASE_URL'] = f"http://127.0.0.1:{args.port}"
+    os.environ['GEMINI_API_KEY'] = 'fake'
+    import wire_schema  # noqa: E402
+
+    profiles = [make_profile('medium', seed=seed) for seed in range(args.runs)]
+    job_description = make_job_description('medium')
+    mismatches = 0
+    print(f"{'endpoint':<13}{'mode':<9}{'out tokens':>11}{'p50 ms':>9}{'mean ms':>9}  same result")
+    for endpoint, analyzer, call in endpoints(job_description):
+        measured = {}
+        for mode in MODES:
+            wire_schema.WIRE_FORMAT = mode
+            measured[mode] = measure(fake, analyzer, call, profiles)
+        same = measured['compact'][2] == measured['verbose'][2]
+        mismatches += not same
+        for mode in MODES:
+            tokens, latencies, _ = measured[mode]
+            print(f"{endpoint:<13}{mode:<9}{tokens:>11.0f}{statistics.median(latencies):>9.0f}"
+                  f"{statistics.mean(latencies):>9.0f}  {same if mode == 'compact' else ''}")
+        verbose_tokens, compact_tokens = measured['verbose'][0], measured['compact'][0]
+        verbose_ms = statistics.mean(measured['verbose'][1])
+        compact_ms = statistics.mean(measured['compact'][1])
+        print(f"{'':<13}{'saved':<9}{1 - compact_tokens / verbose_tokens:>11.0%}{'':>9}"
+              f"{1 - compact_ms / verbose_ms:>9.0%}")
+
+    server.shutdown()
+    if mismatches:
+        print(f"\n❌ {mismatches} endpoint(s) expanded compact replies differently from verbose ones")
+        sys.exit(1)
+    print("\n✅ Compact replies expand to the same results as verbose ones")
+
+
+if __name__ == '__main__':
+    main()
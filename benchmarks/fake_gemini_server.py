@@ -0,0 +1,337 @@
+"""
+Fake Gemini Server
+Stand-in for the Gemini generateContent REST API so the app can be load-tested
+and regression-tested without spending quota
+
+Responses are canned per analyzer (benchmarks/fixtures/gemini/) and templated with
+the candidate's name and title taken from the prompt. Prompts that ask for the compact
+wire format (wire_schema.py) get the same content compacted and minified. Latency and
+failures are drawn from configurable distributions; --ms-per-output-token adds the
+generation time that makes real latency grow with the length of the reply. Requests
+in JSON mode (generationConfig.responseMimeType) never get malformed output.
+--key-rpm enforces a per-API-key quota the way Gemini does: requests beyond it within
+a minute get 429 RESOURCE_EXHAUSTED with a RetryInfo delay.
+
+Usage:
+    python benchmarks/fake_gemini_server.py --port 8090 --latency lognormal --latency-ms 800 --error-rate 0.02
+    GEMINI_BASE_URL=http://127.0.0.1:8090 GEMINI_API_KEY=fake python app.py
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from urllib.parse import urlsplit, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wire_schema import COMPACT_MARKER, ATS_WIRE, SKILL_GAP_WIRE, CAREER_PATH_WIRE, INTERVIEW_WIRE  # noqa: E402
+
+# Compact reply format per analyzer, used when the prompt asks for it
+WIRE_SCHEMAS = {
+    'ats': ATS_WIRE,
+    'skill_gap': SKILL_GAP_WIRE,
+    'career_path': CAREER_PATH_WIRE,
+    'interview_questions': INTERVIEW_WIRE
+}
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'gemini')
+
+# First matching marker phrase in the prompt decides which analyzer is calling
+PROMPT_MARKERS = [
+    ('ats', 'ATS (Applicant Tracking System)'),
+    ('skill_gap', 'Analyze the skill gap'),
+    ('career_path', 'expert career advisor'),
+    ('interview_questions', 'interview coach'),
+    ('cover_letter', 'cover letter writer'),
+    ('linkedin_parse', 'LinkedIn profile data extractor'),
+]
+
+NAME_PATTERN = re.compile(r"^Name: *(.+)$", re.MULTILINE)
+TITLE_PATTERN = re.compile(r"^(?:Current Role|Current/Recent Role|Headline): *(.+)$", re.MULTILINE)
+
+# HTTP status and Gemini error status returned for injected failures
+ERRORS = [
+    (429, 'RESOURCE_EXHAUSTED', 'Resource has been exhausted (e.g. check quota).'),
+    (500, 'INTERNAL', 'An internal error has occurred.'),
+    (503, 'UNAVAILABLE', 'The model is overloaded. Please try again later.'),
+]
+
+
+def load_responses(fixture_dir=FIXTURE_DIR):
+    """
+    Load the canned response template for each analyzer
+
+    Returns:
+        dict: Analyzer name -> string.Template of the response text
+    """
+    responses = {}
+    for filename in os.listdir(fixture_dir):
+        name, ext = os.path.splitext(filename)
+        if ext in ('.json', '.txt'):
+            with open(os.path.join(fixture_dir, filename), encoding='utf-8') as f:
+                responses[name] = Template(f.read())
+    return responses
+
+
+class LatencyModel:
+    """Draws per-request latency (seconds) from a named distribution"""
+
+    def __init__(self, kind='fixed', median_ms=500, spread=0.5, seed=None):
+        """
+        Args:
+            kind (str): fixed, uniform, normal, lognormal or pareto
+            median_ms (float): Typical latency in milliseconds
+            spread (float): Relative spread (uniform/normal), sigma (lognormal) or
+                1/alpha (pareto: 0.5 puts p99 at about 7x the median)
+        """
+        self.kind = kind
+        self.median = median_ms / 1000
+        self.spread = spread
+        self.random = random.Random(seed)
+
+    def sample(self):
+        """Return one latency draw in seconds"""
+        if self.kind == 'uniform':
+            value = self.random.uniform(self.median * (1 - self.spread), self.median * (1 + self.spread))
+        elif self.kind == 'normal':
+            value = self.random.gauss(self.median, self.median * self.spread)
+        elif self.kind == 'lognormal':
+            value = self.random.lognormvariate(math.log(self.median), self.spread)
+        elif self.kind == 'pareto':
+            # Heavy tail: most replies near the median, a few many times slower
+            alpha = 1 / self.spread
+            value = self.median * self.random.paretovariate(alpha) / 2 ** (1 / alpha)
+        else:
+            value = self.median
+        return max(0.0, value)
+
+
+class FakeGemini:
+    """Shared state for the request handler: responses, latency model, failure rates and counters"""
+
+    def __init__(self, latency, error_rate=0.0, malformed_rate=0.0, seed=None, ms_per_output_token=0.0,
+                 key_rpm=0):
+        self.responses = load_responses()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.ms_per_output_token = ms_per_output_token
+        self.random = random.Random(seed)
+        self.counts = {}
+        # Output tokens sent per analyzer (same len // 4 estimate as usageMetadata)
+        self.output_tokens = {}
+        # Requests allowed per API key per minute (0: unlimited), the send times in the
+        # current window and the per-key outcome counts
+        self.key_rpm = key_rpm
+        self.key_windows = {}
+        self.key_counts = {}
+        self._lock = threading.Lock()
+
+    def classify(self, prompt):
+        """Name of the analyzer that built the prompt ('unknown' if none match)"""
+        for name, marker in PROMPT_MARKERS:
+            if marker in prompt:
+                return name
+        return 'unknown'
+
+    def render(self, analyzer, prompt):
+        """Fill the analyzer's template with the candidate's name and title from the prompt"""
+        template = self.responses.get(analyzer)
+        if template is None:
+            return '{}'
+        name = NAME_PATTERN.search(prompt)
+        title = TITLE_PATTERN.search(prompt)
+        if analyzer == 'linkedin_parse' and not name:
+            # The parse prompt carries the raw paste; the owner's name is its first line
+            body = prompt.split('LinkedIn Profile Text:', 1)[-1].strip()
+            name = body.splitlines()[0] if body else None
+            title = body.splitlines()[1] if body.count('\n') else None
+        else:
+            name = name.group(1) if name else None
+            title = title.group(1) if title else None
+        text = template.safe_substitute(
+            name=json.dumps(name or 'Alex Candidate')[1:-1],
+            title=json.dumps(title or 'Software Engineer')[1:-1]
+        )
+        schema = WIRE_SCHEMAS.get(analyzer)
+        if schema and COMPACT_MARKER in prompt:
+            text = json.dumps(schema.compact(json.loads(text)), separators=(',', ':'))
+        return text
+
+    def admit(self, api_key):
+        """
+        Apply the per-key quota
+
+        Returns:
+            float: None if the request may proceed, else seconds until the key has quota again
+        """
+        with self._lock:
+            counts = self.key_counts.setdefault(api_key, {'ok': 0, 'rate_limited': 0})
+            if not self.key_rpm:
+                counts['ok'] += 1
+                return None
+            now = time.monotonic()
+            window = self.key_windows.setdefault(api_key, deque())
+            while window and now - window[0] >= 60:
+                window.popleft()
+            if len(window) >= self.key_rpm:
+                counts['rate_limited'] += 1
+                return 60 - (now - window[0])
+            window.append(now)
+            counts['ok'] += 1
+            return None
+
+    def record(self, analyzer, outcome, output_tokens=0):
+        """Count requests per analyzer and outcome, and the output tokens sent"""
+        with self._lock:
+            key = f"{analyzer}:{outcome}"
+            self.counts[key] = self.counts.get(key, 0) + 1
+            self.output_tokens[analyzer] = self.output_tokens.get(analyzer, 0) + output_tokens
+
+
+class GeminiHandler(BaseHTTPRequestHandler):
+    """Implements POST /v1beta/models/<model>:generateContent and GET /stats"""
+
+    protocol_version = 'HTTP/1.1'
+    fake = None  # set by serve()
+
+    def log_message(self, format, *args):
+        """Silence per-request logging (it dominates the cost under load)"""
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/stats':
+            self._reply(200, self.fake.counts)
+        elif self.path == '/stats/tokens':
+            self._reply(200, self.fake.output_tokens)
+        elif self.path == '/stats/keys':
+            self._reply(200, self.fake.key_counts)
+        else:
+            self._reply(404, {'error': {'code': 404, 'message': 'Not found', 'status': 'NOT_FOUND'}})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+        if ':generateContent' not in self.path:
+            self._reply(404, {'error': {'code': 404, 'message': 'Not found', 'status': 'NOT_FOUND'}})
+            return
+
+        prompt = ''.join(
+            part.get('text', '')
+            for content in request.get('contents', [])
+            for part in content.get('parts', [])
+        )
+        fake = self.fake
+        analyzer = fake.classify(prompt)
+
+        api_key = parse_qs(urlsplit(self.path).query).get('key', [''])[0]
+        retry_after = fake.admit(api_key)
+        if retry_after is not None:
+            fake.record(analyzer, 429)
+            self._reply(429, {'error': {
+                'code': 429,
+                'message': 'Resource has been exhausted (e.g. check quota).',
+                'status': 'RESOURCE_EXHAUSTED',
+                'details': [{'@type': 'type.googleapis.com/google.rpc.RetryInfo',
+                             'retryDelay': f"{retry_after:.3f}s"}]
+            }})
+            return
+        latency = fake.latency.sample()
+        # Structured-output requests are decoded against the schema, so they never get prose back
+        json_mode = request.get('generationConfig', {}).get('responseMimeType') == 'application/json'
+
+        roll = fake.random.random()
+        if roll < fake.error_rate:
+            time.sleep(latency)
+            status, error_status, message = fake.random.choice(ERRORS)
+            fake.record(analyzer, status)
+            self._reply(status, {'error': {'code': status, 'message': message, 'status': error_status}})
+            return
+
+        if roll < fake.error_rate + fake.malformed_rate and not json_mode:
+            text = 'Sorry, I could not produce JSON for this request.'
+            outcome = 'malformed'
+        else:
+            text = fake.render(analyzer, prompt)
+            outcome = 200
+        output_tokens = len(text) // 4
+        time.sleep(latency + output_tokens * fake.ms_per_output_token / 1000)
+        fake.record(analyzer, outcome, output_tokens)
+
+        self._reply(200, {
+            'candidates': [{
+                'content': {'role': 'model', 'parts': [{'text': text}]},
+                'finishReason': 'STOP',
+                'index': 0
+            }],
+            'usageMetadata': {
+                'promptTokenCount': len(prompt) // 4,
+                'candidatesTokenCount': output_tokens,
+                'totalTokenCount': (len(prompt) + len(text)) // 4
+            }
+        })
+
+
+def serve(host='127.0.0.1', port=8090, latency=None, error_rate=0.0, malformed_rate=0.0, seed=None,
+          ms_per_output_token=0.0, key_rpm=0):
+    """
+    Create the fake Gemini HTTP server (call serve_forever() on the result)
+
+    Returns:
+        ThreadingHTTPServer: Bound server, one thread per connection
+    """
+    handler = type('BoundGeminiHandler', (GeminiHandler,), {
+        'fake': FakeGemini(latency or LatencyModel(), error_rate, malformed_rate, seed, ms_per_output_token, key_rpm)
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.request_queue_size = 512
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake Gemini generateContent server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency', choices=['fixed', 'uniform', 'normal', 'lognormal', 'pareto'], default='lognormal')
+    parser.add_argument('--latency-ms', type=float, default=800, help='median response latency')
+    parser.add_argument('--spread', type=float, default=0.4, help='relative spread, sigma for lognormal, 1/alpha for pareto')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of 429/500/503 replies')
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help='fraction of non-JSON replies')
+    parser.add_argument('--ms-per-output-token', type=float, default=0.0,
+                        help='generation time added per output token (about 5-20ms on real models)')
+    parser.add_argument('--key-rpm', type=int, default=0, help='requests per minute allowed per API key (0: unlimited)')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    latency = LatencyModel(args.latency, args.latency_ms, args.spread, args.seed)
+    server = serve(args.host, args.port, latency, args.error_rate, args.malformed_rate, args.seed,
+                   args.ms_per_output_token, args.key_rpm)
+    print(f"🤖 Fake Gemini listening on http://{args.host}:{args.port} "
+          f"({args.latency} {args.latency_ms:.0f}ms + {args.ms_per_output_token:g}ms/output token, "
+          f"errors {args.error_rate:.0%}, malformed {args.malformed_rate:.0%}"
+          f"{f', {args.key_rpm} rpm per key' if args.key_rpm else ''})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
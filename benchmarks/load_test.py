@@ -0,0 +1,205 @@
+"""
+Load Test
+Drives the app's Gemini-backed endpoints with concurrent requests and reports
+p50/p95/p99 latency and throughput per endpoint
+
+Point the app at benchmarks/fake_gemini_server.py (GEMINI_BASE_URL) so no quota is
+spent, or let this script start both with --serve.
+
+Usage:
+    # start fake Gemini + the app and run the test; compare --serve sync / threaded / asgi
+    python benchmarks/load_test.py --serve asgi --concurrency 32 --requests 200
+
+    # against an app that is already running
+    python benchmarks/load_test.py --base-url http://127.0.0.1:8080 --endpoints /analyze-ats /analyze-skill-gap
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+FIXTURE_DIR = os.path.join(BENCH_DIR, 'fixtures')
+
+
+def _read(*parts):
+    with open(os.path.join(FIXTURE_DIR, *parts), encoding='utf-8') as f:
+        return f.read()
+
+
+def build_payloads():
+    """
+    Request body for each endpoint, built from the benchmark fixtures
+
+    Returns:
+        dict: Endpoint path -> JSON payload
+    """
+    profile = json.loads(_read('profile.json'))
+    job_description = _read('job_description.txt')
+    return {
+        '/analyze-ats': {'profile_data': profile, 'job_description': job_description},
+        '/analyze-skill-gap': {'profile_data': profile, 'job_description': job_description},
+        '/analyze-career-path': {'profile_data': profile, 'target_role': 'Senior Backend Engineer'},
+        '/generate-interview-questions': {'profile_data': profile, 'job_description': job_description},
+        '/generate-cover-letter': {'profile_data': profile, 'job_description': job_description},
+        '/generate': {'linkedin_text': _read('linkedin', 'software_engineer.txt'), 'template': 'modern'},
+    }
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def run_endpoint(session, base_url, path, payload, total, concurrency, timeout):
+    """
+    Send `total` POSTs to one endpoint with `concurrency` in flight
+
+    Returns:
+        dict: Latencies (seconds), status counts and wall time
+    """
+    url = base_url + path
+
+    def one(_):
+        start = time.perf_counter()
+        try:
+            response = session.post(url, json=payload, timeout=timeout)
+            status = response.status_code
+        except requests.RequestException:
+            status = 'error'
+        return time.perf_counter() - start, status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(total)))
+    wall = time.perf_counter() - started
+
+    statuses = {}
+    for _, status in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    return {
+        'latencies': sorted(latency for latency, _ in results),
+        'statuses': statuses,
+        'wall': wall
+    }
+
+
+def report(results):
+    """Print the per-endpoint latency/throughput table"""
+    print(f"\n{'endpoint':<32}{'n':>6}{'ok':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>8}")
+    for path, result in results.items():
+        latencies = result['latencies']
+        ok = result['statuses'].get(200, 0)
+        print(f"{path:<32}{len(latencies):>6}{ok:>6}"
+              f"{percentile(latencies, 50) * 1000:>9.0f}"
+              f"{percentile(latencies, 95) * 1000:>9.0f}"
+              f"{percentile(latencies, 99) * 1000:>9.0f}"
+              f"{len(latencies) / result['wall']:>8.1f}")
+        failures = {k: v for k, v in result['statuses'].items() if k != 200}
+        if failures:
+            print(f"{'':<32}non-200: {failures}")
+
+
+def _wait_for(url, timeout=30):
+    """Poll a URL until it answers (any status) or the timeout expires"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(url, timeout=1)
+            return True
+        except requests.RequestException:
+            time.sleep(0.2)
+    return False
+
+
+def start_servers(mode, app_port, gemini_port, fake_args):
+    """
+    Start the fake Gemini server and the app in subprocesses
+
+    Args:
+        mode (str): 'sync' (one request at a time, like a single sync worker),
+            'threaded' (Flask dev server) or 'asgi' (uvicorn asgi:application)
+
+    Returns:
+        list: Started Popen objects (terminate them when done)
+    """
+    env = dict(os.environ)
+    env['GEMINI_BASE_URL'] = f"http://127.0.0.1:{gemini_port}"
+    env.setdefault('GEMINI_API_KEY', 'fake-key')
+
+    fake = subprocess.Popen(
+        [sys.executable, os.path.join(BENCH_DIR, 'fake_gemini_server.py'), '--port', str(gemini_port)] + fake_args,
+        cwd=REPO_ROOT, env=env
+    )
+    if mode == 'asgi':
+        command = [sys.executable, '-m', 'uvicorn', 'asgi:application', '--port', str(app_port), '--log-level', 'warning']
+    else:
+        command = [sys.executable, '-m', 'flask', '--app', 'app', 'run', '--port', str(app_port)]
+        if mode == 'sync':
+            command.append('--without-threads')
+    app = subprocess.Popen(command, cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL)
+
+    processes = [fake, app]
+    if not (_wait_for(f"http://127.0.0.1:{gemini_port}/stats") and _wait_for(f"http://127.0.0.1:{app_port}/")):
+        for process in processes:
+            process.terminate()
+        raise RuntimeError('Servers did not start in time')
+    return processes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the Gemini-backed endpoints')
+    parser.add_argument('--base-url', default=None, help='app URL (default: the one started by --serve)')
+    parser.add_argument('--serve', choices=['sync', 'threaded', 'asgi'], default=None,
+                        help='start the fake Gemini server and the app before testing')
+    parser.add_argument('--app-port', type=int, default=8081)
+    parser.add_argument('--gemini-port', type=int, default=8090)
+    parser.add_argument('--endpoints', nargs='+', default=None, help='subset of endpoint paths to test')
+    parser.add_argument('--requests', type=int, default=100, help='requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--timeout', type=float, default=120)
+    parser.add_argument('--fake-args', default='--latency lognormal --latency-ms 800',
+                        help='extra arguments for fake_gemini_server.py when using --serve')
+    args = parser.parse_args()
+
+    payloads = build_payloads()
+    endpoints = args.endpoints or list(payloads)
+    unknown = [path for path in endpoints if path not in payloads]
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(unknown)}")
+
+    processes = []
+    if args.serve:
+        processes = start_servers(args.serve, args.app_port, args.gemini_port, args.fake_args.split())
+    base_url = (args.base_url or f"http://127.0.0.1:{args.app_port}").rstrip('/')
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=args.concurrency)
+    session.mount('http://', adapter)
+
+    try:
+        print(f"🚀 {args.requests} requests per endpoint, concurrency {args.concurrency}, target {base_url}"
+              + (f" ({args.serve})" if args.serve else ''))
+        results = {}
+        for path in endpoints:
+            results[path] = run_endpoint(session, base_url, path, payloads[path],
+                                         args.requests, args.concurrency, args.timeout)
+            print(f"   ✓ {path}")
+        report(results)
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
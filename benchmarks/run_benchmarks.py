@@ -0,0 +1,236 @@
+"""
+Benchmark Suite
+Times the regex parser, every PDF template, the cover letter PDF and all fallback analyzers
+on synthetic profiles from small to huge, saves JSON results and compares them with a baseline
+
+Gemini is disabled for the run, so only local code paths are measured.
+
+Usage:
+    python benchmarks/run_benchmarks.py                      # run, save results, compare with baseline.json
+    python benchmarks/run_benchmarks.py --filter pdf         # only cases whose name contains "pdf"
+    python benchmarks/run_benchmarks.py --save-baseline      # make this run the new baseline
+    python benchmarks/run_benchmarks.py --fail-on-regression # exit 1 if a case got slower
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+# Measure the local paths only: no Gemini key, no fake server
+os.environ['GEMINI_API_KEY'] = ''
+os.environ['GEMINI_BASE_URL'] = ''
+
+from synthetic import SIZES, make_profile, make_linkedin_paste, make_job_description  # noqa: E402
+from linkedin_parser import LinkedInParser  # noqa: E402
+from resume_generator import ResumeGenerator  # noqa: E402
+from cover_letter_generator import CoverLetterGenerator  # noqa: E402
+from ats_analyzer import ATSAnalyzer  # noqa: E402
+from skill_gap_analyzer import SkillGapAnalyzer  # noqa: E402
+from career_path_advisor import CareerPathAdvisor  # noqa: E402
+from interview_question_generator import InterviewQuestionGenerator  # noqa: E402
+from jd_cache import JobRequirements, get_jd_cache  # noqa: E402
+from question_bank import get_question_bank  # noqa: E402
+
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+TEMPLATES = ('modern', 'classic', 'executive', 'creative')
+
+# A case is a regression when its median is this much slower than the baseline
+# and the difference is also above the absolute noise floor
+DEFAULT_THRESHOLD = 0.25
+NOISE_FLOOR_MS = 0.05
+
+
+def build_cases():
+    """
+    Every benchmark case as (name, callable)
+
+    Returns:
+        list: (str, function) pairs, one per component and profile size
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser = LinkedInParser()
+        resume = ResumeGenerator()
+        cover_letter = CoverLetterGenerator()
+        ats = ATSAnalyzer()
+        skill_gap = SkillGapAnalyzer()
+        career = CareerPathAdvisor()
+        interview = InterviewQuestionGenerator()
+        bank = get_question_bank()
+
+    # Twenty distinct postings per size, as a user comparing saved jobs would send
+    saved_jobs = {size: [f"{make_job_description(size)}\nReference: posting {i}" for i in range(20)] for size in SIZES}
+
+    cases = []
+    for size in SIZES:
+        profile = make_profile(size)
+        paste = make_linkedin_paste(profile)
+        jd = make_job_description(size)
+
+        cases.append((f"parse_regex/{size}", lambda paste=paste: parser.parse_linkedin_text(paste)))
+        for template in TEMPLATES:
+            cases.append((f"pdf_resume_{template}/{size}",
+                          lambda profile=profile, template=template: resume.create_resume(profile, template=template)))
+        cases.append((f"pdf_cover_letter/{size}",
+                      lambda profile=profile, jd=jd: cover_letter.create_cover_letter_pdf(profile, jd)))
+        cases.append((f"jd_extract/{size}", lambda jd=jd: JobRequirements.extract(jd)))
+        cases.append((f"jd_cache_hit/{size}", lambda jd=jd: get_jd_cache().get(jd).to_prompt()))
+        cases.append((f"fallback_ats/{size}", lambda profile=profile, jd=jd: ats._get_fallback_analysis(profile, jd)))
+        cases.append((f"fallback_ats_keywords/{size}", lambda profile=profile, jd=jd: ats.analyze_keywords(profile, jd)))
+        cases.append((f"batch_skill_gap_20/{size}",
+                      lambda profile=profile, size=size: skill_gap._rank_job_descriptions(
+                          profile, saved_jobs[size], skill_gap._format_profile(profile))))
+        cases.append((f"fallback_skill_gap/{size}",
+                      lambda profile=profile, jd=jd: skill_gap._basic_skill_analysis(profile, jd)))
+        cases.append((f"fallback_career_path/{size}",
+                      lambda profile=profile: career._basic_career_analysis(profile, None, 5)))
+        # Cold: the question bank's selection memo is cleared, so ranking is measured too
+        cases.append((f"fallback_interview_questions/{size}",
+                      lambda profile=profile, jd=jd: (bank._selection.cache_clear(),
+                                                      interview._generate_basic_questions(profile, jd))))
+        cases.append((f"fallback_interview_questions_warm/{size}",
+                      lambda profile=profile, jd=jd: interview._generate_basic_questions(profile, jd)))
+        cases.append((f"fallback_cover_letter/{size}",
+                      lambda profile=profile, jd=jd: cover_letter._generate_basic_cover_letter(profile, jd)))
+    return cases
+
+
+def measure(func, min_time, min_iterations, max_iterations):
+    """
+    Time a callable repeatedly (after one warm-up call)
+
+    Returns:
+        dict: iterations, min/median/p95/mean in milliseconds
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        func()
+        samples = []
+        started = time.perf_counter()
+        while len(samples) < max_iterations and (
+                len(samples) < min_iterations or time.perf_counter() - started < min_time):
+            t0 = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        'iterations': len(samples),
+        'min_ms': round(samples[0], 4),
+        'median_ms': round(samples[len(samples) // 2], 4),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        'mean_ms': round(sum(samples) / len(samples), 4)
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ''
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare medians against a baseline run
+
+    Returns:
+        list: Names of cases that regressed
+    """
+    regressions = []
+    print(f"\n{'case':<42}{'baseline ms':>13}{'now ms':>11}{'change':>9}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<42}{'-':>13}{result['median_ms']:>11.3f}{'new':>9}")
+            continue
+        change = result['median_ms'] / base['median_ms'] - 1 if base['median_ms'] else 0.0
+        slower = result['median_ms'] - base['median_ms']
+        flag = ''
+        if change > threshold and slower > NOISE_FLOOR_MS:
+            regressions.append(name)
+            flag = '  ⚠️ regression'
+        print(f"{name:<42}{base['median_ms']:>13.3f}{result['median_ms']:>11.3f}{change:>+9.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the benchmark suite')
+    parser.add_argument('--filter', default=None, help='only run cases whose name contains this text')
+    parser.add_argument('--min-time', type=float, default=0.5, help='seconds to spend per case')
+    parser.add_argument('--min-iterations', type=int, default=5)
+    parser.add_argument('--max-iterations', type=int, default=1000)
+    parser.add_argument('--output', default=None, help='results file (default: benchmarks/results/<timestamp>.json)')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help='write this run to the baseline file')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative slowdown that counts as a regression (0.25 = 25%%)')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    results = {}
+
+    # The generators write PDFs under the working directory; keep them out of the repo
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            cases = [(name, func) for name, func in build_cases() if not args.filter or args.filter in name]
+            for name, func in cases:
+                results[name] = measure(func, args.min_time, args.min_iterations, args.max_iterations)
+                print(f"  {name:<42}{results[name]['median_ms']:>10.3f} ms  (n={results[name]['iterations']})")
+        finally:
+            os.chdir(cwd)
+
+    run = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform()
+        },
+        'results': results
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y%m%dT%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(run, f, indent=2)
+    print(f"\n💾 Results saved to {output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=2)
+        print(f"📌 Baseline updated: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against (run with --save-baseline to create one)")
+        return
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    print(f"Comparing with baseline from {baseline['meta'].get('commit') or 'unknown commit'} "
+          f"({baseline['meta'].get('timestamp', '')})")
+    regressions = compare(results, baseline['results'], args.threshold)
+    if regressions:
+        print(f"\n⚠️  {len(regressions)} regression(s): {', '.join(regressions)}")
+        if args.fail_on_regression:
+            sys.exit(1)
+    else:
+        print("\n✅ No regressions")
+
+
+if __name__ == '__main__':
+    main()
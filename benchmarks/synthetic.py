@@ -0,0 +1,159 @@
+"""
+Synthetic Data
+Deterministic profile, LinkedIn paste and job description generators for the benchmarks,
+from small profiles up to huge ones
+"""
+import random
+
+# Profile shape for each size bucket
+SIZES = {
+    'small': {'experience': 1, 'education': 1, 'skills': 5, 'about_sentences': 2, 'bullets': 2},
+    'medium': {'experience': 4, 'education': 2, 'skills': 15, 'about_sentences': 5, 'bullets': 4},
+    'large': {'experience': 10, 'education': 3, 'skills': 40, 'about_sentences': 10, 'bullets': 6},
+    'huge': {'experience': 30, 'education': 5, 'skills': 100, 'about_sentences': 25, 'bullets': 10},
+}
+
+FIRST_NAMES = ['Jordan', 'Priya', 'Mateo', 'Aisha', 'Chen', 'Olivia', 'Kwame', 'Sofia', 'Liam', 'Hana']
+LAST_NAMES = ['Rivera', 'Sharma', 'Garcia', 'Okafor', 'Wei', 'Nguyen', 'Mensah', 'Rossi', 'Murphy', 'Sato']
+TITLES = ['Software Engineer', 'Data Analyst', 'Product Manager', 'DevOps Engineer', 'Data Scientist',
+          'Backend Engineer', 'Frontend Developer', 'Engineering Manager', 'QA Engineer', 'Solutions Architect']
+LEVELS = ['Junior', '', 'Senior', 'Lead', 'Principal']
+COMPANIES = ['Acme Corp', 'Initech', 'Globex', 'Umbrella Analytics', 'Hooli', 'Stark Industries',
+             'Wayne Enterprises', 'Soylent Labs', 'Cyberdyne Systems', 'Vandelay Industries']
+SCHOOLS = ['State University', 'Institute of Technology', 'City College', 'Polytechnic University',
+           'National University']
+DEGREES = [('Bachelor of Science', 'Computer Science'), ('Master of Science', 'Data Science'),
+           ('Bachelor of Engineering', 'Electrical Engineering'), ('MBA', 'Business Administration'),
+           ('Bachelor of Arts', 'Economics')]
+SKILLS = ['Python', 'Java', 'JavaScript', 'TypeScript', 'Go', 'Rust', 'C++', 'SQL', 'PostgreSQL', 'MySQL',
+          'MongoDB', 'Redis', 'Kafka', 'RabbitMQ', 'Docker', 'Kubernetes', 'Terraform', 'Ansible', 'AWS',
+          'GCP', 'Azure', 'Linux', 'Git', 'CI/CD', 'Jenkins', 'GitHub Actions', 'React', 'Vue.js', 'Angular',
+          'Node.js', 'Django', 'Flask', 'FastAPI', 'Spring Boot', 'GraphQL', 'REST APIs', 'gRPC',
+          'Microservices', 'System Design', 'Machine Learning', 'TensorFlow', 'PyTorch', 'Pandas', 'NumPy',
+          'Spark', 'Airflow', 'dbt', 'Tableau', 'Power BI', 'Excel', 'Statistics', 'A/B Testing',
+          'Data Visualization', 'ETL', 'Snowflake', 'BigQuery', 'Prometheus', 'Grafana', 'Elasticsearch',
+          'Agile', 'Scrum', 'Jira', 'Product Strategy', 'Roadmapping', 'Stakeholder Management',
+          'Leadership', 'Mentoring', 'Communication', 'Problem Solving', 'Project Management']
+VERBS = ['Built', 'Led', 'Designed', 'Migrated', 'Optimized', 'Automated', 'Launched', 'Scaled',
+         'Reduced', 'Improved']
+OBJECTS = ['the billing API', 'a real-time analytics pipeline', 'the onboarding flow', 'our CI pipeline',
+           'a recommendation service', 'the data warehouse', 'an internal developer platform',
+           'the search backend', 'customer-facing dashboards', 'the mobile release process']
+RESULTS = ['cutting p95 latency by 40%', 'serving 2M requests per day', 'saving $200K per year',
+           'reducing incidents by 60%', 'growing weekly active users by 25%', 'halving deploy time',
+           'improving data freshness from 24h to 15 minutes', 'raising test coverage to 85%']
+ABOUT = ['I build reliable systems that teams depend on.', 'I enjoy turning ambiguous problems into shipped products.',
+         'My focus is on measurable performance and developer experience.',
+         'I have mentored engineers across several teams.', 'I care about clear code and clear communication.',
+         'Recently I have been working on data-intensive applications.']
+
+
+def _bullet(rng):
+    return f"{rng.choice(VERBS)} {rng.choice(OBJECTS)}, {rng.choice(RESULTS)}."
+
+
+def make_profile(size='medium', seed=0):
+    """
+    Build a parsed-profile dict in the shape LinkedInParser returns
+
+    Args:
+        size (str): small, medium, large or huge
+        seed (int): Random seed (same seed, same profile)
+
+    Returns:
+        dict: Profile data
+    """
+    shape = SIZES[size]
+    rng = random.Random(f"{size}:{seed}")
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    title = rng.choice(TITLES)
+
+    experience = []
+    year = 2025
+    for i in range(shape['experience']):
+        start = year - rng.randint(1, 3)
+        level = LEVELS[max(0, 3 - i)] if i < 4 else ''
+        experience.append({
+            'title': f"{level} {title}".strip() if i else f"{rng.choice(LEVELS[1:])} {title}".strip(),
+            'company': rng.choice(COMPANIES),
+            'duration': f"Jan {start} - {'Present' if i == 0 else f'Dec {year}'}",
+            'description': ' '.join(_bullet(rng) for _ in range(shape['bullets']))
+        })
+        year = start - 1
+
+    education = []
+    for i in range(shape['education']):
+        degree, field = rng.choice(DEGREES)
+        education.append({
+            'school': rng.choice(SCHOOLS),
+            'degree': degree,
+            'field': field,
+            'dates': f"{year - 4 - 4 * i} - {year - 4 * i}"
+        })
+
+    skills = rng.sample(SKILLS, min(shape['skills'], len(SKILLS)))
+    while len(skills) < shape['skills']:
+        skills.append(f"{rng.choice(SKILLS)} {len(skills)}")
+
+    return {
+        'name': name,
+        'headline': f"{experience[0]['title']} at {experience[0]['company']}",
+        'about': ' '.join(rng.choice(ABOUT) for _ in range(shape['about_sentences'])),
+        'experience': experience,
+        'education': education,
+        'skills': skills,
+        'contact': {
+            'email': f"{name.lower().replace(' ', '.')}@example.com",
+            'phone': '',
+            'location': 'Austin, Texas, United States'
+        }
+    }
+
+
+def make_linkedin_paste(profile):
+    """
+    Render a profile as a Ctrl+A LinkedIn paste, with navigation chrome, duplicated
+    lines and a sidebar like the real thing
+
+    Returns:
+        str: Paste text
+    """
+    lines = ['Skip to main content', 'Home', 'My Network', 'Jobs', 'Messaging', '3 notifications',
+             'Notifications', 'Me', 'For Business', 'Try Premium for $0', '',
+             profile['name'], profile['name'], profile['headline'],
+             profile['contact']['location'], 'Contact info', '500+ connections', 'Open to', 'More', '',
+             'About', 'About', profile['about'], '…see more', '', 'Experience', 'Experience']
+    for exp in profile['experience']:
+        lines += [exp['title'], exp['title'], f"{exp['company']} · Full-time",
+                  exp['duration'], exp['duration'], profile['contact']['location'], exp['description'], '']
+    lines += ['Education', 'Education']
+    for edu in profile['education']:
+        lines += [edu['school'], edu['school'], f"{edu['degree']}, {edu['field']}", edu['dates'], '']
+    lines += ['Skills', 'Skills']
+    for skill in profile['skills']:
+        lines += [skill, skill, f"{len(skill) % 7 + 1} endorsements", '']
+    lines += ['Show all skills', '', 'People also viewed', 'Alex Example', '· 2nd', 'Recruiter at Globex',
+              'Connect', 'Sam Sample', '· 3rd', 'Engineer at Initech', 'Connect', '',
+              'About', 'Accessibility', 'Talent Solutions', 'Privacy & Terms']
+    return '\n'.join(lines)
+
+
+def make_job_description(size='medium', seed=0):
+    """
+    Build a job description whose length scales with size
+
+    Returns:
+        str: Job description text
+    """
+    shape = SIZES[size]
+    rng = random.Random(f"jd:{size}:{seed}")
+    title = rng.choice(TITLES)
+    required = rng.sample(SKILLS, min(len(SKILLS), max(6, shape['skills'] // 2)))
+    lines = [f"{rng.choice(LEVELS[1:])} {title}".strip(), '',
+             f"We are looking for a {title} to join our team at {rng.choice(COMPANIES)}.", '',
+             'Responsibilities']
+    lines += [f"- {_bullet(rng)}" for _ in range(shape['bullets'] + 2)]
+    lines += ['', 'Requirements', f"- {rng.randint(2, 8)}+ years of professional experience"]
+    lines += [f"- Experience with {skill}" for skill in required]
+    lines += ['', 'Nice to have'] + [f"- {skill}" for skill in rng.sample(SKILLS, 4)]
+    return '\n'.join(lines)
@@ -0,0 +1,321 @@
+"""
+Career Graph
+Bundled role-progression graph (titles, levels, typical transitions, required skills),
+indexed for normalized-title lookup and multi-hop path search without an LLM
+"""
+import heapq
+import json
+import os
+import re
+from functools import lru_cache
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+CAREER_GRAPH_PATH = os.path.join(DATA_DIR, 'career_graph.json')
+
+# Expanded before lookup so 'Sr. SWE' and 'Senior Software Engineer' share a key
+ABBREVIATIONS = {
+    'sr': 'senior', 'snr': 'senior', 'jr': 'junior', 'jnr': 'junior', 'assoc': 'associate',
+    'eng': 'engineer', 'engr': 'engineer', 'mgr': 'manager', 'dev': 'developer',
+    'swe': 'software engineer', 'sde': 'software engineer', 'ml': 'machine learning',
+    'dir': 'director', 'frontend': 'front end', 'backend': 'back end', 'fullstack': 'full stack'
+}
+
+# Trailing grade markers ('Software Engineer II') mapped to a seniority word (None = drop)
+GRADE_SUFFIXES = {'i': 'junior', '1': 'junior', 'ii': None, '2': None, 'iii': 'senior', '3': 'senior',
+                  'iv': 'staff', '4': 'staff'}
+
+SENIORITY_WORDS = ('junior', 'senior', 'lead', 'staff', 'principal')
+
+# Text after these is the employer or team, not the title
+_TITLE_END = re.compile(r"\s+(?:at|@|with|for)\s+|\s+[-|–—]\s+|[,(]")
+_NON_WORD = re.compile(r"[^a-z0-9+#]+")
+
+# Paths may take at most this many sideways moves
+MAX_LATERAL_MOVES = 1
+
+
+def normalize_title(title):
+    """
+    Reduce a job title to its lookup key
+
+    Args:
+        title (str): Title as written on a profile ("Sr. Backend Eng @ Acme")
+
+    Returns:
+        str: Lowercase key with abbreviations expanded ("senior back end engineer")
+    """
+    title = _TITLE_END.split((title or '').lower(), 1)[0]
+    words = []
+    for word in _NON_WORD.sub(' ', title).split():
+        words.extend(ABBREVIATIONS.get(word, word).split())
+    if len(words) > 1 and words[-1] in GRADE_SUFFIXES:
+        grade = GRADE_SUFFIXES[words.pop()]
+        if grade and grade not in words:
+            words.insert(0, grade)
+    return ' '.join(words)
+
+
+class Transition:
+    """A typical move from one role to another"""
+
+    __slots__ = ('role', 'years', 'kind', 'typical_years')
+
+    def __init__(self, role, years, kind):
+        self.role = role
+        self.years = years
+        self.kind = kind
+        self.typical_years = (years[0] + years[1]) / 2
+
+    @property
+    def timeframe(self):
+        """Human-readable duration, e.g. '2-3 years'"""
+        low, high = self.years
+        if high <= 1:
+            return '6-12 months'
+        if low == high:
+            return f"{low} years"
+        return f"{low}-{high} years"
+
+
+class Role:
+    """A node of the graph"""
+
+    __slots__ = ('id', 'title', 'level', 'family', 'skills', 'skill_keys', 'transitions')
+
+    def __init__(self, id, title, level, family, skills):
+        self.id = id
+        self.title = title
+        self.level = level
+        self.family = family
+        self.skills = tuple(skills)
+        self.skill_keys = frozenset(skill.lower() for skill in skills)
+        self.transitions = ()
+
+    def missing_skills(self, skill_keys):
+        """Skills of this role not covered by a set of lowercase skill names"""
+        return [skill for skill in self.skills if skill.lower() not in skill_keys]
+
+    def __repr__(self):
+        return f"Role({self.id!r})"
+
+
+class CareerPath:
+    """A sequence of transitions starting from one role"""
+
+    __slots__ = ('start', 'steps', 'years', 'lateral_moves')
+
+    def __init__(self, start, steps):
+        self.start = start
+        self.steps = tuple(steps)
+        self.years = sum(step.typical_years for step in self.steps)
+        self.lateral_moves = sum(step.kind == 'lateral' for step in self.steps)
+
+    @property
+    def end(self):
+        """Role reached at the end of the path"""
+        return self.steps[-1].role if self.steps else self.start
+
+    def position(self, year):
+        """
+        Where the path stands at the start of a given year (0 = today)
+
+        Returns:
+            tuple: (Role held, Transition in progress or None, True if that move completes within the year)
+        """
+        elapsed = 0.0
+        role = self.start
+        for step in self.steps:
+            done = elapsed + step.typical_years
+            if done > year:
+                return role, step, done <= year + 1
+            elapsed = done
+            role = step.role
+        return role, None, False
+
+    def titles(self):
+        """Titles along the path, starting role included"""
+        return [self.start.title] + [step.role.title for step in self.steps]
+
+
+class CareerGraph:
+    """Role-progression graph with title lookup and path search"""
+
+    def __init__(self, path=CAREER_GRAPH_PATH):
+        self.roles = {}
+        self.levels = {}
+        self._aliases = {}
+        self._aliases_by_word = {}
+        self._load(path)
+        # Cached per instance: profiles reuse a small set of titles and horizons
+        self.find_role = lru_cache(maxsize=4096)(self._find_role)
+        self.progressions = lru_cache(maxsize=1024)(self._progressions)
+        self.path_to = lru_cache(maxsize=1024)(self._path_to)
+
+    def _load(self, path):
+        """Index the bundled graph: roles by id, aliases by normalized title and by word"""
+        if not os.path.exists(path):
+            print(f"⚠️  Warning: career graph not found at {path}")
+            return
+
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+
+        self.levels = {int(level): name for level, name in data['levels'].items()}
+        for entry in data['roles']:
+            role = Role(entry['id'], entry['title'], entry['level'], entry['family'], entry['skills'])
+            self.roles[role.id] = role
+            for alias in [entry['title']] + entry['aliases']:
+                key = normalize_title(alias)
+                self._aliases.setdefault(key, role)
+        for entry in data['roles']:
+            self.roles[entry['id']].transitions = tuple(
+                Transition(self.roles[move['to']], tuple(move['years']), move['kind'])
+                for move in entry['next']
+            )
+
+        for key in self._aliases:
+            words = frozenset(key.split())
+            for word in words:
+                self._aliases_by_word.setdefault(word, []).append((words, key))
+
+    def level_name(self, role):
+        """Display name of a role's level ('Senior', 'Lead', ...)"""
+        return self.levels.get(role.level, 'Professional')
+
+    def _find_role(self, title):
+        """
+        Match a profile title to a role
+
+        Exact normalized matches win; otherwise the longest alias whose words all appear in
+        the title is used, re-qualified by any seniority word the alias did not cover.
+
+        Returns:
+            Role or None
+        """
+        key = normalize_title(title)
+        if not key:
+            return None
+        role = self._aliases.get(key)
+        if role:
+            return role
+
+        words = frozenset(key.split())
+        best = None
+        for word in words:
+            for alias_words, alias in self._aliases_by_word.get(word, ()):
+                # Longest alias wins; ties go to the alphabetically first so lookups are stable
+                candidate = (-len(alias_words), alias)
+                if alias_words <= words and (best is None or candidate < best):
+                    best = candidate
+        if best is None:
+            return None
+
+        alias = best[1]
+        role = self._aliases[alias]
+        for seniority in SENIORITY_WORDS:
+            if seniority in words and seniority not in alias.split():
+                qualified = self._aliases.get(normalize_title(f"{seniority} {role.title}"))
+                if qualified:
+                    return qualified
+        return role
+
+    def _progressions(self, role_id, years_ahead, limit=3):
+        """
+        Most advanced paths reachable within a horizon, each with a different first move
+
+        The first move is always allowed, even if it takes longer than the horizon.
+
+        Returns:
+            tuple: CareerPath objects, best first
+        """
+        start = self.roles.get(role_id)
+        if start is None:
+            return ()
+
+        complete = []
+        stack = [(start, (), 0.0, 0, frozenset((start.id,)))]
+        while stack:
+            role, steps, elapsed, laterals, seen = stack.pop()
+            extended = False
+            for move in role.transitions:
+                lateral = move.kind == 'lateral'
+                if move.role.id in seen or laterals + lateral > MAX_LATERAL_MOVES:
+                    continue
+                if steps and elapsed + move.typical_years > years_ahead:
+                    continue
+                stack.append((move.role, steps + (move,), elapsed + move.typical_years,
+                              laterals + lateral, seen | {move.role.id}))
+                extended = True
+            if steps and not extended:
+                complete.append(CareerPath(start, steps))
+
+        complete.sort(key=lambda path: (-path.end.level, path.lateral_moves, path.years, len(path.steps)))
+        best = []
+        first_moves = set()
+        for path in complete:
+            first = path.steps[0].role.id
+            if first not in first_moves:
+                first_moves.add(first)
+                best.append(path)
+                if len(best) >= limit:
+                    break
+        return tuple(best)
+
+    def _path_to(self, role_id, target_id):
+        """
+        Fastest path (by typical years) between two roles
+
+        Returns:
+            CareerPath or None if the target is not reachable
+        """
+        start = self.roles.get(role_id)
+        if start is None or target_id not in self.roles:
+            return None
+
+        queue = [(0.0, 0, start.id, ())]
+        settled = set()
+        counter = 1
+        while queue:
+            elapsed, _, role_id, steps = heapq.heappop(queue)
+            if role_id == target_id:
+                return CareerPath(start, steps)
+            if role_id in settled:
+                continue
+            settled.add(role_id)
+            for move in self.roles[role_id].transitions:
+                if move.role.id not in settled:
+                    heapq.heappush(queue, (elapsed + move.typical_years, counter, move.role.id, steps + (move,)))
+                    counter += 1
+        return None
+
+
+_default_graph = None
+
+
+def get_career_graph():
+    """Return the shared CareerGraph so the bundled data is only indexed once per process"""
+    global _default_graph
+    if _default_graph is None:
+        _default_graph = CareerGraph()
+    return _default_graph
+
+
+# Test
+if __name__ == "__main__":
+    import time
+
+    graph = get_career_graph()
+    for title in ['Sr. Software Engineer @ Acme', 'Software Engineer II', 'Senior Backend Python Engineer',
+                  'Data Analyst - Growth', 'Head of Engineering', 'Lead Salesforce Developer', 'Chef']:
+        role = graph.find_role(title)
+        print(f"{title!r:40} -> {role.title if role else None}")
+
+    role = graph.find_role('Software Engineer')
+    start = time.perf_counter()
+    graph.progressions.__wrapped__(role.id, 5)
+    elapsed_us = (time.perf_counter() - start) * 1e6
+    for path in graph.progressions(role.id, 5):
+        print(' -> '.join(path.titles()), f"({path.years:g} years)")
+    print(f"Paths computed in {elapsed_us:.0f} µs (uncached)")
+    target = graph.path_to(role.id, 'vp_of_engineering')
+    print('To VP:', ' -> '.join(target.titles()), f"({target.years:g} years)")
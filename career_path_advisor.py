@@ -2,105 +2,151 @@
 Career Path Advisor
 Provides personalized career guidance using Gemini AI
 """
-import google.generativeai as genai
-import os
-from dotenv import load_dotenv
-import re
+import hashlib
 import json
+import os
+import threading
+from collections import OrderedDict
+from llm_client import get_llm_client
+from instrumentation import timed, count
+from analysis_results import CareerPathResult, freeze
+from career_graph import get_career_graph
+from json_extract import extract_json
+from prompt_builder import PromptBuilder, HIGH, MEDIUM
+from wire_schema import CAREER_PATH_WIRE, compact_wire
 
-load_dotenv()
+# Profiles whose progressive career plans (overview and expanded sections) are kept
+CAREER_PLAN_CACHE_SIZE = int(os.getenv('CAREER_PLAN_CACHE_SIZE', '1024'))
 
+# Fallback content that does not depend on the profile, shared by every basic analysis
+BASIC_SKILL_ROADMAP = freeze({
+    'immediate_focus': [
+        {
+            'skill': 'Leadership',
+            'priority': 'High',
+            'learning_resources': ['Leadership courses on Coursera', 'Management books'],
+            'estimated_time': '3-6 months',
+            'reason': 'Essential for advancement'
+        }
+    ],
+    'short_term': [
+        {
+            'skill': 'System Design',
+            'priority': 'High',
+            'learning_resources': ['System design courses', 'Architecture patterns'],
+            'estimated_time': '6-12 months',
+            'reason': 'Required for senior roles'
+        }
+    ],
+    'long_term': [
+        {
+            'skill': 'Strategic Planning',
+            'priority': 'Medium',
+            'learning_resources': ['MBA courses', 'Business strategy books'],
+            'estimated_time': '1-2 years',
+            'reason': 'For executive transition'
+        }
+    ]
+})
 
-class CareerPathAdvisor:
-    """Analyze career trajectory and provide advancement recommendations"""
-    
-    def __init__(self):
-        api_key = os.getenv('GEMINI_API_KEY')
-        if api_key:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-2.0-flash')
-            self.use_ai = True
-        else:
-            self.use_ai = False
-            print("Warning: GEMINI_API_KEY not found. Using basic career suggestions.")
-    
-    def analyze_career_path(self, profile_data, target_role=None, years_ahead=5):
-        """
-        Analyze career path and provide comprehensive guidance
-        
-        Args:
-            profile_data (dict): User's profile data from LinkedIn
-            target_role (str): Optional specific role they're targeting
-            years_ahead (int): How many years to project (default 5)
-            
-        Returns:
-            dict: Career path analysis with recommendations
-        """
-        if self.use_ai:
-            return self._analyze_with_ai(profile_data, target_role, years_ahead)
-        else:
-            return self._basic_career_analysis(profile_data, target_role, years_ahead)
-    
-    def _analyze_with_ai(self, profile_data, target_role, years_ahead):
-        """Use Gemini AI to perform intelligent career path analysis"""
-        
-        try:
-            # Prepare profile summary
-            user_skills = profile_data.get('skills', [])
-            experiences = profile_data.get('experience', [])
-            education = profile_data.get('education', [])
-            current_title = experiences[0].get('title', 'N/A') if experiences else 'N/A'
-            
-            profile_summary = f"""
-CURRENT PROFILE:
-Name: {profile_data.get('name', 'N/A')}
-Current Role: {current_title}
-Headline: {profile_data.get('headline', 'N/A')}
+BASIC_INDUSTRY_TRENDS = freeze({
+    'emerging_skills': ['AI/ML', 'Cloud Computing', 'DevOps', 'Cybersecurity'],
+    'declining_skills': ['Legacy systems'],
+    'hot_areas': ['Technology', 'Remote work'],
+    'market_demand': 'High',
+    'salary_trends': 'Growing',
+    'recommendations': 'Stay updated with emerging technologies and develop leadership skills'
+})
 
-Skills: {', '.join(user_skills[:20]) if user_skills else 'None listed'}
+BASIC_ALTERNATIVE_PATHS = freeze([
+    {
+        'path': 'Management Track',
+        'description': 'Transition to people management',
+        'pros': ['Leadership opportunities', 'Higher earning potential'],
+        'cons': ['Less hands-on technical work'],
+        'transition_difficulty': 'Medium'
+    },
+    {
+        'path': 'Technical Expert Track',
+        'description': 'Deep specialization in technical domain',
+        'pros': ['Deep expertise', 'Technical influence'],
+        'cons': ['Narrower scope'],
+        'transition_difficulty': 'Easy'
+    }
+])
 
-Experience History:
-{self._format_experiences(experiences)}
+BASIC_CERTIFICATIONS = freeze([
+    {
+        'name': 'PMP',
+        'provider': 'PMI',
+        'value': 'Medium',
+        'timeframe': 'Year 2',
+        'cost_estimate': '$500 - $1000',
+        'roi': 'Moderate salary increase'
+    }
+])
 
-Education:
-{self._format_education(education)}
+BASIC_NETWORKING_STRATEGY = freeze({
+    'target_connections': 'Senior leaders in your field',
+    'platforms': ['LinkedIn', 'Industry conferences'],
+    'events': 'Tech conferences and meetups',
+    'communities': 'Professional associations'
+})
 
-About:
-{profile_data.get('about', 'N/A')[:500]}
-"""
-            
-            target_context = f"\nTarget Role: {target_role}" if target_role else "\nNo specific target role specified - recommend best progression paths"
-            
-            prompt = f"""
-You are an expert career advisor. Analyze this professional's career and provide comprehensive guidance.
+BASIC_MILESTONES = freeze(['Skill development', 'Project leadership'])
+DEFAULT_REQUIRED_SKILLS = freeze(['Leadership', 'Technical Skills'])
+DEFAULT_SKILLS_TO_DEVELOP = freeze(['Leadership', 'Technical skills'])
 
-{profile_summary}
-{target_context}
+# How the role graph's transition kinds are described to the user
+MOVE_RATIONALE = {
+    'promotion': 'Typical promotion from {title} after {timeframe}',
+    'management': 'Move into people management, building on your experience as {title}',
+    'lateral': 'Lateral move that reuses your {title} background in a new specialty'
+}
+MOVE_VERB = {'promotion': 'Earn promotion to', 'management': 'Step into', 'lateral': 'Transition to'}
+MOVE_ORDER = {'promotion': 0, 'management': 1, 'lateral': 2}
+TRACKS = freeze({
+    'promotion': {
+        'description': 'Grow as an individual contributor',
+        'pros': ['Stay hands-on', 'Deepen technical influence'],
+        'cons': ['Fewer senior IC openings than management roles']
+    },
+    'management': {
+        'description': 'Lead people and teams',
+        'pros': ['Leadership opportunities', 'Higher earning potential'],
+        'cons': ['Less hands-on technical work']
+    },
+    'lateral': {
+        'description': 'Move into a neighbouring specialty',
+        'pros': ['Broader skill set', 'Access to a different job market'],
+        'cons': ['Short-term reset in seniority']
+    }
+})
 
-Provide a detailed career path analysis in the following JSON format:
 
-{{
-    "current_level": "Current career level assessment (Junior/Mid-level/Senior/Lead/Principal/Executive)",
-    "next_role_suggestions": [
-        {{
+# JSON shape of each analysis section for WIRE_FORMAT=verbose, shared by the full, overview and section prompts
+SECTION_FORMATS = {
+    'current_level': '"Current career level assessment (Junior/Mid-level/Senior/Lead/Principal/Executive)"',
+    'next_role_suggestions': """[
+        {
             "title": "Next logical role title",
             "timeframe": "6-12 months or 1-2 years, etc.",
             "rationale": "Why this is a good next step",
             "readiness_score": 75,
             "required_skills": ["skill1", "skill2"],
             "difficulty": "Easy/Medium/Hard"
-        }},
+        },
         // 3-5 suggestions
-    ],
-    "skill_roadmap": {{
+    ]""",
+    'skill_roadmap': """{
         "immediate_focus": [
-            {{
+            {
                 "skill": "Skill name",
                 "priority": "Critical/High/Medium",
                 "learning_resources": ["Resource 1", "Resource 2"],
                 "estimated_time": "2-3 months",
                 "reason": "Why this skill matters for progression"
-            }}
+            }
         ],
         "short_term": [
             // Skills for next 6-12 months
@@ -108,94 +154,569 @@ Provide a detailed career path analysis in the following JSON format:
         "long_term": [
             // Skills for 1-3 years
         ]
-    }},
-    "industry_trends": {{
+    }""",
+    'industry_trends': """{
         "emerging_skills": ["AI/ML", "Cloud Architecture", "etc."],
         "declining_skills": ["Legacy tech that's becoming less relevant"],
         "hot_areas": ["Industry segments with growth"],
         "market_demand": "High/Medium/Low for your field",
         "salary_trends": "Growing/Stable/Declining",
         "recommendations": "How to stay relevant in changing landscape"
-    }},
-    "career_timeline": {{
-        "year_1": {{
+    }""",
+    'career_timeline': """{
+        "year_1": {
             "focus": "Primary goals for year 1",
             "target_position": "Expected role",
             "key_milestones": ["Milestone 1", "Milestone 2"],
             "skills_to_develop": ["Skill 1", "Skill 2"]
-        }},
-        "year_2": {{
+        },
+        "year_2": {
             // Similar structure
-        }},
-        "year_3": {{
+        },
+        "year_3": {
             // Similar structure
-        }},
-        "year_4": {{
+        },
+        "year_4": {
             // Similar structure
-        }},
-        "year_5": {{
+        },
+        "year_5": {
             "focus": "Primary goals for year 5",
             "target_position": "Expected senior role",
             "expected_salary_range": "$XXX,XXX - $XXX,XXX",
             "key_milestones": ["Milestone 1", "Milestone 2"],
             "skills_to_develop": ["Skill 1", "Skill 2"]
-        }}
-    }},
-    "alternative_paths": [
-        {{
+        }
+    }""",
+    'alternative_paths': """[
+        {
             "path": "Alternative career direction",
             "description": "What this path looks like",
             "pros": ["Advantage 1", "Advantage 2"],
             "cons": ["Challenge 1", "Challenge 2"],
             "transition_difficulty": "Easy/Medium/Hard"
-        }}
-    ],
-    "certifications": [
-        {{
+        }
+    ]""",
+    'certifications': """[
+        {
             "name": "Certification name",
             "provider": "Issuing organization",
             "value": "High/Medium/Low",
             "timeframe": "When to get it",
             "cost_estimate": "$XXX - $XXX",
             "roi": "Expected return on investment"
-        }}
-    ],
-    "networking_strategy": {{
+        }
+    ]""",
+    'networking_strategy': """{
         "target_connections": "Types of people to connect with",
         "platforms": ["LinkedIn", "Industry forums", "etc."],
         "events": "Conferences or meetups to attend",
         "communities": "Online communities to join"
-    }},
-    "summary": "2-3 sentence summary of career outlook and top recommendation"
-}}
+    }""",
+    'summary': '"2-3 sentence summary of career outlook and top recommendation"'
+}
 
-Be specific, realistic, and actionable. Base recommendations on actual market trends and the user's background.
-Consider their current experience level and provide achievable progression steps.
-"""
+# Progressive mode: the first screen is generated up front, the other sections on demand
+OVERVIEW_FIELDS = ('current_level', 'next_role_suggestions', 'summary')
+EXPANDABLE_SECTIONS = ('career_timeline', 'skill_roadmap', 'alternative_paths', 'certifications',
+                       'industry_trends', 'networking_strategy')
+
+
+def plan_key(profile_data, target_role=None, years_ahead=5):
+    """Cache key for a career plan: the same profile, target and horizon give the same key"""
+    payload = json.dumps([profile_data, target_role, years_ahead], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class CareerPlan:
+    """A profile's progressive career plan: its inputs, overview and the sections expanded so far"""
+
+    __slots__ = ('key', 'profile_data', 'target_role', 'years_ahead', 'overview', 'sections')
+
+    def __init__(self, key, profile_data, target_role, years_ahead):
+        self.key = key
+        self.profile_data = profile_data
+        self.target_role = target_role
+        self.years_ahead = years_ahead
+        self.overview = None
+        self.sections = {}
+
+    def pending_sections(self):
+        """Sections not generated yet"""
+        return [name for name in EXPANDABLE_SECTIONS if name not in self.sections]
+
+
+class CareerPlanCache:
+    """Career plans by plan_key; the least recently used profile is dropped when full"""
+
+    def __init__(self, max_plans=CAREER_PLAN_CACHE_SIZE):
+        self.max_plans = max_plans
+        self._plans = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """The cached plan for a key, or None"""
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+            return plan
+
+    def plan_for(self, profile_data, target_role=None, years_ahead=5):
+        """The cached plan for these inputs, created if new"""
+        key = plan_key(profile_data, target_role, years_ahead)
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is None:
+                plan = self._plans[key] = CareerPlan(key, profile_data, target_role, years_ahead)
+                while len(self._plans) > self.max_plans:
+                    self._plans.popitem(last=False)
+            else:
+                self._plans.move_to_end(key)
+            return plan
+
+
+_default_plans = None
+_plans_lock = threading.Lock()
+
+
+def get_career_plans():
+    """Return the process-wide CareerPlanCache"""
+    global _default_plans
+    if _default_plans is None:
+        with _plans_lock:
+            if _default_plans is None:
+                _default_plans = CareerPlanCache()
+    return _default_plans
+
+
+class CareerPathAdvisor:
+    """Analyze career trajectory and provide advancement recommendations"""
+    
+    def __init__(self):
+        self.llm = get_llm_client()
+        self.use_ai = self.llm.available
+        if not self.use_ai:
+            print("Warning: GEMINI_API_KEY not found. Using basic career suggestions.")
+    
+    def analyze_career_path(self, profile_data, target_role=None, years_ahead=5):
+        """
+        Analyze career path and provide comprehensive guidance
+        
+        Args:
+            profile_data (dict): User's profile data from LinkedIn
+            target_role (str): Optional specific role they're targeting
+            years_ahead (int): How many years to project (default 5)
             
-            response = self.model.generate_content(prompt)
-            result_text = response.text.strip()
+        Returns:
+            CareerPathResult: Career path analysis with recommendations
+        """
+        if self.use_ai:
+            return self._analyze_with_ai(profile_data, target_role, years_ahead)
+        else:
+            return self._basic_career_analysis(profile_data, target_role, years_ahead)
+    
+    async def analyze_career_path_async(self, profile_data, target_role=None, years_ahead=5, instant=False):
+        """
+        Async version of analyze_career_path for the async/ASGI endpoints
+        
+        With instant=True the career-graph analysis is returned without calling Gemini.
+        """
+        if instant or not self.use_ai:
+            return self._basic_career_analysis(profile_data, target_role, years_ahead)
+        
+        try:
+            prompt = self._create_prompt(profile_data, target_role, years_ahead)
+            result_text = await self.llm.generate_async(prompt, endpoint='career_path',
+                                                      response_schema=CareerPathResult.response_schema())
+            return self._parse_ai_response(result_text)
+        except Exception as e:
+            print(f"AI analysis failed: {e}")
+            return self._basic_career_analysis(profile_data, target_role, years_ahead)
+    
+    def analyze_overview(self, profile_data, target_role=None, years_ahead=5):
+        """
+        First screen of a progressive analysis: current level, next roles and summary
+        
+        The other sections stay empty until expand_section is called for them.
+        
+        Returns:
+            CareerPlan: The cached plan, with its overview set
+        """
+        plan = get_career_plans().plan_for(profile_data, target_role, years_ahead)
+        if plan.overview is None or plan.overview.method != 'ai_overview':
+            if self.use_ai:
+                try:
+                    result_text = self.llm.generate(self._create_overview_prompt(plan), endpoint='career_path',
+                                                    response_schema=CareerPathResult.response_schema(OVERVIEW_FIELDS))
+                    plan.overview = self._parse_overview(result_text)
+                    return plan
+                except Exception as e:
+                    print(f"AI overview failed: {e}")
+            plan.overview = self._basic_overview(plan)
+        return plan
+    
+    async def analyze_overview_async(self, profile_data, target_role=None, years_ahead=5, instant=False):
+        """Async version of analyze_overview; instant=True skips Gemini"""
+        plan = get_career_plans().plan_for(profile_data, target_role, years_ahead)
+        if plan.overview is None or plan.overview.method != 'ai_overview':
+            if self.use_ai and not instant:
+                try:
+                    result_text = await self.llm.generate_async(
+                        self._create_overview_prompt(plan), endpoint='career_path',
+                        response_schema=CareerPathResult.response_schema(OVERVIEW_FIELDS))
+                    plan.overview = self._parse_overview(result_text)
+                    return plan
+                except Exception as e:
+                    print(f"AI overview failed: {e}")
+            plan.overview = self._basic_overview(plan)
+        return plan
+    
+    def expand_section(self, plan, section):
+        """
+        Generate one heavier section of a progressive analysis, once per plan
+        
+        Args:
+            plan (CareerPlan): Plan from analyze_overview or get_career_plans()
+            section (str): One of EXPANDABLE_SECTIONS
             
-            # Extract JSON from response
-            json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
-            if json_match:
-                analysis = json.loads(json_match.group())
-                return {
-                    'success': True,
-                    'analysis': analysis,
-                    'method': 'ai'
-                }
-            else:
-                raise ValueError("Could not parse AI response")
+        Returns:
+            tuple: (section content, source) -- source is 'ai', 'cached' or the fallback method
+        """
+        if section in plan.sections:
+            count('app_career_sections_total', section=section, source='cached')
+            return plan.sections[section], 'cached'
+        if self.use_ai:
+            try:
+                result_text = self.llm.generate(self._create_section_prompt(plan, section), endpoint='career_path',
+                                                response_schema=CareerPathResult.response_schema([section], [section]))
+                return self._store_section(plan, section, result_text), 'ai'
+            except Exception as e:
+                print(f"AI {section} expansion failed: {e}")
+        return self._basic_section(plan, section)
+    
+    async def expand_section_async(self, plan, section):
+        """Async version of expand_section"""
+        if section in plan.sections:
+            count('app_career_sections_total', section=section, source='cached')
+            return plan.sections[section], 'cached'
+        if self.use_ai:
+            try:
+                result_text = await self.llm.generate_async(
+                    self._create_section_prompt(plan, section), endpoint='career_path',
+                    response_schema=CareerPathResult.response_schema([section], [section]))
+                return self._store_section(plan, section, result_text), 'ai'
+            except Exception as e:
+                print(f"AI {section} expansion failed: {e}")
+        return self._basic_section(plan, section)
+    
+    def _parse_overview(self, result_text):
+        """Overview fields from a Gemini reply; the expandable sections are left empty"""
+        result = CareerPathResult.from_llm(result_text, 'career_path')
+        result.method = 'ai_overview'
+        for name in EXPANDABLE_SECTIONS:
+            setattr(result, name, CareerPathResult.DEFAULTS[name])
+        return result
+    
+    def _basic_overview(self, plan):
+        """Overview fields of the deterministic analysis"""
+        analysis = self._basic_career_analysis(plan.profile_data, plan.target_role, plan.years_ahead)
+        return CareerPathResult(method=analysis.method, **{name: getattr(analysis, name) for name in OVERVIEW_FIELDS})
+    
+    def _store_section(self, plan, section, result_text):
+        """Validate a section reply and cache it on the plan so it is never generated again"""
+        expected = type(CareerPathResult.SCHEMA['defaults'][section])
+        value = extract_json(result_text, {'required': {section: expected}, 'defaults': {}}, name='career_path',
+                             transform=CAREER_PATH_WIRE.expand)
+        content = plan.sections.setdefault(section, value[section])
+        count('app_career_sections_total', section=section, source='ai')
+        return content
+    
+    def _basic_section(self, plan, section):
+        """Deterministic section content; not cached, so a later call can still use Gemini"""
+        analysis = self._basic_career_analysis(plan.profile_data, plan.target_role, plan.years_ahead)
+        count('app_career_sections_total', section=section, source='fallback')
+        return getattr(analysis, section), analysis.method
+    
+    def _analyze_with_ai(self, profile_data, target_role, years_ahead):
+        """Use Gemini AI to perform intelligent career path analysis"""
+        
+        try:
+            prompt = self._create_prompt(profile_data, target_role, years_ahead)
+            result_text = self.llm.generate(prompt, endpoint='career_path', response_schema=CareerPathResult.response_schema())
+            return self._parse_ai_response(result_text)
                 
         except Exception as e:
             print(f"AI analysis failed: {e}")
             # Fallback to basic analysis
             return self._basic_career_analysis(profile_data, target_role, years_ahead)
     
+    def _start_prompt(self, profile_data, target_role, years_ahead, task):
+        """Prompt builder holding the task, profile, target role and role-graph context"""
+        # Prepare profile summary
+        user_skills = profile_data.get('skills', [])
+        experiences = profile_data.get('experience', [])
+        education = profile_data.get('education', [])
+        current_title = experiences[0].get('title', 'N/A') if experiences else 'N/A'
+        
+        profile_summary = f"""
+CURRENT PROFILE:
+Name: {profile_data.get('name', 'N/A')}
+Current Role: {current_title}
+Headline: {profile_data.get('headline', 'N/A')}
+
+Skills: {', '.join(user_skills[:20]) if user_skills else 'None listed'}
+
+Experience History:
+{self._format_experiences(experiences)}
+
+Education:
+{self._format_education(education)}
+
+About:
+{profile_data.get('about', 'N/A')[:500]}
+"""
+        
+        target_context = f"\nTarget Role: {target_role}" if target_role else "\nNo specific target role specified - recommend best progression paths"
+        
+        builder = PromptBuilder('career_path')
+        builder.add(f"""
+You are an expert career advisor. {task}
+""")
+        builder.add(profile_summary, priority=HIGH, compact=True, min_tokens=150)
+        builder.add(target_context)
+        graph_context = self._graph_context(profile_data, target_role, years_ahead)
+        if graph_context:
+            builder.add(graph_context, priority=MEDIUM)
+        return builder
+    
+    def _create_prompt(self, profile_data, target_role, years_ahead=5):
+        """Build the career path prompt within the token budget"""
+        builder = self._start_prompt(profile_data, target_role, years_ahead,
+                                     "Analyze this professional's career and provide comprehensive guidance.")
+        builder.add(f"""
+{self._response_format('Provide a detailed career path analysis in the following JSON format:')}
+
+Be specific, realistic, and actionable. Base recommendations on actual market trends and the user's background.
+Consider their current experience level and provide achievable progression steps.
+""")
+        return builder.build()
+    
+    def _create_overview_prompt(self, plan):
+        """Prompt for the first screen only: current level, next roles and summary"""
+        builder = self._start_prompt(plan.profile_data, plan.target_role, plan.years_ahead,
+                                     "Assess this professional's career level and their best next roles.")
+        builder.add(f"""
+{self._response_format('Respond in the following JSON format:', OVERVIEW_FIELDS)}
+
+Be specific and realistic, and base the suggestions on their current experience level.
+""")
+        return builder.build()
+    
+    def _create_section_prompt(self, plan, section):
+        """Prompt for one expandable section, consistent with the plan's overview"""
+        builder = self._start_prompt(plan.profile_data, plan.target_role, plan.years_ahead,
+                                     f"Write the {section.replace('_', ' ')} part of this professional's career plan.")
+        overview = plan.overview
+        if overview is not None and overview.next_role_suggestions:
+            titles = [role.get('title') for role in overview.next_role_suggestions if isinstance(role, dict)]
+            builder.add(f"\nNext roles already recommended to them: {', '.join(filter(None, titles))}\n"
+                        f"Current level: {overview.current_level}\n", priority=MEDIUM)
+        horizon = f"\nCover year_1 to year_{plan.years_ahead}.\n" if section == 'career_timeline' else ''
+        builder.add(f"""
+{self._response_format('Respond in the following JSON format:', (section,))}
+{horizon}
+Be specific, realistic, and actionable. Base recommendations on actual market trends and the user's background.
+""")
+        return builder.build()
+    
+    def _response_format(self, intro, names=None):
+        """Reply format: compact keys (see wire_schema.py) or, with WIRE_FORMAT=verbose, the JSON example"""
+        if compact_wire():
+            return CAREER_PATH_WIRE.describe(names)
+        formats = SECTION_FORMATS if names is None else {name: SECTION_FORMATS[name] for name in names}
+        return f"{intro}\n\n{self._format_sections(formats)}"
+    
+    def _format_sections(self, formats):
+        """JSON object template with the given sections"""
+        return '{\n' + ',\n'.join(f'    "{name}": {shape}' for name, shape in formats.items()) + '\n}'
+    
+    def _parse_ai_response(self, result_text):
+        """Extract the JSON analysis from a Gemini response"""
+        return CareerPathResult.from_llm(result_text, 'career_path')
+    
+    def _find_current_role(self, profile_data):
+        """Match the latest job title (or the headline) to a role in the career graph"""
+        graph = get_career_graph()
+        experiences = profile_data.get('experience', [])
+        titles = [experiences[0].get('title') if experiences else None, profile_data.get('headline')]
+        for title in titles:
+            if title:
+                role = graph.find_role(title)
+                if role:
+                    return role
+        return None
+    
+    def _plan_paths(self, role, target_role, years_ahead):
+        """Best progressions from the graph, with the path to the target role first when it is known"""
+        graph = get_career_graph()
+        paths = list(graph.progressions(role.id, years_ahead))
+        target = graph.find_role(target_role) if target_role else None
+        if target and target is not role:
+            target_path = graph.path_to(role.id, target.id)
+            if target_path:
+                paths = [target_path] + [path for path in paths if path.steps[0] is not target_path.steps[0]]
+        return paths, target
+    
+    def _graph_context(self, profile_data, target_role, years_ahead):
+        """Deterministic progressions that ground the AI's narrative (empty if the title is unknown)"""
+        role = self._find_current_role(profile_data)
+        if not role:
+            return ''
+        paths, _ = self._plan_paths(role, target_role, years_ahead)
+        if not paths:
+            return ''
+        lines = [f"\nTypical progressions for a {role.title} from our role graph "
+                 "(prefer these titles and timeframes; add the narrative, trends and resources):"]
+        for path in paths:
+            hops = ' -> '.join(f"{step.role.title} ({step.timeframe})" for step in path.steps)
+            lines.append(f"- {role.title} -> {hops}")
+        return '\n'.join(lines) + '\n'
+    
+    def _graph_career_analysis(self, role, profile_data, target_role, years_ahead):
+        """Deterministic analysis from the role graph: real next roles, timeline and roadmap"""
+        graph = get_career_graph()
+        skill_keys = frozenset(skill.lower() for skill in profile_data.get('skills', []))
+        paths, target = self._plan_paths(role, target_role, years_ahead)
+        
+        moves = sorted(role.transitions, key=lambda move: MOVE_ORDER[move.kind])
+        if paths:
+            # The planned path's first move leads the suggestions
+            first = paths[0].steps[0]
+            moves = [first] + [move for move in moves if move is not first]
+        
+        next_role_suggestions = [
+            {
+                'title': move.role.title,
+                'timeframe': move.timeframe,
+                'rationale': MOVE_RATIONALE[move.kind].format(title=role.title, timeframe=move.timeframe),
+                'readiness_score': self._readiness(move.role, skill_keys),
+                'required_skills': move.role.skills,
+                'difficulty': self._difficulty(role, move)
+            }
+            for move in moves[:3]
+        ]
+        
+        level = graph.level_name(role)
+        if not paths:
+            return CareerPathResult(
+                method='graph',
+                current_level=level,
+                next_role_suggestions=next_role_suggestions,
+                skill_roadmap=BASIC_SKILL_ROADMAP,
+                industry_trends=BASIC_INDUSTRY_TRENDS,
+                career_timeline={},
+                alternative_paths=BASIC_ALTERNATIVE_PATHS,
+                certifications=BASIC_CERTIFICATIONS,
+                networking_strategy=BASIC_NETWORKING_STRATEGY,
+                summary=f'As a {role.title} you are at the top of this track. Focus on widening your '
+                        f'organizational impact and mentoring the next generation of leaders.'
+            )
+        
+        best = paths[0]
+        summary = (f"As a {role.title} ({level}), the most likely route is {' -> '.join(best.titles())}, "
+                   f"about {best.years:g} years.")
+        if best.years > years_ahead:
+            summary += f" Within {years_ahead} years, expect to reach {best.position(years_ahead)[0].title}."
+        if target:
+            summary += (f" This path leads to your target role, {target.title}." if best.end is target
+                        else f" {target.title} is not a typical next step from {role.title}; consider the paths above.")
+        
+        return CareerPathResult(
+            method='graph',
+            current_level=level,
+            next_role_suggestions=next_role_suggestions,
+            skill_roadmap=self._graph_roadmap(best, skill_keys),
+            industry_trends=BASIC_INDUSTRY_TRENDS,
+            career_timeline=self._graph_timeline(best, skill_keys, years_ahead),
+            alternative_paths=[
+                {
+                    'path': ' -> '.join(path.titles()[1:]),
+                    'description': f"{TRACKS[path.steps[0].kind]['description']}: "
+                                   f"{path.end.title} in about {path.years:g} years",
+                    'pros': TRACKS[path.steps[0].kind]['pros'],
+                    'cons': TRACKS[path.steps[0].kind]['cons'],
+                    'transition_difficulty': self._difficulty(role, path.steps[0])
+                }
+                for path in paths[1:]
+            ] or BASIC_ALTERNATIVE_PATHS,
+            certifications=BASIC_CERTIFICATIONS,
+            networking_strategy=BASIC_NETWORKING_STRATEGY,
+            summary=summary
+        )
+    
+    def _graph_timeline(self, path, skill_keys, years_ahead):
+        """Year-by-year positions along a planned path"""
+        timeline = {}
+        for year in range(years_ahead):
+            role, step, lands = path.position(year)
+            if step:
+                missing = step.role.missing_skills(skill_keys)
+                focus = (f"{MOVE_VERB[step.kind]} {step.role.title}" if lands
+                         else f"Build toward {step.role.title} as {role.title}")
+            else:
+                missing = []
+                focus = f"Deepen your impact as {role.title}"
+            timeline[f'year_{year + 1}'] = {
+                'focus': focus,
+                'target_position': step.role.title if lands else role.title,
+                'key_milestones': [f"Demonstrate {skill}" for skill in missing[:2]] or BASIC_MILESTONES,
+                'skills_to_develop': missing[:3] or DEFAULT_SKILLS_TO_DEVELOP
+            }
+        return timeline
+    
+    def _graph_roadmap(self, path, skill_keys):
+        """Skills to learn for each move of a planned path: next move first"""
+        horizons = ('immediate_focus', 'short_term', 'long_term')
+        roadmap = {}
+        for index, horizon in enumerate(horizons):
+            steps = path.steps[index:index + 1] if index < 2 else path.steps[2:]
+            items = [
+                {
+                    'skill': skill,
+                    'priority': 'High' if index == 0 else 'Medium',
+                    'learning_resources': [f"{skill} courses on Coursera", f"A project that applies {skill}"],
+                    'estimated_time': step.timeframe,
+                    'reason': f"Expected of the {step.role.title} role"
+                }
+                for step in steps
+                for skill in step.role.missing_skills(skill_keys)[:2]
+            ]
+            roadmap[horizon] = items or BASIC_SKILL_ROADMAP[horizon]
+        return roadmap
+    
+    def _readiness(self, role, skill_keys):
+        """0-100 readiness for a role from the share of its skills the profile lists"""
+        if not role.skills:
+            return 70
+        return int(round(40 + 60 * len(role.skill_keys & skill_keys) / len(role.skills)))
+    
+    def _difficulty(self, role, move):
+        """Easy/Medium/Hard from the typical duration and the number of levels jumped"""
+        if move.years[1] > 3 or move.role.level - role.level >= 2:
+            return 'Hard'
+        if move.years[1] > 2 or move.kind != 'promotion':
+            return 'Medium'
+        return 'Easy'
+    
+    @timed('fallback')
     def _basic_career_analysis(self, profile_data, target_role, years_ahead):
         """Fallback: Basic career progression suggestions"""
         
+        role = self._find_current_role(profile_data)
+        if role:
+            return self._graph_career_analysis(role, profile_data, target_role, years_ahead)
+        
+        # Title not in the role graph: generic progression by seniority keywords
         experiences = profile_data.get('experience', [])
         current_title = experiences[0].get('title', 'Professional') if experiences else 'Professional'
         skills = profile_data.get('skills', [])
@@ -229,103 +750,39 @@ Consider their current experience level and provide achievable progression steps
                 {'title': 'Lead ' + current_title, 'timeframe': '3-4 years'}
             ]
         
-        return {
-            'success': True,
-            'analysis': {
-                'current_level': next_level,
-                'next_role_suggestions': [
-                    {
-                        'title': role['title'],
-                        'timeframe': role['timeframe'],
-                        'rationale': 'Natural career progression based on experience',
-                        'readiness_score': 70,
-                        'required_skills': skills[:5] if skills else ['Leadership', 'Technical Skills'],
-                        'difficulty': 'Medium'
-                    }
-                    for role in next_roles[:3]
-                ],
-                'skill_roadmap': {
-                    'immediate_focus': [
-                        {
-                            'skill': 'Leadership',
-                            'priority': 'High',
-                            'learning_resources': ['Leadership courses on Coursera', 'Management books'],
-                            'estimated_time': '3-6 months',
-                            'reason': 'Essential for advancement'
-                        }
-                    ],
-                    'short_term': [
-                        {
-                            'skill': 'System Design',
-                            'priority': 'High',
-                            'learning_resources': ['System design courses', 'Architecture patterns'],
-                            'estimated_time': '6-12 months',
-                            'reason': 'Required for senior roles'
-                        }
-                    ],
-                    'long_term': [
-                        {
-                            'skill': 'Strategic Planning',
-                            'priority': 'Medium',
-                            'learning_resources': ['MBA courses', 'Business strategy books'],
-                            'estimated_time': '1-2 years',
-                            'reason': 'For executive transition'
-                        }
-                    ]
-                },
-                'industry_trends': {
-                    'emerging_skills': ['AI/ML', 'Cloud Computing', 'DevOps', 'Cybersecurity'],
-                    'declining_skills': ['Legacy systems'],
-                    'hot_areas': ['Technology', 'Remote work'],
-                    'market_demand': 'High',
-                    'salary_trends': 'Growing',
-                    'recommendations': 'Stay updated with emerging technologies and develop leadership skills'
-                },
-                'career_timeline': {
-                    f'year_{i}': {
-                        'focus': f'Focus for year {i}',
-                        'target_position': next_roles[min(i-1, len(next_roles)-1)]['title'] if i <= len(next_roles) else 'Executive role',
-                        'key_milestones': ['Skill development', 'Project leadership'],
-                        'skills_to_develop': skills[:2] if skills else ['Leadership', 'Technical skills']
-                    }
-                    for i in range(1, years_ahead + 1)
-                },
-                'alternative_paths': [
-                    {
-                        'path': 'Management Track',
-                        'description': 'Transition to people management',
-                        'pros': ['Leadership opportunities', 'Higher earning potential'],
-                        'cons': ['Less hands-on technical work'],
-                        'transition_difficulty': 'Medium'
-                    },
-                    {
-                        'path': 'Technical Expert Track',
-                        'description': 'Deep specialization in technical domain',
-                        'pros': ['Deep expertise', 'Technical influence'],
-                        'cons': ['Narrower scope'],
-                        'transition_difficulty': 'Easy'
-                    }
-                ],
-                'certifications': [
-                    {
-                        'name': 'PMP',
-                        'provider': 'PMI',
-                        'value': 'Medium',
-                        'timeframe': 'Year 2',
-                        'cost_estimate': '$500 - $1000',
-                        'roi': 'Moderate salary increase'
-                    }
-                ],
-                'networking_strategy': {
-                    'target_connections': 'Senior leaders in your field',
-                    'platforms': ['LinkedIn', 'Industry conferences'],
-                    'events': 'Tech conferences and meetups',
-                    'communities': 'Professional associations'
-                },
-                'summary': f'You are at {next_level} level. Focus on developing leadership skills and technical expertise to advance to {next_roles[0]["title"]} within {next_roles[0]["timeframe"]}.'
+        required_skills = skills[:5] or DEFAULT_REQUIRED_SKILLS
+        skills_to_develop = skills[:2] or DEFAULT_SKILLS_TO_DEVELOP
+        
+        return CareerPathResult(
+            method='basic',
+            current_level=next_level,
+            next_role_suggestions=[
+                {
+                    'title': role['title'],
+                    'timeframe': role['timeframe'],
+                    'rationale': 'Natural career progression based on experience',
+                    'readiness_score': 70,
+                    'required_skills': required_skills,
+                    'difficulty': 'Medium'
+                }
+                for role in next_roles[:3]
+            ],
+            skill_roadmap=BASIC_SKILL_ROADMAP,
+            industry_trends=BASIC_INDUSTRY_TRENDS,
+            career_timeline={
+                f'year_{i}': {
+                    'focus': f'Focus for year {i}',
+                    'target_position': next_roles[i - 1]['title'] if i <= len(next_roles) else 'Executive role',
+                    'key_milestones': BASIC_MILESTONES,
+                    'skills_to_develop': skills_to_develop
+                }
+                for i in range(1, years_ahead + 1)
             },
-            'method': 'basic'
-        }
+            alternative_paths=BASIC_ALTERNATIVE_PATHS,
+            certifications=BASIC_CERTIFICATIONS,
+            networking_strategy=BASIC_NETWORKING_STRATEGY,
+            summary=f'You are at {next_level} level. Focus on developing leadership skills and technical expertise to advance to {next_roles[0]["title"]} within {next_roles[0]["timeframe"]}.'
+        )
     
     def _format_experiences(self, experiences):
         """Format experience list for prompt"""
@@ -388,4 +845,4 @@ if __name__ == "__main__":
     
     result = advisor.analyze_career_path(test_profile, target_role="Engineering Manager", years_ahead=5)
     
-    print(json.dumps(result, indent=2))
+    print(json.dumps(result.to_json(), indent=2))
@@ -1,4 +1,8 @@
-import os
+import asyncio
+import contextvars
+import functools
+import io
+import uuid
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -6,10 +10,11 @@ from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.enums import TA_LEFT, TA_JUSTIFY
 from datetime import datetime
-import google.generativeai as genai
-from dotenv import load_dotenv
-
-load_dotenv()
+from instrumentation import span, timed
+from llm_client import get_llm_client
+from prompt_builder import PromptBuilder, HIGH, MEDIUM
+from storage import get_storage
+from jd_cache import job_description_prompt
 
 
 class CoverLetterGenerator:
@@ -17,17 +22,11 @@ class CoverLetterGenerator:
     
     def __init__(self):
         """Initialize the CoverLetterGenerator with Gemini AI"""
-        self.api_key = os.getenv('GEMINI_API_KEY')
-        if self.api_key:
-            genai.configure(api_key=self.api_key)
-            self.model = genai.GenerativeModel('gemini-2.0-flash')
-        else:
-            self.model = None
+        self.llm = get_llm_client()
+        if not self.llm.available:
             print("⚠️  Warning: GEMINI_API_KEY not found. Using basic template.")
         
-        self.output_folder = 'generated_resumes'
-        if not os.path.exists(self.output_folder):
-            os.makedirs(self.output_folder)
+        self.storage = get_storage()
     
     def generate_cover_letter_content(self, profile_data, job_description):
         """
@@ -41,25 +40,51 @@ class CoverLetterGenerator:
             str: Generated cover letter text
         """
         try:
-            model = genai.GenerativeModel('gemini-2.0-flash')
-            
-            # Prepare profile summary
-            experience_summary = "\n".join([
-                f"- {exp.get('title', '')} at {exp.get('company', '')} ({exp.get('duration', '')})"
-                for exp in profile_data.get('experience', [])[:3]
-            ])
-            
-            education_summary = "\n".join([
-                f"- {edu.get('degree', '')} from {edu.get('school', '')}"
-                for edu in profile_data.get('education', [])[:2]
-            ])
-            
-            skills = ", ".join(profile_data.get('skills', [])[:8])
+            prompt = self._create_prompt(profile_data, job_description)
+            result_text = self.llm.generate(prompt, endpoint='cover_letter')
+            return self._finish_cover_letter(result_text, profile_data)
             
-            prompt = f"""
+        except Exception as e:
+            print(f"Error generating cover letter with Gemini: {str(e)}")
+            # Fallback to basic template
+            return self._generate_basic_cover_letter(profile_data, job_description)
+    
+    async def generate_cover_letter_content_async(self, profile_data, job_description, instant=False):
+        """
+        Async version of generate_cover_letter_content for the async/ASGI endpoints
+        
+        With instant=True the template letter is returned without calling Gemini.
+        """
+        if instant:
+            return self._generate_basic_cover_letter(profile_data, job_description)
+        try:
+            prompt = self._create_prompt(profile_data, job_description)
+            result_text = await self.llm.generate_async(prompt, endpoint='cover_letter')
+            return self._finish_cover_letter(result_text, profile_data)
+        except Exception as e:
+            print(f"Error generating cover letter with Gemini: {str(e)}")
+            return self._generate_basic_cover_letter(profile_data, job_description)
+    
+    def _create_prompt(self, profile_data, job_description):
+        """Build the cover letter prompt within the token budget"""
+        # Prepare profile summary
+        experience_summary = "\n".join([
+            f"- {exp.get('title', '')} at {exp.get('company', '')} ({exp.get('duration', '')})"
+            for exp in profile_data.get('experience', [])[:3]
+        ])
+        
+        education_summary = "\n".join([
+            f"- {edu.get('degree', '')} from {edu.get('school', '')}"
+            for edu in profile_data.get('education', [])[:2]
+        ])
+        
+        skills = ", ".join(profile_data.get('skills', [])[:8])
+        
+        builder = PromptBuilder('cover_letter')
+        builder.add("""
 You are a professional career coach and cover letter writer. Write a compelling, personalized cover letter based on the candidate's profile and the job description.
-
-CANDIDATE PROFILE:
+""")
+        builder.add(f"""CANDIDATE PROFILE:
 Name: {profile_data.get('name', '')}
 Headline: {profile_data.get('headline', '')}
 
@@ -72,10 +97,10 @@ Education:
 Skills: {skills}
 
 About: {profile_data.get('about', '')[:300]}
-
-JOB DESCRIPTION:
-{job_description[:2000]}
-
+""", priority=HIGH, compact=True, min_tokens=100)
+        builder.add('\n' + job_description_prompt(job_description, raw_limit=2000),
+                    priority=MEDIUM, compact=True, min_tokens=150)
+        builder.add("""
 CRITICAL INSTRUCTIONS:
 1. Write a professional cover letter (250-350 words maximum)
 2. Address it "Dear Hiring Manager,"
@@ -94,26 +119,21 @@ CRITICAL INSTRUCTIONS:
 15. Focus on VALUE you bring, not just what you want
 
 Write ONLY the cover letter text (no subject line, no additional commentary).
-"""
-            
-            response = model.generate_content(prompt)
-            
-            if response and response.text:
-                cover_letter = response.text.strip()
-                
-                # Clean up any remaining placeholders
-                cover_letter = cover_letter.replace('[Your Name]', profile_data.get('name', ''))
-                cover_letter = cover_letter.replace('[Company Name]', 'the company')
-                
-                return cover_letter
-            
-        except Exception as e:
-            print(f"Error generating cover letter with Gemini: {str(e)}")
-            # Fallback to basic template
-            return self._generate_basic_cover_letter(profile_data, job_description)
+""")
+        return builder.build()
+    
+    def _finish_cover_letter(self, cover_letter, profile_data):
+        """Clean up placeholders left in a generated cover letter"""
+        if not cover_letter:
+            return None
+        
+        # Clean up any remaining placeholders
+        cover_letter = cover_letter.replace('[Your Name]', profile_data.get('name', ''))
+        cover_letter = cover_letter.replace('[Company Name]', 'the company')
         
-        return None
+        return cover_letter
     
+    @timed('fallback')
     def _generate_basic_cover_letter(self, profile_data, job_description):
         """Fallback basic cover letter template"""
         name = profile_data.get('name', 'Candidate')
@@ -162,7 +182,7 @@ Sincerely,
             job_description (str): Job description
             
         Returns:
-            str: Path to generated PDF file
+            str: Name of the stored PDF (download it via /download/<name>)
         """
         # Generate cover letter content with Gemini
         cover_letter_text = self.generate_cover_letter_content(profile_data, job_description)
@@ -170,16 +190,52 @@ Sincerely,
         if not cover_letter_text:
             return None
         
-        # Generate unique filename
+        return self._write_cover_letter_pdf(profile_data, cover_letter_text)
+    
+    async def create_cover_letter_pdf_async(self, profile_data, job_description, instant=False):
+        """Async version of create_cover_letter_pdf; PDF rendering runs in a worker thread"""
+        cover_letter_text = await self.generate_cover_letter_content_async(profile_data, job_description, instant)
+        
+        if not cover_letter_text:
+            return None
+        
+        # run_in_executor rather than asyncio.to_thread (3.9+); the context copy keeps the request's labels
+        render = functools.partial(contextvars.copy_context().run, self._write_cover_letter_pdf, profile_data, cover_letter_text)
+        return await asyncio.get_running_loop().run_in_executor(None, render)
+    
+    def _write_cover_letter_pdf(self, profile_data, cover_letter_text):
+        """
+        Render cover letter text to a PDF and store it
+        
+        Args:
+            profile_data (dict): Resume/profile data (name and contact for the header)
+            cover_letter_text (str): Cover letter body
+            
+        Returns:
+            str: Generated PDF filename
+        """
+        # Generate unique filename (the suffix keeps same-second requests apart)
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"cover_letter_{timestamp}.pdf"
-        filepath = os.path.join(self.output_folder, filename)
+        filename = f"cover_letter_{timestamp}_{uuid.uuid4().hex[:8]}.pdf"
+        buffer = io.BytesIO()
         
         # Create PDF document
-        doc = SimpleDocTemplate(filepath, pagesize=letter,
+        doc = SimpleDocTemplate(buffer, pagesize=letter,
                               rightMargin=0.75*inch, leftMargin=0.75*inch,
                               topMargin=0.75*inch, bottomMargin=0.75*inch)
         
+        story = self._build_story(profile_data, cover_letter_text)
+        
+        # Build PDF
+        with span('pdf_write'):
+            doc.build(story)
+            self.storage.save(filename, buffer.getvalue(), kind='cover_letter')
+        
+        return filename
+    
+    @timed('flowable_build')
+    def _build_story(self, profile_data, cover_letter_text):
+        """Build the reportlab flowables for a cover letter"""
         # Container for PDF elements
         story = []
         
@@ -243,7 +299,4 @@ Sincerely,
             if para.strip():
                 story.append(Paragraph(para.strip(), body_style))
         
-        # Build PDF
-        doc.build(story)
-        
-        return filename
+        return story
@@ -0,0 +1,160 @@
+"""
+Hedging
+Duplicate ("hedged") Gemini requests for the slow tail: when a call has not returned by the
+p90 latency recently observed for its endpoint, a second identical request is sent and
+whichever answers first is used
+
+Hedges are limited to LLM_HEDGE_BUDGET extra requests per call (10% by default), so a
+general slowdown cannot double the traffic, and are only sent once an endpoint has
+LLM_HEDGE_MIN_SAMPLES latencies to take the p90 from.
+"""
+import os
+import threading
+from collections import deque
+from instrumentation import count
+
+# Off by default: every hedge spends quota
+LLM_HEDGE = os.getenv('LLM_HEDGE', 'false').lower() in ('1', 'true', 'yes')
+LLM_HEDGE_ENDPOINTS = tuple(name.strip() for name in os.getenv('LLM_HEDGE_ENDPOINTS', 'ats,skill_gap').split(',')
+                            if name.strip())
+# Extra requests allowed per call, on average
+LLM_HEDGE_BUDGET = float(os.getenv('LLM_HEDGE_BUDGET', '0.1'))
+# Latency quantile after which the hedge is sent, and the floor for that delay
+LLM_HEDGE_QUANTILE = float(os.getenv('LLM_HEDGE_QUANTILE', '0.9'))
+LLM_HEDGE_MIN_DELAY = float(os.getenv('LLM_HEDGE_MIN_DELAY', '0.05'))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv('LLM_HEDGE_MIN_SAMPLES', '20'))
+
+# Recent latencies kept per endpoint
+WINDOW_SIZE = 500
+# Unspent budget carried over, in hedges, so a quiet spell cannot bank a burst of them
+MAX_BANKED_HEDGES = 10
+
+
+def quantile(values, q):
+    """Nearest-rank quantile of a non-empty sorted list"""
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class LatencyWindow:
+    """Most recent call latencies (seconds) of one endpoint"""
+
+    def __init__(self, size=WINDOW_SIZE):
+        self.samples = deque(maxlen=size)
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+
+    def quantiles(self, *qs):
+        """Quantiles of the window, or None per quantile if it is empty"""
+        ordered = sorted(self.samples)
+        return [quantile(ordered, q) if ordered else None for q in qs]
+
+
+class HedgePolicy:
+    """Decides when to hedge a call, within the budget, and keeps the numbers behind it"""
+
+    def __init__(self, enabled=LLM_HEDGE, endpoints=LLM_HEDGE_ENDPOINTS, budget=LLM_HEDGE_BUDGET,
+                 hedge_quantile=LLM_HEDGE_QUANTILE, min_delay=LLM_HEDGE_MIN_DELAY, min_samples=LLM_HEDGE_MIN_SAMPLES):
+        """
+        Args:
+            enabled (bool): Hedge at all
+            endpoints (tuple): Calling features to hedge ('*' for all)
+            budget (float): Extra requests allowed per call
+            hedge_quantile (float): Latency quantile after which to hedge
+            min_delay (float): Shortest wait before hedging, in seconds
+            min_samples (int): Latencies needed before an endpoint is hedged
+        """
+        self.enabled = enabled
+        self.endpoints = set(endpoints)
+        self.budget = budget
+        self.hedge_quantile = hedge_quantile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        # Latency of each single request (what the hedge delay is based on) and of each call
+        # as its caller saw it (what hedging improves)
+        self._requests = {}
+        self._calls = {}
+        self._counts = {}
+        self._banked = 0.0
+        self._lock = threading.Lock()
+
+    def applies(self, endpoint):
+        """True if calls from this endpoint may be hedged"""
+        return self.enabled and ('*' in self.endpoints or endpoint in self.endpoints)
+
+    def delay(self, endpoint):
+        """
+        Seconds to wait for the first request before hedging (earns this call's share of budget)
+
+        Returns:
+            float: Delay, or None if the endpoint has too few samples yet
+        """
+        with self._lock:
+            self._banked = min(MAX_BANKED_HEDGES, self._banked + self.budget)
+            self._count(endpoint, 'calls')
+            window = self._requests.get(endpoint)
+            if window is None or len(window.samples) < self.min_samples:
+                return None
+        return max(self.min_delay, window.quantiles(self.hedge_quantile)[0])
+
+    def try_spend(self, endpoint):
+        """Take one hedge from the budget; False (and counted) if it is spent"""
+        with self._lock:
+            if self._banked < 1:
+                self._count(endpoint, 'over_budget')
+                count('app_llm_hedges_total', endpoint=endpoint, outcome='over_budget')
+                return False
+            self._banked -= 1
+            self._count(endpoint, 'hedged')
+        count('app_llm_hedges_total', endpoint=endpoint, outcome='sent')
+        return True
+
+    def record_request(self, endpoint, seconds):
+        """Latency of one successful request"""
+        with self._lock:
+            self._requests.setdefault(endpoint, LatencyWindow()).add(seconds)
+
+    def record_call(self, endpoint, seconds, hedge_won=None):
+        """
+        Latency of a call as its caller saw it
+
+        Args:
+            hedge_won (bool): For hedged calls, whether the duplicate answered first
+        """
+        with self._lock:
+            self._calls.setdefault(endpoint, LatencyWindow()).add(seconds)
+            if hedge_won is not None:
+                self._count(endpoint, 'hedge_won' if hedge_won else 'hedge_lost')
+        if hedge_won is not None:
+            count('app_llm_hedges_total', endpoint=endpoint, outcome='won' if hedge_won else 'lost')
+
+    def _count(self, endpoint, name):
+        """Per-endpoint tally for stats() (caller holds the lock)"""
+        counts = self._counts.setdefault(endpoint, {})
+        counts[name] = counts.get(name, 0) + 1
+
+    def stats(self):
+        """
+        Returns:
+            dict: Per endpoint: calls, hedge rate and win rate, and call latency p50/p90/p99 in ms
+        """
+        with self._lock:
+            endpoints = sorted(set(self._counts) | set(self._calls))
+            report = {}
+            for endpoint in endpoints:
+                counts = self._counts.get(endpoint, {})
+                calls = counts.get('calls', 0)
+                hedged = counts.get('hedged', 0)
+                p50, p90, p99 = (self._calls[endpoint].quantiles(0.5, 0.9, 0.99)
+                                 if endpoint in self._calls else (None, None, None))
+                report[endpoint] = {
+                    'calls': calls,
+                    'hedged': hedged,
+                    'hedge_rate': round(hedged / calls, 3) if calls else 0,
+                    'hedge_wins': counts.get('hedge_won', 0),
+                    'over_budget': counts.get('over_budget', 0),
+                    'p50_ms': round(p50 * 1000) if p50 is not None else None,
+                    'p90_ms': round(p90 * 1000) if p90 is not None else None,
+                    'p99_ms': round(p99 * 1000) if p99 is not None else None
+                }
+        return {'enabled': self.enabled, 'budget': self.budget, 'endpoints': report}
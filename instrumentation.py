@@ -0,0 +1,214 @@
+"""
+Instrumentation
+Lightweight per-stage timers and counters with a Prometheus text exporter
+"""
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import wraps
+
+# Histogram bucket upper bounds in seconds: sub-millisecond stages (cleaning, JSON
+# extraction) up to slow LLM calls and scraper page loads
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                    1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+STAGE_METRIC = 'app_stage_duration_seconds'
+REQUEST_METRIC = 'app_request_duration_seconds'
+
+METRIC_HELP = {
+    STAGE_METRIC: ('histogram', 'Time spent in each processing stage, by route'),
+    REQUEST_METRIC: ('histogram', 'End-to-end request latency, by route, method and status'),
+    'app_stage_errors_total': ('counter', 'Stages that exited with an exception'),
+    'app_llm_requests_total': ('counter', 'Gemini calls by calling feature and outcome'),
+    'app_llm_retries_total': ('counter', 'Gemini calls retried after a 429 (on another key) or a 5xx (after a jittered backoff)'),
+    'app_llm_key_requests_total': ('counter', 'Gemini requests per API key (labelled key0, key1, ...) by outcome (ok, rate_limited or error)'),
+    'app_llm_key_waits_total': ('counter', 'Calls that waited for an API key with capacity, or gave up (exhausted)'),
+    'app_llm_queue_seconds': ('histogram', 'Time Gemini calls waited in the scheduler, by priority class'),
+    'app_llm_scheduled_total': ('counter', 'Gemini calls admitted by the scheduler, by priority class'),
+    'app_llm_hedges_total': ('counter', 'Duplicate Gemini requests for slow calls: sent, won (answered first), lost, or skipped over budget'),
+    'app_llm_coalesced_total': ('counter', 'Requests that joined an identical in-flight Gemini call instead of making their own'),
+    'app_career_sections_total': ('counter', 'Progressive career sections served, by section and source (ai, cached or fallback)'),
+    'app_interview_shards_total': ('counter', 'Per-category interview question calls in sharded mode, answered or replaced by local questions'),
+    'app_json_extract_total': ('counter', 'LLM responses parsed completely, salvaged from truncated output, or failed (malformed), by feature'),
+    'app_prompt_tokens_total': ('counter', 'Estimated prompt tokens before (raw) and after (sent) compaction'),
+    'app_interview_questions_total': ('counter', 'Interview questions served, by source (bank, ai or template)'),
+    'app_storage_evictions_total': ('counter', 'Generated PDFs deleted by the storage manager, by kind and reason (ttl or quota)'),
+    'app_profile_fields_total': ('counter', 'LinkedIn profile fields parsed locally, re-extracted by Gemini, or kept from local parsing after Gemini failed'),
+    'app_jd_cache_total': ('counter', 'Job description requirement lookups served from the cache (hit) or extracted (miss)'),
+    'app_skill_gap_batch_total': ('counter', 'Job descriptions in batch skill gap comparisons: ranked locally, analyzed by Gemini, or Gemini failed'),
+    'app_upgrades_total': ('counter', 'Background LLM upgrades of instant responses, started and finished by outcome'),
+}
+
+# Route of the request being served; spans opened anywhere below it are labelled with it
+current_route = ContextVar('current_route', default='none')
+
+
+class Histogram:
+    """Cumulative-bucket histogram (bucket counts are stored per bucket and summed on export)"""
+
+    __slots__ = ('buckets', 'total', 'count')
+
+    def __init__(self):
+        self.buckets = [0] * (len(DURATION_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+
+class MetricsRegistry:
+    """Thread-safe store of histograms and counters keyed by metric name and label values"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def observe(self, name, labels, seconds):
+        """
+        Record a duration
+
+        Args:
+            name (str): Metric name
+            labels (tuple): ((label, value), ...) pairs in a fixed order
+            seconds (float): Observed duration
+        """
+        index = bisect_left(DURATION_BUCKETS, seconds)
+        key = (name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.buckets[index] += 1
+            histogram.total += seconds
+            histogram.count += 1
+
+    def inc(self, name, labels, amount=1):
+        """Add to a counter"""
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def reset(self):
+        """Drop every recorded value"""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self):
+        """
+        Export everything in the Prometheus text exposition format
+
+        Returns:
+            str: Metrics text (content type text/plain; version=0.0.4)
+        """
+        with self._lock:
+            histograms = [(key, list(h.buckets), h.total, h.count) for key, h in self._histograms.items()]
+            counters = list(self._counters.items())
+
+        lines = []
+        written = set()
+
+        def header(name):
+            if name not in written:
+                written.add(name)
+                kind, text = METRIC_HELP.get(name, ('untyped', name))
+                lines.append(f"# HELP {name} {text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), buckets, total, observations in sorted(histograms, key=lambda item: item[0]):
+            header(name)
+            label_text = _format_labels(labels)
+            prefix = label_text[:-1] + ',' if label_text else '{'
+            cumulative = 0
+            for bound, bucket_count in zip(DURATION_BUCKETS, buckets):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{prefix}le="+Inf"}} {observations}')
+            lines.append(f"{name}_sum{label_text} {total:.6f}")
+            lines.append(f"{name}_count{label_text} {observations}")
+
+        for (name, labels), value in sorted(counters, key=lambda item: item[0]):
+            header(name)
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+registry = MetricsRegistry()
+
+
+class span:
+    """
+    Time a block as a processing stage of the current route
+
+    Usage:
+        with span('llm_call'):
+            ...
+    """
+
+    __slots__ = ('stage', 'start')
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        labels = (('route', current_route.get()), ('stage', self.stage))
+        registry.observe(STAGE_METRIC, labels, elapsed)
+        if exc_type is not None:
+            registry.inc('app_stage_errors_total', labels)
+        return False
+
+
+def timed(stage):
+    """Decorator form of span for functions, methods and coroutine functions"""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, amount=1, **labels):
+    """Increment a counter (label order follows the keyword order)"""
+    registry.inc(name, tuple(labels.items()), amount)
+
+
+def start_request(route):
+    """Label subsequent spans in this context with route; returns a token for end_request"""
+    return current_route.set(route)
+
+
+def end_request(token, method, status, seconds):
+    """Record a finished request and restore the previous route label"""
+    registry.observe(REQUEST_METRIC, (('route', current_route.get()), ('method', method), ('status', str(status))), seconds)
+    current_route.reset(token)
+
+
+def render_metrics():
+    """Prometheus text for every metric recorded in this process"""
+    return registry.render()
@@ -2,26 +2,128 @@
 Interview Question Generator
 Generates personalized interview questions based on resume and job description
 """
-import google.generativeai as genai
+import asyncio
+import contextvars
 import os
-from dotenv import load_dotenv
-import json
-import re
+from concurrent.futures import ThreadPoolExecutor
+from llm_client import get_llm_client
+from instrumentation import timed, count
+from analysis_results import InterviewQuestionsResult, QUESTION_CATEGORIES, freeze
+from json_extract import extract_json
+from prompt_builder import PromptBuilder, HIGH, MEDIUM, LOW
+from question_bank import get_question_bank, question_key
+from wire_schema import INTERVIEW_WIRE, compact_wire
+from jd_cache import job_description_prompt
 
-load_dotenv()
+# Share of question_count served from the local question bank; Gemini writes the rest
+QUESTION_BANK_FILL = float(os.getenv('QUESTION_BANK_FILL', '0.7'))
+# Ask Gemini for each category in its own concurrent call instead of one large response
+INTERVIEW_SHARDED = os.getenv('INTERVIEW_SHARDED', 'false').lower() in ('1', 'true', 'yes')
 
+# Example item per category for WIRE_FORMAT=verbose, shared by the single prompt and the shard prompts
+CATEGORY_EXAMPLES = {
+    'technical_questions': '{"question": "...", "category": "System Design", "difficulty": "Easy|Medium|Hard", "why_asking": "link to their resume", "key_points": ["..."], "star_template": {"situation": "...", "task": "...", "action": "...", "result": "..."}, "red_flags": ["..."], "follow_up_questions": ["..."]}',
+    'behavioral_questions': '{"question": "...", "category": "Teamwork & Collaboration", "difficulty": "...", "why_asking": "...", "key_points": ["..."], "star_template": {"situation": "...", "task": "...", "action": "...", "result": "..."}, "good_answer_example": "...", "red_flags": ["..."]}',
+    'experience_based_questions': '{"question": "...", "category": "Experience Verification", "difficulty": "...", "why_asking": "...", "key_points": ["..."], "preparation_tip": "...", "likely_follow_ups": ["..."]}',
+    'company_culture_questions': '{"question": "...", "category": "Cultural Fit", "difficulty": "...", "why_asking": "...", "key_points": ["..."], "preparation_tip": "...", "avoid": ["..."]}',
+    'situational_questions': '{"question": "...", "category": "Problem Solving", "difficulty": "...", "why_asking": "...", "key_points": ["..."], "good_approach": "..."}',
+    'weakness_questions': '{"question": "...", "category": "Resume Gaps & Concerns", "difficulty": "...", "why_asking": "...", "key_points": ["..."], "preparation_tip": "...", "avoid": ["..."]}',
+    'questions_to_ask_interviewer': '{"question": "...", "why_effective": "...", "category": "Role Clarity"}'
+}
+STRATEGY_EXAMPLE = '{"strengths_to_highlight": ["..."], "potential_concerns": ["..."], "preparation_priorities": ["..."], "company_research_checklist": ["..."]}'
+
+# Share of the Gemini-written questions per category in sharded mode; the bank already
+# covers the standard kinds, so the profile-specific categories get most of them
+SHARD_SHARES = (('technical_questions', 0.3), ('experience_based_questions', 0.25), ('weakness_questions', 0.15),
+                ('behavioral_questions', 0.15), ('situational_questions', 0.1), ('company_culture_questions', 0.05))
+# The shard that writes questions to ask and the overall strategy (not counted as questions)
+EXTRAS_SHARD = 'extras'
+EXTRAS_FIELDS = ('questions_to_ask_interviewer', 'overall_strategy')
+# Fields the single-call prompt asks for (questions to ask come from the constants)
+PROMPT_FIELDS = tuple(CATEGORY_EXAMPLES) + ('overall_strategy',)
+
+MOCK_INTERVIEW_SCORECARD = freeze({
+    "criteria": [
+        {
+            "area": "Technical Competence",
+            "weight": 30,
+            "evaluation_points": ["Depth of knowledge", "Problem-solving approach", "Code quality if applicable"]
+        },
+        {
+            "area": "Communication Skills",
+            "weight": 25,
+            "evaluation_points": ["Clarity", "Conciseness", "Active listening"]
+        },
+        {
+            "area": "Cultural Fit",
+            "weight": 20,
+            "evaluation_points": ["Values alignment", "Team collaboration", "Adaptability"]
+        },
+        {
+            "area": "Experience Relevance",
+            "weight": 15,
+            "evaluation_points": ["Direct experience with required skills", "Transferable skills", "Learning agility"]
+        },
+        {
+            "area": "Professionalism",
+            "weight": 10,
+            "evaluation_points": ["Punctuality", "Preparedness", "Follow-up"]
+        }
+    ]
+})
+
+BASIC_QUESTIONS_TO_ASK = freeze([
+    {
+        "question": "What does success look like in this role?",
+        "why_effective": "Shows performance orientation",
+        "category": "Role Clarity"
+    },
+    {
+        "question": "What are the biggest challenges facing the team?",
+        "why_effective": "Demonstrates problem-solving mindset",
+        "category": "Team Dynamics"
+    },
+    {
+        "question": "How does the company support professional development?",
+        "why_effective": "Shows commitment to growth",
+        "category": "Career Growth"
+    },
+    {
+        "question": "What is the team culture like?",
+        "why_effective": "Assesses fit and work environment",
+        "category": "Culture"
+    }
+])
+
+BASIC_STRATEGY = freeze({
+    "preparation_priorities": [
+        "Research the company thoroughly",
+        "Review your resume and be ready to discuss any point",
+        "Prepare 2-3 strong examples for STAR method questions",
+        "Practice your 'tell me about yourself' answer",
+        "Prepare thoughtful questions for the interviewer"
+    ],
+    "company_research_checklist": [
+        "Company website and mission",
+        "Recent news and press releases",
+        "Product or service offerings",
+        "LinkedIn profiles of interviewers",
+        "Glassdoor reviews"
+    ]
+})
 
 class InterviewQuestionGenerator:
     """Generate personalized interview questions for job preparation"""
     
-    def __init__(self):
-        api_key = os.getenv('GEMINI_API_KEY')
-        if api_key:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-2.0-flash')
-            self.use_ai = True
-        else:
-            self.use_ai = False
+    def __init__(self, sharded=INTERVIEW_SHARDED):
+        """
+        Args:
+            sharded (bool): Generate each category with its own concurrent Gemini call
+        """
+        self.llm = get_llm_client()
+        self.use_ai = self.llm.available
+        self.sharded = sharded
+        if not self.use_ai:
             print("Warning: GEMINI_API_KEY not found. Using basic question templates.")
     
     def generate_questions(self, profile_data, job_description=None, question_count=25):
@@ -34,24 +136,183 @@ class InterviewQuestionGenerator:
             question_count (int): Number of questions to generate (default 25)
             
         Returns:
-            dict: Interview questions with categories, difficulty, and tips
+            InterviewQuestionsResult: Interview questions with categories, difficulty, and tips
         """
         if self.use_ai:
             return self._generate_with_ai(profile_data, job_description, question_count)
         else:
-            return self._generate_basic_questions(profile_data, job_description)
+            return self._generate_basic_questions(profile_data, job_description, question_count)
+    
+    async def generate_questions_async(self, profile_data, job_description=None, question_count=25, instant=False):
+        """
+        Async version of generate_questions for the async/ASGI endpoints
+        
+        With instant=True the questions come from the bank without calling Gemini.
+        """
+        if instant or not self.use_ai:
+            return self._generate_basic_questions(profile_data, job_description, question_count)
+        
+        try:
+            if self.sharded:
+                return await self._generate_sharded_async(profile_data, job_description, question_count)
+            bank_questions = self._select_bank_questions(profile_data, job_description, question_count)
+            ai_count = question_count - self._count(bank_questions)
+            prompt = self._create_prompt(profile_data, job_description, ai_count, bank_questions)
+            result_text = await self.llm.generate_async(prompt, endpoint='interview_questions',
+                                                      response_schema=self._response_schema())
+            return self._parse_ai_response(result_text, ai_count, bank_questions)
+        except Exception as e:
+            print(f"❌ AI question generation error: {str(e)}")
+            return self._generate_basic_questions(profile_data, job_description, question_count)
     
     def _generate_with_ai(self, profile_data, job_description, question_count):
-        """Use Gemini AI to generate intelligent, personalized interview questions"""
+        """Fill most questions from the bank and have Gemini write the profile-specific rest"""
         
         try:
-            # Prepare profile summary
-            user_skills = profile_data.get('skills', [])
-            experiences = profile_data.get('experience', [])
-            education = profile_data.get('education', [])
-            current_title = experiences[0].get('title', 'N/A') if experiences else 'N/A'
+            if self.sharded:
+                return self._generate_sharded(profile_data, job_description, question_count)
+            bank_questions = self._select_bank_questions(profile_data, job_description, question_count)
+            ai_count = question_count - self._count(bank_questions)
+            prompt = self._create_prompt(profile_data, job_description, ai_count, bank_questions)
+            result_text = self.llm.generate(prompt, endpoint='interview_questions', response_schema=self._response_schema())
+            return self._parse_ai_response(result_text, ai_count, bank_questions)
+            
+        except Exception as e:
+            print(f"❌ AI question generation error: {str(e)}")
+            return self._generate_basic_questions(profile_data, job_description, question_count)
+    
+    def _generate_sharded(self, profile_data, job_description, question_count):
+        """Sharded mode on blocking callers: one thread per shard, so latency is the slowest shard"""
+        bank_questions, prompts = self._shard_prompts(profile_data, job_description, question_count)
+        with ThreadPoolExecutor(max_workers=len(prompts)) as pool:
+            # Each shard runs in a copy of this request's context, so it keeps the scheduler
+            # priority, tenant and route label (pool threads do not inherit contextvars)
+            futures = {shard: pool.submit(contextvars.copy_context().run, self.llm.generate, prompt,
+                                          'interview_questions', self._response_schema(shard))
+                       for shard, (prompt, _) in prompts.items()}
+            replies = {}
+            for shard, future in futures.items():
+                try:
+                    replies[shard] = future.result()
+                except Exception as e:
+                    replies[shard] = e
+        return self._merge_shards(profile_data, job_description, question_count, bank_questions, prompts, replies)
+    
+    async def _generate_sharded_async(self, profile_data, job_description, question_count):
+        """Sharded mode on the event loop: shards are gathered concurrently"""
+        bank_questions, prompts = self._shard_prompts(profile_data, job_description, question_count)
+        results = await asyncio.gather(
+            *(self.llm.generate_async(prompt, endpoint='interview_questions', response_schema=self._response_schema(shard))
+              for shard, (prompt, _) in prompts.items()),
+            return_exceptions=True)
+        replies = dict(zip(prompts, results))
+        return self._merge_shards(profile_data, job_description, question_count, bank_questions, prompts, replies)
+    
+    def _shard_prompts(self, profile_data, job_description, question_count):
+        """
+        Split the Gemini share of question_count into per-category prompts
+        
+        Returns:
+            tuple: (bank questions, {shard: (prompt, question count)})
+        """
+        bank_questions = self._select_bank_questions(profile_data, job_description, question_count)
+        sizes = self._shard_sizes(question_count - self._count(bank_questions))
+        prompts = {
+            category: (self._create_shard_prompt(profile_data, job_description, category, size,
+                                                 bank_questions.get(category)), size)
+            for category, size in sizes.items() if size
+        }
+        prompts[EXTRAS_SHARD] = (self._create_shard_prompt(profile_data, job_description, EXTRAS_SHARD, 0), 0)
+        return bank_questions, prompts
+    
+    def _shard_sizes(self, question_count):
+        """Split question_count between the categories by SHARD_SHARES, largest remainders first"""
+        exact = [(category, question_count * share) for category, share in SHARD_SHARES]
+        sizes = {category: int(value) for category, value in exact}
+        leftover = question_count - sum(sizes.values())
+        for category, _ in sorted(exact, key=lambda item: sizes[item[0]] - item[1])[:leftover]:
+            sizes[category] += 1
+        return sizes
+    
+    def _merge_shards(self, profile_data, job_description, question_count, bank_questions, prompts, replies):
+        """
+        Combine shard replies into one result; a failed shard falls back on its own
+        
+        Args:
+            replies (dict): Reply text, or the exception raised, per shard
+        """
+        fields = {}
+        fallbacks = []
+        spare = None
+        # Local stand-ins for failed shards are merged and counted like the bank questions
+        bank_questions = {category: list(items) for category, items in bank_questions.items()}
+        for shard, (_, size) in prompts.items():
+            reply = replies.get(shard)
+            try:
+                if isinstance(reply, Exception):
+                    raise reply
+                fields.update(self._parse_shard(shard, reply, size))
+                count('app_interview_shards_total', shard=shard, outcome='ok')
+                continue
+            except Exception as e:
+                print(f"⚠️  Interview shard {shard} failed, using local questions: {str(e)}")
+                count('app_interview_shards_total', shard=shard, outcome='fallback')
+                fallbacks.append(shard)
             
-            profile_summary = f"""
+            if shard == EXTRAS_SHARD:
+                fields.update(questions_to_ask_interviewer=BASIC_QUESTIONS_TO_ASK, overall_strategy=BASIC_STRATEGY)
+            else:
+                if spare is None:
+                    spare = self._spare_questions(profile_data, job_description, question_count, bank_questions)
+                bank_questions.setdefault(shard, []).extend(spare.get(shard, [])[:size])
+        
+        if len(fallbacks) == len(prompts):
+            return self._generate_basic_questions(profile_data, job_description, question_count)
+        
+        result = InterviewQuestionsResult(**{'technical_questions': [], 'behavioral_questions': [], **fields})
+        if fallbacks:
+            result.note = f"Local questions used for: {', '.join(fallbacks)}"
+        return self._parse_ai_response(None, question_count, bank_questions, result=result)
+    
+    def _parse_shard(self, shard, result_text, size):
+        """Validate one shard reply and keep at most the questions it was asked for"""
+        if shard == EXTRAS_SHARD:
+            value = extract_json(result_text, {'required': {'questions_to_ask_interviewer': list},
+                                               'defaults': {'overall_strategy': {}}}, name='interview_questions',
+                                 transform=INTERVIEW_WIRE.expand)
+            return {'questions_to_ask_interviewer': value['questions_to_ask_interviewer'],
+                    'overall_strategy': value['overall_strategy']}
+        value = extract_json(result_text, {'required': {shard: list}, 'defaults': {}}, name='interview_questions',
+                             transform=INTERVIEW_WIRE.expand)
+        return {shard: value[shard][:size]}
+    
+    def _spare_questions(self, profile_data, job_description, question_count, bank_questions):
+        """Bank questions not already selected, plus the templated ones, to stand in for failed shards"""
+        selected = {question_key(item['question']) for items in bank_questions.values() for item in items}
+        spare = {category: [item for item in items if question_key(item['question']) not in selected]
+                 for category, items in get_question_bank().select(profile_data, job_description, question_count).items()}
+        for category, items in self._template_questions(profile_data).items():
+            spare[category] = items + spare.get(category, [])
+        return spare
+    
+    def _select_bank_questions(self, profile_data, job_description, question_count):
+        """Bank questions for the AI path; at least one question is always left to Gemini"""
+        bank_count = min(int(question_count * QUESTION_BANK_FILL), question_count - 1)
+        return get_question_bank().select(profile_data, job_description, bank_count)
+    
+    def _count(self, questions):
+        """Number of questions in a dict of question lists"""
+        return sum(len(items) for items in questions.values())
+    
+    def _start_prompt(self, profile_data, job_description, task):
+        """Prompt builder holding the task, candidate profile and job description"""
+        # Prepare profile summary
+        user_skills = profile_data.get('skills', [])
+        experiences = profile_data.get('experience', [])
+        education = profile_data.get('education', [])
+        current_title = experiences[0].get('title', 'N/A') if experiences else 'N/A'
+        
+        profile_summary = f"""
 CANDIDATE PROFILE:
 Name: {profile_data.get('name', 'N/A')}
 Current/Recent Role: {current_title}
@@ -68,177 +329,44 @@ Education:
 About:
 {profile_data.get('about', 'N/A')[:500]}
 """
-            
-            job_context = ""
-            if job_description:
-                job_context = f"""
-
-TARGET JOB DESCRIPTION:
-{job_description[:2000]}
-
+        
+        builder = PromptBuilder('interview_questions')
+        builder.add(f"""
+You are an expert interview coach and technical recruiter. {task}
+""")
+        builder.add(profile_summary, priority=HIGH, min_tokens=150)
+        if job_description:
+            builder.add(f"""
+{job_description_prompt(job_description, 'TARGET JOB DESCRIPTION:', raw_limit=2000)}
 NOTE: Questions should be highly relevant to this specific job posting.
-"""
-            else:
-                job_context = "\n\nNOTE: No specific job provided. Generate questions based on the candidate's background and common interview patterns for their field."
-            
-            prompt = f"""
-You are an expert interview coach and technical recruiter. Generate a comprehensive, personalized set of interview questions for this candidate.
-
-{profile_summary}
-{job_context}
-
-Generate EXACTLY {question_count} interview questions in the following JSON format:
-
-{{
-    "technical_questions": [
-        {{
-            "question": "Explain how you would design a scalable microservices architecture",
-            "category": "System Design",
-            "difficulty": "Hard",
-            "why_asking": "Tests your understanding of distributed systems mentioned in your resume",
-            "key_points": ["Mention load balancing", "Discuss database sharding", "Address fault tolerance"],
-            "star_template": {{
-                "situation": "Describe a project where you implemented this",
-                "task": "What was your specific responsibility?",
-                "action": "What steps did you take?",
-                "result": "What was the measurable outcome?"
-            }},
-            "red_flags": ["Avoid being too theoretical", "Don't skip over scalability concerns"],
-            "follow_up_questions": [
-                "How would you handle service failures?",
-                "What monitoring tools would you use?"
-            ]
-        }}
-    ],
-    "behavioral_questions": [
-        {{
-            "question": "Tell me about a time when you had to deal with a difficult team member",
-            "category": "Teamwork & Collaboration",
-            "difficulty": "Medium",
-            "why_asking": "You mentioned leading teams in your experience at [Company]",
-            "key_points": ["Show empathy and communication skills", "Demonstrate conflict resolution", "Highlight positive outcome"],
-            "star_template": {{
-                "situation": "Set the context - what was the conflict about?",
-                "task": "What was at stake? What needed to be resolved?",
-                "action": "What specific steps did you take to address the situation?",
-                "result": "How did it turn out? What did you learn?"
-            }},
-            "good_answer_example": "Brief example of a strong answer approach",
-            "red_flags": ["Don't blame others entirely", "Avoid being vague about your role"]
-        }}
-    ],
-    "experience_based_questions": [
-        {{
-            "question": "I see you worked on [specific project/technology]. Can you walk me through your contribution?",
-            "category": "Experience Verification",
-            "difficulty": "Medium",
-            "why_asking": "Directly from your resume - verifying your actual involvement",
-            "key_points": ["Be specific about YOUR role vs team's role", "Mention concrete deliverables", "Discuss challenges overcome"],
-            "preparation_tip": "Review this project in detail before the interview",
-            "likely_follow_ups": [
-                "What was the biggest technical challenge?",
-                "How did you measure success?",
-                "What would you do differently now?"
-            ]
-        }}
-    ],
-    "company_culture_questions": [
-        {{
-            "question": "Why do you want to work for our company?",
-            "category": "Cultural Fit",
-            "difficulty": "Medium",
-            "why_asking": "Assessing genuine interest and culture alignment",
-            "key_points": ["Research the company's mission and values", "Connect your experience to their needs", "Show enthusiasm"],
-            "preparation_tip": "Research the company's recent news, products, and culture",
-            "avoid": ["Don't just talk about salary/benefits", "Avoid generic answers"]
-        }}
-    ],
-    "situational_questions": [
-        {{
-            "question": "How would you handle a situation where you're assigned a project with an unrealistic deadline?",
-            "category": "Problem Solving",
-            "difficulty": "Medium",
-            "why_asking": "Tests your prioritization and communication skills",
-            "key_points": ["Show you can assess scope realistically", "Demonstrate communication with stakeholders", "Discuss negotiation or trade-offs"],
-            "good_approach": "Framework for answering this type of question"
-        }}
-    ],
-    "weakness_questions": [
-        {{
-            "question": "I notice you have a gap in employment from [date] to [date]. Can you explain?",
-            "category": "Resume Gaps & Concerns",
-            "difficulty": "Hard",
-            "why_asking": "Addressing potential red flags from your resume",
-            "key_points": ["Be honest but positive", "Emphasize what you learned/did during that time", "Pivot to current readiness"],
-            "preparation_tip": "Prepare honest, concise explanation in advance",
-            "avoid": ["Don't be defensive", "Don't overshare personal details"]
-        }}
-    ],
-    "questions_to_ask_interviewer": [
-        {{
-            "question": "What does success look like in this role after 6 months?",
-            "why_effective": "Shows you're thinking about performance and impact",
-            "category": "Role Clarity"
-        }},
-        {{
-            "question": "What are the biggest challenges facing the team right now?",
-            "why_effective": "Demonstrates problem-solving mindset and genuine interest",
-            "category": "Team Dynamics"
-        }},
-        {{
-            "question": "How does the company support professional development and learning?",
-            "why_effective": "Shows commitment to growth and long-term thinking",
-            "category": "Career Growth"
-        }}
-    ],
-    "overall_strategy": {{
-        "strengths_to_highlight": [
-            "Based on resume, emphasize these 3-5 key strengths"
-        ],
-        "potential_concerns": [
-            "Areas where you might face skepticism (lack of specific experience, etc.)"
-        ],
-        "preparation_priorities": [
-            "Top 3-5 things to prepare before the interview"
-        ],
-        "company_research_checklist": [
-            "Recent company news",
-            "Product/service offerings",
-            "Company culture and values",
-            "Team structure",
-            "Competitors and market position"
-        ]
-    }},
-    "mock_interview_scorecard": {{
-        "criteria": [
-            {{
-                "area": "Technical Competence",
-                "weight": 30,
-                "evaluation_points": ["Depth of knowledge", "Problem-solving approach", "Code quality if applicable"]
-            }},
-            {{
-                "area": "Communication Skills",
-                "weight": 25,
-                "evaluation_points": ["Clarity", "Conciseness", "Active listening"]
-            }},
-            {{
-                "area": "Cultural Fit",
-                "weight": 20,
-                "evaluation_points": ["Values alignment", "Team collaboration", "Adaptability"]
-            }},
-            {{
-                "area": "Experience Relevance",
-                "weight": 15,
-                "evaluation_points": ["Direct experience with required skills", "Transferable skills", "Learning agility"]
-            }},
-            {{
-                "area": "Professionalism",
-                "weight": 10,
-                "evaluation_points": ["Punctuality", "Preparedness", "Follow-up"]
-            }}
-        ]
-    }}
-}}
+""", priority=MEDIUM, compact=True, min_tokens=150)
+        else:
+            builder.add("\nNOTE: No specific job provided. Generate questions based on the candidate's background and common interview patterns for their field.")
+        return builder
+    
+    def _create_prompt(self, profile_data, job_description, question_count, bank_questions=None):
+        """
+        Build the interview question prompt within the token budget
+        
+        Args:
+            profile_data (dict): User's profile data
+            job_description (str): Target job description (optional)
+            question_count (int): Number of questions Gemini should write
+            bank_questions (dict): Question lists already filled from the bank (optional)
+        """
+        builder = self._start_prompt(profile_data, job_description,
+                                     "Generate a comprehensive, personalized set of interview questions for this candidate.")
+        covered = [item['question'] for items in (bank_questions or {}).values() for item in items]
+        if covered:
+            builder.add("\nALREADY COVERED (standard questions we already have; do NOT repeat or rephrase them):\n"
+                        + "\n".join(f"- {question}" for question in covered), priority=LOW)
+            builder.add("\nThe standard questions are covered, so write only what needs this candidate's resume: favor experience_based_questions, weakness_questions and technical questions about their specific projects and technologies.")
+        response_format = self._response_format(
+            PROMPT_FIELDS,
+            f"Generate EXACTLY {question_count} interview questions as JSON with these keys (one example item per list; omit optional fields you have nothing specific for):",
+            f"Generate EXACTLY {question_count} interview questions.\n")
+        builder.add(f"""
+{response_format}
 
 CRITICAL INSTRUCTIONS:
 1. Make questions SPECIFIC to this candidate's background - reference actual companies, technologies, or experiences from their resume
@@ -253,94 +381,153 @@ CRITICAL INSTRUCTIONS:
 10. Include behavioral questions based on their actual work experiences
 
 Return ONLY valid JSON, no markdown formatting.
-"""
-            
-            response = self.model.generate_content(prompt)
-            json_str = self._extract_json(response.text)
-            questions_data = json.loads(json_str)
-            
-            print(f"✅ Generated {question_count} personalized interview questions with AI")
-            
-            return {
-                'success': True,
-                'questions': questions_data,
-                'total_questions': self._count_questions(questions_data),
-                'method': 'ai_powered',
-                'personalization_level': 'high'
-            }
-            
-        except Exception as e:
-            print(f"❌ AI question generation error: {str(e)}")
-            return self._generate_basic_questions(profile_data, job_description)
+""")
+        return builder.build()
+    
+    def _create_shard_prompt(self, profile_data, job_description, shard, question_count, covered_questions=None):
+        """
+        Build the prompt for one shard: a single question category, or the extras
+        (questions to ask and the overall strategy)
+        
+        Args:
+            shard (str): Result field of the category, or EXTRAS_SHARD
+            question_count (int): Number of questions Gemini should write for the category
+            covered_questions (list): Bank questions already filled in this category (optional)
+        """
+        if shard == EXTRAS_SHARD:
+            builder = self._start_prompt(profile_data, job_description,
+                                         "Prepare this candidate's interview strategy and the questions they should ask.")
+            builder.add(f"""
+{self._response_format(EXTRAS_FIELDS, "Return JSON with these keys:")}
+
+Write 4-6 questions to ask that fit this role and company, and base the strengths and concerns on the actual resume.
+Return ONLY valid JSON, no markdown formatting.
+""")
+            return builder.build()
+        
+        label = shard.replace('_questions', '').replace('_', ' ')
+        builder = self._start_prompt(profile_data, job_description,
+                                     f"Generate personalized {label} interview questions for this candidate.")
+        if covered_questions:
+            builder.add("\nALREADY COVERED (do NOT repeat or rephrase):\n"
+                        + "\n".join(f"- {item['question']}" for item in covered_questions), priority=LOW)
+        response_format = self._response_format(
+            (shard,), f"Generate EXACTLY {question_count} questions as JSON (omit optional fields you have nothing specific for):",
+            f"Generate EXACTLY {question_count} questions.\n")
+        builder.add(f"""
+{response_format}
+
+Make every question SPECIFIC to this candidate - reference actual companies, technologies or experiences from the resume - and explain WHY it is asked. Mix difficulty: 40% Easy, 40% Medium, 20% Hard.
+Return ONLY valid JSON, no markdown formatting.
+""")
+        return builder.build()
+    
+    def _response_schema(self, shard=None):
+        """Structured-output schema matching the single-call prompt, or one shard's prompt"""
+        if shard is None:
+            return InterviewQuestionsResult.response_schema(PROMPT_FIELDS)
+        if shard == EXTRAS_SHARD:
+            return InterviewQuestionsResult.response_schema(EXTRAS_FIELDS, ['questions_to_ask_interviewer'])
+        return InterviewQuestionsResult.response_schema([shard], [shard])
+    
+    def _response_format(self, names, verbose_intro, compact_intro=''):
+        """
+        Reply format for the given result fields: compact keys (see wire_schema.py) or,
+        with WIRE_FORMAT=verbose, one JSON example item per list
+        """
+        if compact_wire():
+            return compact_intro + INTERVIEW_WIRE.describe(names)
+        lines = [f'    "{name}": [{CATEGORY_EXAMPLES[name]}]' for name in names if name in CATEGORY_EXAMPLES]
+        if 'overall_strategy' in names:
+            lines.append(f'    "overall_strategy": {STRATEGY_EXAMPLE}')
+        return verbose_intro + '\n\n{\n' + ',\n'.join(lines) + '\n}'
     
-    def _generate_basic_questions(self, profile_data, job_description):
-        """Generate basic template questions when AI is unavailable"""
+    def _parse_ai_response(self, result_text, question_count, bank_questions=None, result=None):
+        """
+        Turn a Gemini response into the generate_questions result, merged with the bank questions
+        
+        Args:
+            result (InterviewQuestionsResult): Already assembled result (sharded mode) instead of result_text
+        """
+        if result is None:
+            result = InterviewQuestionsResult.from_llm(result_text, 'interview_questions')
+        
+        # The scorecard is the same for every candidate, so it is attached here
+        # instead of being requested from the model
+        result.mock_interview_scorecard = MOCK_INTERVIEW_SCORECARD
+        
+        # Also de-duplicates across the categories Gemini wrote
+        self._merge_bank_questions(result, bank_questions or {})
+        ai_questions = result.total_questions - result.bank_questions
+        count('app_interview_questions_total', result.bank_questions, source='bank')
+        count('app_interview_questions_total', ai_questions, source='ai')
+        
+        print(f"✅ Generated {ai_questions} personalized interview questions with AI "
+              f"(+{result.bank_questions} from the question bank)")
+        return result
+    
+    def _merge_bank_questions(self, result, bank_questions):
+        """Put bank questions first in each category and drop generated questions that repeat them"""
+        seen = {question_key(item['question']) for items in bank_questions.values() for item in items}
+        for name in QUESTION_CATEGORIES:
+            merged = list(bank_questions.get(name, ()))
+            for item in getattr(result, name) or ():
+                key = question_key(item.get('question')) if isinstance(item, dict) else None
+                if key:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                merged.append(item)
+            setattr(result, name, merged)
+        result.bank_questions = self._count(bank_questions)
+    
+    @timed('fallback')
+    def _generate_basic_questions(self, profile_data, job_description, question_count=25):
+        """Fill the question count from the question bank when AI is unavailable"""
+        
+        print("⚠️ Using the question bank. Enable AI for personalized questions.")
         
+        # Two templated questions reference the profile directly; the bank fills the rest
+        templates = self._template_questions(profile_data)
+        bank_questions = get_question_bank().select(profile_data, job_description, question_count - 2)
+        bank_count = self._count(bank_questions)
+        count('app_interview_questions_total', bank_count, source='bank')
+        count('app_interview_questions_total', 2, source='template')
+        
+        return InterviewQuestionsResult(
+            method='template_based',
+            personalization_level='low',
+            note='Configure GEMINI_API_KEY for AI-powered personalized questions',
+            bank_questions=bank_count,
+            technical_questions=templates['technical_questions'] + bank_questions['technical_questions'],
+            behavioral_questions=bank_questions['behavioral_questions'],
+            experience_based_questions=templates['experience_based_questions'],
+            company_culture_questions=bank_questions['company_culture_questions'],
+            situational_questions=bank_questions['situational_questions'],
+            questions_to_ask_interviewer=BASIC_QUESTIONS_TO_ASK,
+            overall_strategy=BASIC_STRATEGY
+        )
+    
+    def _template_questions(self, profile_data):
+        """
+        Templated questions that name the candidate's first skill and latest title
+
+        The bank has no weakness questions, so the templated ones are the only local
+        stand-ins for a failed weakness_questions shard.
+        """
         current_title = profile_data.get('experience', [{}])[0].get('title', 'professional') if profile_data.get('experience') else 'professional'
         skills = profile_data.get('skills', [])
-        
-        basic_questions = {
-            "technical_questions": [
+        return {
+            'technical_questions': [
                 {
                     "question": f"Explain your experience with {skills[0] if skills else 'your main technical skill'}",
                     "category": "Technical Skills",
                     "difficulty": "Medium",
                     "why_asking": "Listed on your resume",
                     "key_points": ["Provide specific examples", "Mention projects", "Discuss challenges"]
-                },
-                {
-                    "question": "Describe a challenging technical problem you solved",
-                    "category": "Problem Solving",
-                    "difficulty": "Medium",
-                    "key_points": ["Explain the problem clearly", "Describe your approach", "Share the outcome"]
-                },
-                {
-                    "question": "How do you stay updated with the latest technology trends?",
-                    "category": "Continuous Learning",
-                    "difficulty": "Easy",
-                    "key_points": ["Mention specific resources", "Discuss recent learnings", "Show passion"]
                 }
             ],
-            "behavioral_questions": [
-                {
-                    "question": "Tell me about yourself and your background",
-                    "category": "Introduction",
-                    "difficulty": "Easy",
-                    "key_points": ["Keep it under 2 minutes", "Focus on professional journey", "Connect to this role"],
-                    "star_template": {
-                        "situation": "Your current/recent role",
-                        "task": "What you're responsible for",
-                        "action": "Key achievements",
-                        "result": "Why you're interested in this opportunity"
-                    }
-                },
-                {
-                    "question": "Describe a time when you had to work under pressure",
-                    "category": "Stress Management",
-                    "difficulty": "Medium",
-                    "key_points": ["Show composure", "Explain prioritization", "Highlight successful outcome"],
-                    "star_template": {
-                        "situation": "What was the high-pressure scenario?",
-                        "task": "What was expected of you?",
-                        "action": "How did you manage it?",
-                        "result": "What was achieved?"
-                    }
-                },
-                {
-                    "question": "Tell me about a time you failed and what you learned",
-                    "category": "Growth Mindset",
-                    "difficulty": "Hard",
-                    "key_points": ["Be honest", "Focus on learning", "Show how you've improved"],
-                    "red_flags": ["Don't blame others", "Don't minimize the failure"]
-                },
-                {
-                    "question": "How do you handle conflicts with team members?",
-                    "category": "Teamwork",
-                    "difficulty": "Medium",
-                    "key_points": ["Show empathy", "Demonstrate communication", "Focus on resolution"]
-                }
-            ],
-            "experience_based_questions": [
+            'experience_based_questions': [
                 {
                     "question": f"What was your role and contribution as {current_title}?",
                     "category": "Experience Verification",
@@ -348,69 +535,24 @@ Return ONLY valid JSON, no markdown formatting.
                     "key_points": ["Be specific about your role", "Quantify impact", "Mention team size if applicable"]
                 }
             ],
-            "company_culture_questions": [
+            'weakness_questions': [
                 {
-                    "question": "Why do you want to work here?",
-                    "category": "Cultural Fit",
+                    "question": f"What was the hardest part of your work as {current_title}, and what did you learn from it?"
+                    if profile_data.get('experience') else
+                    "Your profile lists no work experience yet. How has your other background prepared you for this role?",
+                    "category": "Resume Gaps & Concerns",
                     "difficulty": "Medium",
-                    "preparation_tip": "Research company mission, values, and recent news"
+                    "key_points": ["Name a real difficulty", "Show what you changed", "End on the result"],
+                    "avoid": ["Blaming others", "A strength disguised as a weakness"]
                 },
                 {
-                    "question": "Where do you see yourself in 5 years?",
-                    "category": "Career Goals",
+                    "question": f"Which skill besides {skills[0] if skills else 'your main technical skill'} are you working to improve, and how?",
+                    "category": "Resume Gaps & Concerns",
                     "difficulty": "Easy",
-                    "key_points": ["Show ambition", "Align with company growth", "Be realistic"]
-                }
-            ],
-            "questions_to_ask_interviewer": [
-                {
-                    "question": "What does success look like in this role?",
-                    "why_effective": "Shows performance orientation",
-                    "category": "Role Clarity"
-                },
-                {
-                    "question": "What are the biggest challenges facing the team?",
-                    "why_effective": "Demonstrates problem-solving mindset",
-                    "category": "Team Dynamics"
-                },
-                {
-                    "question": "How does the company support professional development?",
-                    "why_effective": "Shows commitment to growth",
-                    "category": "Career Growth"
-                },
-                {
-                    "question": "What is the team culture like?",
-                    "why_effective": "Assesses fit and work environment",
-                    "category": "Culture"
+                    "key_points": ["Pick a skill the role needs", "Describe concrete steps", "Mention progress so far"],
+                    "avoid": ["Claiming you have no weaknesses"]
                 }
-            ],
-            "overall_strategy": {
-                "preparation_priorities": [
-                    "Research the company thoroughly",
-                    "Review your resume and be ready to discuss any point",
-                    "Prepare 2-3 strong examples for STAR method questions",
-                    "Practice your 'tell me about yourself' answer",
-                    "Prepare thoughtful questions for the interviewer"
-                ],
-                "company_research_checklist": [
-                    "Company website and mission",
-                    "Recent news and press releases",
-                    "Product or service offerings",
-                    "LinkedIn profiles of interviewers",
-                    "Glassdoor reviews"
-                ]
-            }
-        }
-        
-        print("⚠️ Using basic question templates. Enable AI for personalized questions.")
-        
-        return {
-            'success': True,
-            'questions': basic_questions,
-            'total_questions': self._count_questions(basic_questions),
-            'method': 'template_based',
-            'personalization_level': 'low',
-            'note': 'Configure GEMINI_API_KEY for AI-powered personalized questions'
+            ]
         }
     
     def _format_experiences(self, experiences):
@@ -438,32 +580,3 @@ Return ONLY valid JSON, no markdown formatting.
             formatted.append(f"{i}. {edu.get('degree', 'N/A')} in {edu.get('field', 'N/A')} from {edu.get('school', 'N/A')}")
         
         return "\n".join(formatted)
-    
-    def _extract_json(self, text):
-        """Extract JSON from AI response that may contain markdown"""
-        # Remove markdown code blocks
-        text = re.sub(r'^```json\s*', '', text.strip())
-        text = re.sub(r'^```\s*', '', text.strip())
-        text = re.sub(r'\s*```$', '', text.strip())
-        
-        # Find JSON object bounds
-        start = text.find('{')
-        end = text.rfind('}') + 1
-        
-        if start != -1 and end > start:
-            return text[start:end]
-        
-        return text
-    
-    def _count_questions(self, questions_data):
-        """Count total number of questions generated"""
-        count = 0
-        question_categories = ['technical_questions', 'behavioral_questions', 
-                             'experience_based_questions', 'company_culture_questions',
-                             'situational_questions', 'weakness_questions']
-        
-        for category in question_categories:
-            if category in questions_data:
-                count += len(questions_data[category])
-        
-        return count
@@ -0,0 +1,370 @@
+"""
+Job Description Cache
+Normalizes and fingerprints job descriptions and keeps the requirements extracted from each
+one (role title, company, seniority, years, required and preferred skills, responsibilities),
+so a posting many users apply to is interpreted once per process
+
+Analyzers send Gemini the posting text (JD_PROMPT_FORMAT=raw, the default) or, with
+JD_PROMPT_FORMAT=structured, the compact requirements block (JobRequirements.to_prompt).
+"""
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from instrumentation import count, timed
+from job_matcher import get_keyword_matcher
+
+# Distinct job descriptions kept; the least recently used is dropped when full
+JD_CACHE_SIZE = int(os.getenv('JD_CACHE_SIZE', '1000'))
+# raw: the posting text in prompts; structured: compact requirements block (opt-in until the
+# extraction has been checked on more real postings)
+JD_PROMPT_FORMAT = os.getenv('JD_PROMPT_FORMAT', 'raw')
+
+# Responsibilities and skills carried into prompts
+MAX_RESPONSIBILITIES = 6
+MAX_SKILLS = 20
+# Requirement lines carried into prompts as posted (degrees, certifications, clearances, ...)
+MAX_REQUIREMENT_LINES = 12
+
+# Section headings, by the section they open
+SECTION_HEADINGS = {
+    'responsibilities': ('responsibilities', 'key responsibilities', 'what you will do', "what you'll do",
+                         'the role', 'duties', 'your role', 'role overview'),
+    'requirements': ('requirements', 'qualifications', 'basic qualifications', 'minimum qualifications',
+                     'required qualifications', 'what you bring', "what you'll bring", 'must have',
+                     'must-have', 'who you are', 'required skills', 'skills'),
+    'preferred': ('nice to have', 'nice-to-have', 'preferred', 'preferred qualifications', 'bonus points',
+                  'bonus', 'pluses', 'good to have')
+}
+# Job board header lines that are never the role title
+HEADER_LINES = frozenset(('about the job', 'job description', 'about the role', 'about this role',
+                          'about the position', 'job details', 'job summary', 'position summary', 'overview',
+                          'description', 'full job description', 'job overview'))
+HEADING_SECTION = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+
+# Seniority by title word, most specific first
+SENIORITY_WORDS = (
+    ('intern', 'intern'), ('junior', 'junior'), ('jr', 'junior'), ('entry', 'junior'), ('graduate', 'junior'),
+    ('principal', 'principal'), ('staff', 'staff'), ('director', 'director'), ('head', 'director'),
+    ('vp', 'executive'), ('chief', 'executive'), ('lead', 'lead'), ('manager', 'manager'),
+    ('senior', 'senior'), ('sr', 'senior'), ('mid', 'mid'), ('intermediate', 'mid')
+)
+
+BULLET = re.compile(r'^\s*(?:[-*•·▪●◦‣–—]|\d+[.)])\s*')
+YEARS = re.compile(r'(\d{1,2})\s*\+?\s*(?:(?:-|to|–)\s*(\d{1,2})\s*\+?\s*)?years?', re.IGNORECASE)
+YEARS_OF = re.compile(YEARS.pattern + r'(?:\s+of)?', re.IGNORECASE)
+ROLE_IN_SENTENCE = re.compile(r"(?:looking for|hiring|seeking) (?:an? )?(?:experienced |talented )?"
+                              r"([A-Z][\w/&+.-]*(?: [A-Z][\w/&+.-]*){0,5})")
+COMPANY = re.compile(r"\b(?:at|join|About) ((?:[A-Z][\w&.'-]*)(?: [A-Z][\w&.'-]*){0,3})")
+# "Acme Corp is hiring ...", "Acme are looking for ..."
+COMPANY_SUBJECT = re.compile(r"\b(?!(?:We|You|They|Our|This|The|It)\b)((?:[A-Z][\w&.'-]*)(?: [A-Z][\w&.'-]*){0,3}) (?:is|are) (?:hiring|looking|seeking)")
+# Lead-ins around the skill names in a requirement line
+SKILL_LEAD_INS = re.compile(
+    r"\b(?:(?:strong|solid|deep|proven|hands-on|good|excellent|working|practical|professional)\s+)*"
+    r"(?:experience|familiarity|knowledge|proficiency|expertise|understanding|background|skills?|fluency)"
+    r"(?:\s+(?:with|in|of|using))?\b|\bproficient (?:in|with)\b|\bskills\b|\bfamiliar with\b", re.IGNORECASE)
+SKILL_SEPARATORS = re.compile(r'[,;]|\band\b|\bor\b|\bas well as\b|\bincluding\b', re.IGNORECASE)
+SKILL_ADJECTIVES = re.compile(r'^(?:(?:strong|solid|deep|proven|hands-on|good|excellent|modern)\s+)+', re.IGNORECASE)
+NOT_A_SKILL = re.compile(r'^(?:a|an|the|another|other|any|similar|related|equivalent|etc|e\.g)\b', re.IGNORECASE)
+# Posting chrome that differs between copies of the same job
+BOILERPLATE = re.compile(r'^(?:apply|easy apply|save|share|report this job|show more|see more|show less)$',
+                         re.IGNORECASE)
+
+
+def normalize_job_description(text):
+    """
+    Canonical form of a posting for fingerprinting: Unicode-normalized, lowercased, bullets
+    unified, page chrome dropped and whitespace collapsed
+
+    Returns:
+        str: Normalized text
+    """
+    text = unicodedata.normalize('NFKC', text or '')
+    lines = []
+    for line in text.splitlines():
+        line = BULLET.sub('- ', line).strip()
+        if line and not BOILERPLATE.match(line):
+            lines.append(' '.join(line.lower().split()))
+    return '\n'.join(lines)
+
+
+def fingerprint(text):
+    """Fingerprint of a posting: the same job pasted with different spacing, case or bullets matches"""
+    return hashlib.sha256(normalize_job_description(text).encode('utf-8')).hexdigest()[:32]
+
+
+def _heading(line):
+    """Section a line opens, or None if it is not a heading"""
+    key = line.strip().rstrip(':').strip().lower()
+    return HEADING_SECTION.get(key) if len(key) < 40 else None
+
+
+def _split_sections(lines):
+    """Map section name -> bullet texts; lines before any known heading go to 'intro'"""
+    sections = {'intro': []}
+    current = 'intro'
+    for line in lines:
+        section = _heading(line)
+        if section:
+            current = section
+            sections.setdefault(current, [])
+            continue
+        text = BULLET.sub('', line).strip()
+        if text:
+            sections.setdefault(current, []).append(text)
+    return sections
+
+
+def _skills_in(line):
+    """Skill names listed in a requirement line ("Strong Python and SQL skills" -> Python, SQL)"""
+    line = re.sub(r'\([^)]*\)', '', line)
+    skills = []
+    for part in SKILL_SEPARATORS.split(SKILL_LEAD_INS.sub(',', line)):
+        part = SKILL_ADJECTIVES.sub('', part.strip(' .:-'))
+        if part and len(part.split()) <= 3 and not NOT_A_SKILL.match(part):
+            skills.append(part)
+    return skills
+
+
+def _unique(items, limit):
+    """Case-insensitive de-duplication, keeping the first spelling"""
+    seen = set()
+    unique = []
+    for item in items:
+        if item.lower() not in seen:
+            seen.add(item.lower())
+            unique.append(item)
+    return unique[:limit]
+
+
+class JobRequirements:
+    """What a job description asks for, extracted once per fingerprint"""
+
+    __slots__ = ('fingerprint', 'text', 'role_title', 'company', 'seniority', 'years_required',
+                 'required_skills', 'preferred_skills', 'responsibilities', 'requirement_lines', 'keywords')
+
+    def __init__(self, fingerprint, text, role_title='', company='', seniority='', years_required=None,
+                 required_skills=(), preferred_skills=(), responsibilities=(), requirement_lines=(), keywords=()):
+        self.fingerprint = fingerprint
+        self.text = text
+        self.role_title = role_title
+        self.company = company
+        self.seniority = seniority
+        self.years_required = years_required
+        self.required_skills = list(required_skills)
+        self.preferred_skills = list(preferred_skills)
+        self.responsibilities = list(responsibilities)
+        # Requirement lines as posted, so non-skill requirements (degrees, certifications) reach the prompt
+        self.requirement_lines = list(requirement_lines)
+        # Ranked (term, weight) pairs from KeywordMatcher, reused by every keyword score
+        self.keywords = list(keywords)
+
+    @classmethod
+    def extract(cls, text, key=None):
+        """
+        Extract requirements from posting text
+
+        Args:
+            text (str): Job description as pasted
+            key (str): Its fingerprint (computed if omitted)
+        """
+        lines = [line.strip() for line in unicodedata.normalize('NFKC', text).splitlines() if line.strip()]
+        sections = _split_sections(lines)
+        intro = sections.get('intro', [])
+
+        # Title: a short first line that is not a sentence or header, else "looking for a <Title>"
+        first = next((line for line in lines if line.rstrip(':').strip().lower() not in HEADER_LINES), '')
+        role_title = ''
+        if first and len(first) <= 80 and not first.endswith(('.', ':')) and not _heading(first):
+            role_title = first
+        else:
+            match = ROLE_IN_SENTENCE.search(' '.join(intro))
+            role_title = match.group(1) if match else ''
+
+        # Joined by newlines so a name cannot run on from the line above
+        company_match = COMPANY_SUBJECT.search('\n'.join(intro)) or COMPANY.search('\n'.join(intro))
+        company = company_match.group(1).rstrip('.') if company_match else ''
+
+        years = [int(match.group(1)) for match in YEARS.finditer(text)]
+        years_required = min(years) if years else None
+
+        title_words = re.findall(r'[a-z]+', role_title.lower())
+        seniority = next((level for word, level in SENIORITY_WORDS if word in title_words), '')
+        if not seniority and years_required is not None:
+            seniority = 'junior' if years_required <= 2 else 'mid' if years_required <= 5 else 'senior'
+
+        # "5+ years of Python" lists Python; the years are kept separately
+        required = [skill for line in sections.get('requirements', [])
+                    for skill in _skills_in(YEARS_OF.sub(',', line))]
+        preferred = [skill for line in sections.get('preferred', []) for skill in _skills_in(line)]
+        ranked = get_keyword_matcher().rank_terms(text)
+        if not required:
+            # No requirements section: the most distinctive terms stand in
+            required = [term for term, _ in get_keyword_matcher().extract_keywords(text, top_n=12)]
+
+        responsibilities = [line[:160] for line in sections.get('responsibilities', [])[:MAX_RESPONSIBILITIES]]
+        requirement_lines = [line[:160] for line in
+                             (sections.get('requirements', []) + sections.get('preferred', []))[:MAX_REQUIREMENT_LINES]]
+
+        return cls(key or fingerprint(text), text, role_title, company, seniority, years_required,
+                   _unique(required, MAX_SKILLS), _unique(preferred, MAX_SKILLS), responsibilities,
+                   requirement_lines, ranked)
+
+    def to_prompt(self):
+        """Compact requirements block for LLM prompts"""
+        lines = ["JOB REQUIREMENTS (extracted from the job description):"]
+        if self.role_title:
+            lines.append(f"Role: {self.role_title}")
+        if self.company:
+            lines.append(f"Company: {self.company}")
+        if self.seniority:
+            lines.append(f"Seniority: {self.seniority}")
+        if self.years_required is not None:
+            lines.append(f"Experience: {self.years_required}+ years")
+        if self.required_skills:
+            lines.append(f"Required skills: {', '.join(self.required_skills)}")
+        if self.preferred_skills:
+            lines.append(f"Nice to have: {', '.join(self.preferred_skills)}")
+        if self.responsibilities:
+            lines.append("Responsibilities:")
+            lines.extend(f"- {line}" for line in self.responsibilities)
+        if self.requirement_lines:
+            lines.append("Requirements as posted:")
+            lines.extend(f"- {line}" for line in self.requirement_lines)
+        return '\n'.join(lines)
+
+    def to_json(self):
+        return {
+            'fingerprint': self.fingerprint,
+            'role_title': self.role_title,
+            'company': self.company,
+            'seniority': self.seniority,
+            'years_required': self.years_required,
+            'required_skills': self.required_skills,
+            'preferred_skills': self.preferred_skills,
+            'responsibilities': self.responsibilities,
+            'requirement_lines': self.requirement_lines
+        }
+
+
+class JobDescriptionCache:
+    """JobRequirements by fingerprint; the least recently used posting is dropped when full"""
+
+    def __init__(self, max_entries=JD_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @timed('jd_extract')
+    def get(self, text):
+        """
+        Requirements of a posting, extracted on first sight
+
+        Args:
+            text (str): Job description as pasted
+
+        Returns:
+            JobRequirements: Shared, read-only record
+        """
+        key = fingerprint(text)
+        with self._lock:
+            requirements = self._entries.get(key)
+            if requirements is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if requirements is not None:
+            count('app_jd_cache_total', outcome='hit')
+            return requirements
+
+        # Extracted outside the lock; two first requests for one posting may both extract it
+        requirements = JobRequirements.extract(text, key)
+        count('app_jd_cache_total', outcome='miss')
+        with self._lock:
+            requirements = self._entries.setdefault(key, requirements)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return requirements
+
+    def stats(self):
+        """
+        Returns:
+            dict: Entry count, capacity, and hit/miss counts
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0,
+                'prompt_format': JD_PROMPT_FORMAT
+            }
+
+
+_default_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_jd_cache():
+    """Return the process-wide JobDescriptionCache"""
+    global _default_cache
+    if _default_cache is None:
+        with _cache_lock:
+            if _default_cache is None:
+                _default_cache = JobDescriptionCache()
+    return _default_cache
+
+
+def job_description_prompt(job_description, heading='JOB DESCRIPTION:', raw_limit=None):
+    """
+    Job description block for an LLM prompt
+
+    Args:
+        job_description (str): Posting text
+        heading (str): Line above the posting in raw format
+        raw_limit (int): Characters of the posting sent in raw format
+
+    Returns:
+        str: The cached requirements (JD_PROMPT_FORMAT=structured) or the posting under heading (raw)
+    """
+    if JD_PROMPT_FORMAT == 'raw':
+        return f"{heading}\n{job_description[:raw_limit]}\n"
+    return get_jd_cache().get(job_description).to_prompt() + '\n'
+
+
+def job_keywords(job_description):
+    """Ranked KeywordMatcher terms of a posting, from the cache"""
+    return get_jd_cache().get(job_description).keywords
+
+
+# Test
+if __name__ == "__main__":
+    sample = """Senior Backend Engineer - Platform
+
+We are looking for a Senior Backend Engineer to join our platform team at Acme Payments.
+
+Responsibilities
+- Design and build scalable REST and event-driven services in Python or Go
+- Mentor engineers and lead technical design reviews
+
+Requirements
+- 5+ years of backend development experience
+- Strong Python and SQL skills; experience with PostgreSQL
+- Hands-on experience with AWS, Docker and Kubernetes
+
+Nice to have
+- Experience in payments or fintech
+"""
+    cache = get_jd_cache()
+    requirements = cache.get(sample)
+    print(requirements.to_prompt())
+    reformatted = sample.replace('\n- ', '\n• ').upper()
+    print(f"\nSame fingerprint after re-formatting: {cache.get(reformatted) is requirements}")
@@ -0,0 +1,254 @@
+"""
+Job Matcher
+Local keyword-coverage scoring of a resume against a job description (no LLM required)
+"""
+import math
+import os
+import re
+from collections import Counter
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+BACKGROUND_CORPUS_PATH = os.path.join(DATA_DIR, 'background_corpus.txt')
+
+# Tokens keep the characters that matter in tech terms: c++, c#, node.js, ci/cd
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each etc every few for from
+further had has have having he her here hers him his how i if in into is it its itself just
+like may me might more most must my no nor not of off on once only or other our ours out over
+own per plus same she should so some such than that the their theirs them then there these
+they this those through to too under until up upon us very via was we well were what when where
+which while who whom why will with within without would you your yours yourself
+able ability across apply background based bring candidate candidates closely company day
+desired environment etc excellent experience familiarity including job knowledge looking new
+one position preferred proven related required requirements responsibilities responsible role
+seeking skill skills strong successful team teams understanding using work working year years
+""".split())
+
+# Terms the background corpus has never seen are only trusted when they look
+# technical or repeat in the job description; otherwise company names and
+# one-off words would dominate the ranking.
+_TECHNICAL_CHARS = re.compile(r"[0-9+#./]")
+_NUMERIC = re.compile(r"^[0-9.,/-]+\+?$")
+
+
+def tokenize(text):
+    """Lowercase and split text into normalized word tokens"""
+    return [_normalize(token) for token in TOKEN_PATTERN.findall(text.lower())]
+
+
+def _surface_forms(text):
+    """Map normalized tokens back to how they were first written ('kubernete' -> 'Kubernetes')"""
+    forms = {}
+    for match in TOKEN_PATTERN.finditer(text.lower()):
+        original = text[match.start():match.end()].rstrip('.')
+        forms.setdefault(_normalize(match.group()), original)
+    return forms
+
+
+def _normalize(token):
+    """Fold simple plurals so 'APIs' matches 'API' and 'databases' matches 'database'"""
+    token = token.rstrip('.')
+    if len(token) > 3 and token.isalpha() and token.endswith('s') and not token.endswith(('ss', 'us', 'is')):
+        return token[:-1]
+    return token
+
+
+def _terms(tokens):
+    """Yield unigram and bigram terms, skipping stopwords"""
+    previous = None
+    for token in tokens:
+        if token in STOPWORDS or _NUMERIC.match(token):
+            previous = None
+            continue
+        yield token
+        if previous:
+            yield f"{previous} {token}"
+        previous = token
+
+
+class KeywordMatcher:
+    """Extract weighted JD keywords with TF-IDF and measure resume coverage"""
+
+    def __init__(self, corpus_path=BACKGROUND_CORPUS_PATH):
+        self.document_frequency = Counter()
+        self.document_count = 0
+        self._load_corpus(corpus_path)
+
+    def _load_corpus(self, corpus_path):
+        """Build document frequencies from the bundled background corpus"""
+        if not os.path.exists(corpus_path):
+            print(f"⚠️  Warning: background corpus not found at {corpus_path}")
+            return
+
+        with open(corpus_path, encoding='utf-8') as corpus:
+            for line in corpus:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                self.document_frequency.update(set(_terms(tokenize(line))))
+                self.document_count += 1
+
+    def idf(self, term):
+        """Smoothed inverse document frequency of a term"""
+        return math.log((self.document_count + 1) / (self.document_frequency.get(term, 0) + 1)) + 1
+
+    def extract_keywords(self, job_description, top_n=25):
+        """
+        Extract the most distinctive terms of a job description
+
+        Args:
+            job_description (str): Job description text
+            top_n (int): Maximum number of keywords to return
+
+        Returns:
+            list: (keyword, weight) tuples sorted by descending weight
+        """
+        forms = _surface_forms(job_description or '')
+        return [(self._display(term, forms), weight) for term, weight in self._rank_terms(job_description, top_n)]
+
+    def _display(self, term, forms):
+        """Render a normalized term the way the job description spelled it"""
+        return ' '.join(forms.get(word, word) for word in term.split())
+
+    def rank_terms(self, job_description, top_n=25):
+        """Ranked (normalized term, weight) pairs of a job description, reusable with score()"""
+        return self._rank_terms(job_description, top_n)
+
+    def _rank_terms(self, job_description, top_n):
+        """TF-IDF rank the normalized terms of a job description"""
+        if not job_description:
+            return []
+
+        counts = Counter(_terms(tokenize(job_description)))
+        weighted = {}
+        for term, count in counts.items():
+            is_bigram = ' ' in term
+            if self.document_frequency.get(term, 0) == 0 and count < 2:
+                if is_bigram or not _TECHNICAL_CHARS.search(term):
+                    continue
+            if is_bigram and count < 2 and term not in self.document_frequency:
+                continue
+            weight = (1 + math.log(count)) * self.idf(term)
+            if is_bigram:
+                weight *= 1.5
+            weighted[term] = weight
+
+        ranked = sorted(weighted.items(), key=lambda item: (-item[1], item[0]))
+
+        # Drop terms overlapping a stronger selected bigram ("full stack" beats
+        # "stack developer" and "stack")
+        keywords = []
+        covered = set()
+        for term, weight in ranked:
+            words = term.split()
+            if any(word in covered for word in words):
+                continue
+            keywords.append((term, round(weight, 3)))
+            if len(words) > 1:
+                covered.update(words)
+            if len(keywords) >= top_n:
+                break
+
+        return keywords
+
+    def score(self, resume_text, job_description, top_n=25, keywords=None):
+        """
+        Score how well a resume covers the weighted keywords of a job description
+
+        Args:
+            resume_text (str): Resume text (e.g. ATSAnalyzer._format_profile_for_analysis output)
+            job_description (str): Job description text
+            top_n (int): Number of JD keywords to evaluate
+            keywords (list): The job description's rank_terms() result, if already known
+
+        Returns:
+            dict: Coverage score (0-100), matched and missing keywords
+        """
+        keywords = self._rank_terms(job_description, top_n) if keywords is None else keywords[:top_n]
+        return self._coverage(set(_terms(tokenize(resume_text or ''))), job_description, keywords)
+
+    def score_many(self, resume_text, job_descriptions, top_n=25, keywords=None):
+        """
+        Score one resume against many job descriptions, tokenizing the resume once
+
+        Args:
+            resume_text (str): Resume text
+            job_descriptions (list): Job description texts
+            top_n (int): Number of JD keywords to evaluate per job description
+            keywords (list): Each job description's rank_terms() result, if already known
+
+        Returns:
+            list: One score() result per job description, in order
+        """
+        resume_terms = set(_terms(tokenize(resume_text or '')))
+        if keywords is None:
+            keywords = [self._rank_terms(job_description, top_n) for job_description in job_descriptions]
+        return [self._coverage(resume_terms, job_description, ranked[:top_n])
+                for job_description, ranked in zip(job_descriptions, keywords)]
+
+    def _coverage(self, resume_terms, job_description, keywords):
+        """Weighted share of the ranked keywords found among the resume terms"""
+        if not keywords:
+            return {
+                'score': 0,
+                'matched_keywords': [],
+                'missing_keywords': [],
+                'keywords_evaluated': 0
+            }
+
+        total_weight = sum(weight for _, weight in keywords)
+        matched_weight = 0.0
+        matched = []
+        missing = []
+
+        forms = _surface_forms(job_description)
+        for term, weight in keywords:
+            if term in resume_terms:
+                matched.append(self._display(term, forms))
+                matched_weight += weight
+            else:
+                missing.append(self._display(term, forms))
+
+        return {
+            'score': int(round(100 * matched_weight / total_weight)),
+            'matched_keywords': matched,
+            'missing_keywords': missing,
+            'keywords_evaluated': len(keywords)
+        }
+
+
+_default_matcher = None
+
+
+def get_keyword_matcher():
+    """Return a shared KeywordMatcher so the corpus is only indexed once per process"""
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = KeywordMatcher()
+    return _default_matcher
+
+
+# Test
+if __name__ == "__main__":
+    import time
+
+    test_job = """
+    We are looking for a Senior Full Stack Developer with:
+    - 5+ years experience in Python and JavaScript
+    - Strong knowledge of React, Node.js, and MongoDB
+    - Experience with AWS and Docker, CI/CD pipelines and Kubernetes
+    - Machine Learning background preferred; machine learning models in production
+    """
+    test_resume = "Software Engineer. Skills: Python, JavaScript, React, SQL, Docker"
+
+    matcher = get_keyword_matcher()
+    start = time.perf_counter()
+    result = matcher.score(test_resume, test_job)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print(matcher.extract_keywords(test_job, top_n=10))
+    print(result)
+    print(f"Scored in {elapsed_ms:.2f} ms")
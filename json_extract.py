@@ -0,0 +1,274 @@
+"""
+JSON Extraction
+One extractor for every LLM consumer: tolerates markdown fences and chatter around the
+JSON, salvages the valid prefix of truncated output and validates against a per-analyzer schema
+"""
+import copy
+import json
+import re
+import threading
+from collections import deque
+from instrumentation import count, span
+
+NUMBER = (int, float)
+
+# JSON Schema type names for the Python types used in extraction schemas
+JSON_TYPES = {str: 'string', int: 'integer', float: 'number', bool: 'boolean', list: 'array', dict: 'object'}
+
+# Strings are matched whole (an unterminated one runs to the end of the buffer) so the
+# scanner only ever stops on structural characters
+TOKEN = re.compile(r'"(?:[^"\\]|\\.)*("|\\?\Z)|[{}\[\],]', re.DOTALL)
+
+CLOSERS = {'{': '}', '[': ']'}
+
+# How many recent cut points the scanner keeps for salvaging truncated output
+SALVAGE_CANDIDATES = 16
+
+_decoder = json.JSONDecoder()
+
+
+class JSONExtractionError(ValueError):
+    """No usable JSON could be recovered from an LLM response"""
+
+
+class IncrementalJSONExtractor:
+    """
+    Streaming scanner for the first JSON object (or array) in LLM output
+
+    Feed chunks as they arrive; `complete` turns True as soon as the root value closes.
+    If the stream ends early, `result()` returns the longest valid prefix with its open
+    containers closed.
+    """
+
+    def __init__(self, opener='{'):
+        """
+        Args:
+            opener (str): '{' to extract an object, '[' for an array
+        """
+        self.opener = opener
+        self.buffer = ''
+        self.start = -1
+        self.end = -1
+        self._pos = 0
+        self._stack = []
+        self._cuts = deque(maxlen=SALVAGE_CANDIDATES)
+
+    @property
+    def complete(self):
+        """True once the root value has been closed"""
+        return self.end >= 0
+
+    def feed(self, chunk):
+        """
+        Add text and advance the scan
+
+        Args:
+            chunk (str): Next piece of model output
+
+        Returns:
+            bool: True if the root value is complete
+        """
+        self.buffer += chunk
+        if self.complete:
+            return True
+        if self.start < 0:
+            self.start = self.buffer.find(self.opener, self._pos)
+            if self.start < 0:
+                self._pos = len(self.buffer)
+                return False
+            self._pos = self.start
+
+        buffer = self.buffer
+        stack = self._stack
+        cuts = self._cuts
+        for match in TOKEN.finditer(buffer, self._pos):
+            token = match.group()
+            char = token[0]
+            if char == '"':
+                if match.group(1) != '"':
+                    # String still open: rescan it when more text arrives
+                    self._pos = match.start()
+                    return False
+                continue
+            index = match.start()
+            if char in CLOSERS:
+                # An empty container is a useful salvage as an object value ("skills": [])
+                # but not as an array element, where the preceding comma cut is better
+                in_array = bool(stack) and stack[-1] == '['
+                stack.append(char)
+                if not in_array:
+                    cuts.append((index + 1, ''.join(stack)))
+            elif char == ',':
+                if stack:
+                    cuts.append((index, ''.join(stack)))
+            else:
+                if not stack or CLOSERS[stack[-1]] != char:
+                    # Mismatched bracket: stop scanning and salvage what came before
+                    self._pos = len(buffer)
+                    self._stack = []
+                    return False
+                stack.pop()
+                if not stack:
+                    self.end = index + 1
+                    return True
+                cuts.append((index + 1, ''.join(stack)))
+        self._pos = len(buffer)
+        return False
+
+    def result(self):
+        """
+        Parse the extracted value
+
+        Returns:
+            tuple: (value, salvaged) - salvaged is True when the output was cut short
+
+        Raises:
+            JSONExtractionError: If nothing parseable was found
+        """
+        if self.start < 0:
+            raise JSONExtractionError("No JSON found in response")
+        if self.complete:
+            try:
+                return json.loads(self.buffer[self.start:self.end]), False
+            except ValueError:
+                pass
+
+        # Most recent cut point first: the longest prefix that still parses wins
+        for cut, open_containers in reversed(self._cuts):
+            closing = ''.join(CLOSERS[char] for char in reversed(open_containers))
+            try:
+                return json.loads(self.buffer[self.start:cut] + closing), True
+            except ValueError:
+                continue
+        raise JSONExtractionError("Could not parse JSON from response")
+
+
+def extract_json(text, schema=None, name='default', transform=None):
+    """
+    Extract, repair and validate the JSON object in an LLM response
+
+    Args:
+        text (str): Raw model output (may include ```json fences or trailing prose)
+        schema (dict): Optional {'required': {key: types}, 'defaults': {key: value}}
+        name (str): Calling feature, used for metrics
+        transform (callable): Optional step between parsing and validation (e.g. WireSchema.expand)
+
+    Returns:
+        dict: Parsed (and validated) object
+
+    Raises:
+        JSONExtractionError: If no usable JSON is found or validation fails
+    """
+    with span('json_extract'):
+        try:
+            value, salvaged = _extract(text or '')
+            if transform:
+                value = transform(value)
+            if schema:
+                value = validate(value, schema)
+        except JSONExtractionError:
+            record_extraction(name, 'failed')
+            raise
+        except Exception as e:
+            # A transform or validator tripping over the shape of the reply is a malformed reply too
+            record_extraction(name, 'failed')
+            raise JSONExtractionError(f"Unusable JSON in response: {e}") from e
+    record_extraction(name, 'salvaged' if salvaged else 'complete')
+    return value
+
+
+def _extract(text):
+    """Fast path with the C decoder; the incremental scanner only runs on broken output"""
+    start = text.find('{')
+    if start < 0:
+        raise JSONExtractionError("No JSON found in response")
+    try:
+        value, _ = _decoder.raw_decode(text, start)
+        if isinstance(value, dict):
+            return value, False
+    except ValueError:
+        pass
+
+    extractor = IncrementalJSONExtractor('{')
+    extractor.feed(text)
+    return extractor.result()
+
+
+def validate(value, schema):
+    """
+    Check an extracted object against a schema and fill in optional fields
+
+    Args:
+        value (dict): Parsed JSON
+        schema (dict): 'required' maps keys to accepted types; 'defaults' maps optional
+            keys to the value used when they are missing or of the wrong type
+
+    Returns:
+        dict: The same object with defaults applied
+
+    Raises:
+        JSONExtractionError: If a required key is missing or has the wrong type
+    """
+    if not isinstance(value, dict):
+        raise JSONExtractionError("Expected a JSON object")
+    for key, types in schema.get('required', {}).items():
+        if key not in value:
+            raise JSONExtractionError(f"Missing required field: {key}")
+        if not isinstance(value[key], types):
+            raise JSONExtractionError(f"Field {key} has type {type(value[key]).__name__}")
+    for key, default in schema.get('defaults', {}).items():
+        expected = NUMBER if isinstance(default, NUMBER) else type(default)
+        if not isinstance(value.get(key), expected):
+            value[key] = copy.deepcopy(default)
+    return value
+
+
+def json_schema(schema):
+    """
+    JSON Schema for the top level of an extraction schema, for structured-output requests
+
+    Args:
+        schema (dict): {'required': {key: types}, 'defaults': {key: value}}
+
+    Returns:
+        dict: Object schema with a type per key (nested values are left open)
+    """
+    def type_of(types):
+        if types == NUMBER:
+            return {'type': 'number'}
+        first = types[0] if isinstance(types, tuple) else types
+        return {'type': JSON_TYPES.get(first, 'string')}
+
+    properties = {key: type_of(types) for key, types in schema.get('required', {}).items()}
+    properties.update((key, type_of(type(default))) for key, default in schema.get('defaults', {}).items())
+    return {'type': 'object', 'properties': properties, 'required': list(schema.get('required', {}))}
+
+
+_stats_lock = threading.Lock()
+_extract_stats = {}
+
+
+def record_extraction(name, outcome):
+    """Count a parsed LLM response by feature and outcome (complete, salvaged or failed)"""
+    with _stats_lock:
+        stats = _extract_stats.setdefault(name, {'responses': 0, 'complete': 0, 'salvaged': 0, 'failed': 0})
+        stats['responses'] += 1
+        stats[outcome] += 1
+    count('app_json_extract_total', feature=name, outcome=outcome)
+
+
+def get_extract_stats():
+    """
+    Malformed-output rates for every feature that parsed LLM output in this process
+
+    Returns:
+        dict: Per feature - response count, outcome counts and the failed and salvaged percentages
+    """
+    with _stats_lock:
+        report = {}
+        for name, stats in _extract_stats.items():
+            responses = stats['responses']
+            report[name] = dict(stats,
+                                malformed_pct=round(100 * stats['failed'] / responses, 1),
+                                salvaged_pct=round(100 * stats['salvaged'] / responses, 1))
+        return report
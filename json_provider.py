@@ -0,0 +1,47 @@
+"""
+JSON Provider
+Flask JSON provider with one precompiled encoder for every response: compact, unsorted
+keys, no circular-reference bookkeeping, and analyzer results encoded straight from
+their slots
+"""
+import json
+from flask.json.provider import DefaultJSONProvider
+from analysis_results import AnalysisResult
+
+COMPACT_SEPARATORS = (',', ':')
+
+
+def _default(obj):
+    """Encode analyzer results and fall back to Flask's handling of dates, UUIDs, etc."""
+    if isinstance(obj, AnalysisResult):
+        return obj.to_json()
+    return DefaultJSONProvider.default(obj)
+
+
+# Built once: json.dumps() constructs a new encoder on every call that passes options
+_encoder = json.JSONEncoder(
+    ensure_ascii=True,
+    check_circular=False,
+    separators=COMPACT_SEPARATORS,
+    default=_default
+)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Serialize responses with the shared encoder unless a caller asks for other options"""
+
+    sort_keys = False
+    default = staticmethod(_default)
+
+    def dumps(self, obj, **kwargs):
+        """
+        Args:
+            obj: Value to serialize
+            **kwargs: json.dumps options; anything beyond compact separators takes the slow path
+
+        Returns:
+            str: JSON text
+        """
+        if not kwargs or kwargs == {'separators': COMPACT_SEPARATORS}:
+            return _encoder.encode(obj)
+        return super().dumps(obj, **kwargs)
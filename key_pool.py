@@ -0,0 +1,227 @@
+"""
+Key Pool
+Gemini API keys shared by every LLM call: a token bucket per key, rotation away from keys
+that hit their quota, and jittered backoff for retries
+
+Keys come from GEMINI_API_KEYS (comma-separated), or GEMINI_API_KEY when that is unset.
+Each key may send GEMINI_KEY_RPM requests per minute with bursts of up to GEMINI_KEY_BURST;
+a key answered with 429 / RESOURCE_EXHAUSTED rests until its retry delay has passed.
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+from instrumentation import count
+
+# Requests per minute each key may send (0: no client-side limit, only 429 rotation),
+# and how many of them may go out back to back
+GEMINI_KEY_RPM = float(os.getenv('GEMINI_KEY_RPM', '0'))
+GEMINI_KEY_BURST = int(os.getenv('GEMINI_KEY_BURST', '10'))
+# Longest a call waits for any key to have capacity before giving up
+GEMINI_KEY_WAIT = float(os.getenv('GEMINI_KEY_WAIT', '30'))
+
+# Retries after a 429 or 5xx reply; waits are drawn uniformly from 0 up to
+# LLM_BACKOFF_BASE * 2^attempt seconds, capped at LLM_BACKOFF_MAX ("full jitter")
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', '3'))
+LLM_BACKOFF_BASE = float(os.getenv('LLM_BACKOFF_BASE', '0.5'))
+LLM_BACKOFF_MAX = float(os.getenv('LLM_BACKOFF_MAX', '8'))
+
+# Seconds a rate-limited key rests when the reply carries no retry delay
+DEFAULT_COOLDOWN = 30.0
+
+
+class KeyPoolExhausted(RuntimeError):
+    """No key had capacity within GEMINI_KEY_WAIT, or every key is resting after a 429"""
+
+
+def backoff_delay(attempt, base=LLM_BACKOFF_BASE, cap=LLM_BACKOFF_MAX):
+    """Full-jitter backoff: a uniform draw from 0 to min(cap, base * 2^attempt) seconds"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class ApiKey:
+    """One key, its token bucket and its usage counters (guarded by the pool's lock)"""
+
+    __slots__ = ('label', 'secret', 'rate', 'burst', 'tokens', 'updated', 'cooldown_until', 'cooldown_guessed',
+                 'sent', 'rate_limited', 'errors', 'recent')
+
+    def __init__(self, label, secret, rpm, burst):
+        self.label = label
+        self.secret = secret
+        self.rate = rpm / 60
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.cooldown_until = 0.0
+        # True when the last 429 gave no retry delay and DEFAULT_COOLDOWN stands in for it
+        self.cooldown_guessed = False
+        self.sent = 0
+        self.rate_limited = 0
+        self.errors = 0
+        # Send times within the last minute, for utilization
+        self.recent = deque()
+
+    def prune(self, now):
+        """Forget send times older than a minute"""
+        while self.recent and now - self.recent[0] >= 60:
+            self.recent.popleft()
+
+    def refill(self, now):
+        """Add the tokens earned since the last update"""
+        if not self.rate:
+            self.tokens = float(self.burst)
+        else:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def ready_in(self, now):
+        """Seconds until this key can send (0 if it can send now)"""
+        wait = max(0.0, self.cooldown_until - now)
+        if self.rate and self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return wait
+
+    def to_json(self, now):
+        """Usage snapshot by label; no part of the key itself is reported"""
+        self.prune(now)
+        rpm = self.rate * 60
+        return {
+            'key': self.label,
+            'tokens': round(self.tokens, 2),
+            'requests_last_minute': len(self.recent),
+            'utilization': round(len(self.recent) / rpm, 3) if rpm else None,
+            'cooling_down_for': round(max(0.0, self.cooldown_until - now), 1),
+            'sent': self.sent,
+            'rate_limited': self.rate_limited,
+            'errors': self.errors
+        }
+
+
+class KeyPool:
+    """Thread-safe set of API keys handed out by available capacity"""
+
+    def __init__(self, keys=None, rpm=GEMINI_KEY_RPM, burst=GEMINI_KEY_BURST, max_wait=GEMINI_KEY_WAIT):
+        """
+        Args:
+            keys (list): API keys (defaults to GEMINI_API_KEYS / GEMINI_API_KEY)
+            rpm (float): Requests per minute allowed per key (0 for no limit)
+            burst (int): Requests a fresh key may send back to back
+            max_wait (float): Seconds acquire() waits for capacity before raising KeyPoolExhausted
+        """
+        if keys is None:
+            keys = (os.getenv('GEMINI_API_KEYS') or os.getenv('GEMINI_API_KEY') or '').split(',')
+        # Duplicates would share one quota while being budgeted as two
+        secrets = list(dict.fromkeys(key.strip() for key in keys if key and key.strip()))
+        self.keys = [ApiKey(f"key{index}", secret, rpm, max(1, burst)) for index, secret in enumerate(secrets)]
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def acquire(self, exclude=()):
+        """
+        Take one request's worth of capacity from the key with the most to spare
+
+        Blocks until a key has capacity, up to max_wait seconds. When every candidate key is
+        resting after a 429 that gave no retry delay, raises at once instead: the rest is a
+        guess, and the caller's local fallback is better than a long wait.
+
+        Args:
+            exclude (tuple): Keys to skip if any other key is usable (ones that just failed)
+
+        Returns:
+            ApiKey: The key to send with
+        """
+        if not self.keys:
+            raise RuntimeError("GEMINI_API_KEY not configured")
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                candidates = [key for key in self.keys if key not in exclude] or self.keys
+                for key in candidates:
+                    key.refill(now)
+                    key.prune(now)
+                ready = [key for key in candidates if key.ready_in(now) == 0]
+                if ready:
+                    # Most tokens left; among equals (or with no limit), the least used this minute
+                    key = max(ready, key=lambda k: (k.tokens, -len(k.recent)))
+                    key.tokens -= 1
+                    key.sent += 1
+                    key.recent.append(now)
+                    return key
+                wait = min(key.ready_in(now) for key in candidates)
+                guessed = all(key.cooldown_guessed and key.cooldown_until > now for key in candidates)
+            if guessed or now + wait > deadline:
+                count('app_llm_key_waits_total', outcome='exhausted')
+                if guessed:
+                    raise KeyPoolExhausted("Every Gemini API key is rate limited (no retry delay given)")
+                raise KeyPoolExhausted(f"No Gemini API key has capacity within {self.max_wait:g}s")
+            count('app_llm_key_waits_total', outcome='waited')
+            time.sleep(wait)
+
+    def release(self, key, outcome, retry_after=None):
+        """
+        Record how a request sent with a key ended
+
+        Args:
+            key (ApiKey): Key returned by acquire()
+            outcome (str): ok, rate_limited or error
+            retry_after (float): Seconds the server asked the key to rest (rate_limited only)
+        """
+        with self._lock:
+            if outcome == 'rate_limited':
+                key.rate_limited += 1
+                key.tokens = 0.0
+                cooldown = retry_after if retry_after is not None else DEFAULT_COOLDOWN
+                key.cooldown_until = time.monotonic() + cooldown
+                key.cooldown_guessed = retry_after is None
+            elif outcome == 'error':
+                key.errors += 1
+        count('app_llm_key_requests_total', key=key.label, outcome=outcome)
+
+    def has_free_key(self, exclude=()):
+        """True if a key outside exclude is not resting after a 429 (it may still be rate-paced)"""
+        with self._lock:
+            now = time.monotonic()
+            return any(key.cooldown_until <= now for key in self.keys if key not in exclude)
+
+    def stats(self):
+        """
+        Returns:
+            list: Per-key usage snapshot (see ApiKey.to_json)
+        """
+        with self._lock:
+            now = time.monotonic()
+            for key in self.keys:
+                key.refill(now)
+            return [key.to_json(now) for key in self.keys]
+
+
+_pool_lock = threading.Lock()
+_default_pool = None
+
+
+def get_key_pool():
+    """Return the process-wide KeyPool"""
+    global _default_pool
+    if _default_pool is None:
+        with _pool_lock:
+            if _default_pool is None:
+                _default_pool = KeyPool()
+    return _default_pool
+
+
+# Test
+if __name__ == "__main__":
+    pool = KeyPool(['key-aaaa1111', 'key-bbbb2222'], rpm=120, burst=2, max_wait=5)
+    start = time.monotonic()
+    used = [pool.acquire().label for _ in range(6)]
+    print(f"6 requests on 2 keys (burst 2, 2/s each) in {time.monotonic() - start:.2f}s: {used}")
+    limited = pool.acquire()
+    pool.release(limited, 'rate_limited', retry_after=1)
+    print(f"After a 429 on {limited.label}: next key is {pool.acquire(exclude=(limited,)).label}")
+    for key in pool.stats():
+        print(key)
@@ -0,0 +1,232 @@
+"""
+LinkedIn Text Cleaner
+Removes navigation chrome, endorsement noise, duplicated lines and sidebar blocks
+from Ctrl+A LinkedIn pastes before they are parsed
+"""
+import re
+
+# Whole lines that are LinkedIn UI and never profile content (compared lowercased)
+BOILERPLATE_EXACT = frozenset([
+    # Global navigation bar
+    'skip to main content', 'skip to search', 'close jump menu', 'keyboard shortcuts',
+    # Profile header buttons
+    'add profile section', 'enhance profile', 'contact info', '· 1st', '· 2nd', '· 3rd',
+    # Section controls
+    'show all', 'show all →', 'show more', 'show less', 'see more', 'see less', '…see more',
+    '… see more', '…more', 'show credential', 'show project', 'show publication', 'see translation',
+    # Activity feed controls
+    'like', 'comment', 'repost', 'send', 'share', 'save', 'posts', 'comments', 'videos', 'images',
+    'documents', 'newsletters', 'report this profile', 'promoted', 'ad options',
+    # Job board chrome (job descriptions go through the same stripping)
+    'easy apply', 'report this job',
+])
+
+# Navigation bar and header button labels that are also ordinary words ("Search" or
+# "Messaging" can be a skill); they are only dropped above the first heading
+NAVIGATION_EXACT = frozenset([
+    'search', 'home', 'my network', 'jobs', 'messaging', 'notifications', 'me', 'for business',
+    'follow', 'following', 'message', 'connect', 'more', 'open to', 'resources', '1st', '2nd', '3rd',
+    'apply',
+])
+
+# Patterned boilerplate: counters, endorsements, premium upsells
+BOILERPLATE_PATTERN = re.compile(
+    r"^(?:"
+    r"try premium.*|reactivate premium.*|\d+ (?:new )?notifications?|"
+    r"\d+(?:,\d+)*\+? (?:followers|connections)|\d(?:st|nd|rd|th) degree connection|"
+    r"status is (?:online|reachable|offline)|view .*['’]s? (?:full )?profile|"
+    r"show all .*|\d+ endorsements?|endorsed by .*|"
+    r"\d+ (?:experiences?|educations?) (?:across|at|with) .*|"
+    r"\d+ (?:comments?|reposts?|reactions?)|.* (?:reposted|commented on|liked) (?:this|a post)"
+    r")$",
+    re.IGNORECASE
+)
+
+# "About" is both a profile section heading and the first footer link; the
+# first occurrence is kept and a repeated one starts the footer block
+KEEP_FIRST_ONLY = frozenset(['about'])
+
+INLINE_ARTIFACTS = re.compile(r"…\s*see more|…\s*more|\bsee less\b", re.IGNORECASE)
+
+# Right-rail blocks that list other people's profiles; everything up to the
+# next profile section heading is dropped
+SIDEBAR_HEADERS = frozenset([
+    'people also viewed', 'people you may know', 'you might like', 'more profiles for you',
+    'explore premium profiles', 'people also follow', 'who your viewers also viewed',
+    'explore collaborative articles', 'add new skills with these courses', 'pages people also viewed'
+])
+SIDEBAR_PREFIXES = ('others named ',)
+
+# Profile sections whose content is feed or follow lists, not resume material;
+# the heading is kept (other extractors use it as a boundary) but its body is dropped
+SKIPPED_SECTIONS = frozenset(['activity', 'interests'])
+
+SECTION_HEADINGS = frozenset([
+    'about', 'experience', 'education', 'skills', 'licenses & certifications', 'certifications',
+    'projects', 'volunteering', 'volunteer experience', 'honors & awards', 'languages',
+    'recommendations', 'courses', 'publications', 'organizations', 'interests', 'featured',
+    'activity', 'summary'
+])
+
+# The navigation and header block ends at the first profile section or job posting heading
+HEADER_END_HEADINGS = SECTION_HEADINGS | frozenset(['about the job'])
+
+# Headings that are another name for a section
+SECTION_ALIASES = {'summary': 'about', 'licenses & certifications': 'certifications',
+                   'volunteer experience': 'volunteering'}
+
+# Duplicates this many lines apart are treated as LinkedIn's visually-hidden
+# copies ("Software Engineer\nSoftware Engineer"); farther repeats are real content
+DUPLICATE_WINDOW = 3
+
+
+class CleanedText:
+    """Result of a cleaning pass: the text plus what was removed"""
+
+    __slots__ = ('text', 'repeats', 'stats')
+
+    def __init__(self, text, repeats, stats):
+        self.text = text
+        self.repeats = repeats
+        self.stats = stats
+
+
+class LinkedInTextCleaner:
+    """Single-pass cleaner for pasted LinkedIn profile text"""
+
+    def clean(self, text):
+        """
+        Clean a LinkedIn paste
+
+        Args:
+            text (str): Raw text copied from a LinkedIn profile page
+
+        Returns:
+            CleanedText: Cleaned text, counts of removed duplicate lines and removal stats
+        """
+        text = text or ''
+        stats = {'boilerplate_lines': 0, 'duplicate_lines': 0, 'block_lines': 0}
+        repeats = {}
+        kept = []
+        recent = []
+        seen_once = set()
+        in_block = False
+        lines = text.splitlines()
+        header_end = _header_end(lines)
+
+        for index, raw_line in enumerate(lines):
+            if '…' in raw_line or 'ee less' in raw_line:
+                raw_line = INLINE_ARTIFACTS.sub('', raw_line)
+            line = ' '.join(raw_line.split())
+            if not line:
+                if kept and kept[-1]:
+                    kept.append('')
+                continue
+            lowered = line.lower()
+
+            # Sidebar, footer and feed blocks run until the next section heading
+            if in_block:
+                if lowered in SECTION_HEADINGS and lowered not in seen_once:
+                    in_block = False
+                else:
+                    stats['block_lines'] += 1
+                    continue
+            if lowered in SIDEBAR_HEADERS or lowered.startswith(SIDEBAR_PREFIXES):
+                in_block = True
+                stats['block_lines'] += 1
+                continue
+
+            if (lowered in BOILERPLATE_EXACT or (index < header_end and lowered in NAVIGATION_EXACT)
+                    or BOILERPLATE_PATTERN.match(line)):
+                stats['boilerplate_lines'] += 1
+                continue
+
+            if lowered in recent:
+                repeats[line] = repeats.get(line, 0) + 1
+                stats['duplicate_lines'] += 1
+                continue
+            recent.append(lowered)
+            if len(recent) > DUPLICATE_WINDOW:
+                recent.pop(0)
+
+            if lowered in KEEP_FIRST_ONLY:
+                if lowered in seen_once:
+                    in_block = True
+                    stats['block_lines'] += 1
+                    continue
+                seen_once.add(lowered)
+
+            kept.append(line)
+            if lowered in SKIPPED_SECTIONS:
+                in_block = True
+
+        cleaned = '\n'.join(kept).strip()
+        stats['chars_in'] = len(text)
+        stats['chars_out'] = len(cleaned)
+        stats['removed_pct'] = round(100 * (1 - len(cleaned) / len(text)), 1) if text else 0.0
+        return CleanedText(cleaned, repeats, stats)
+
+
+def _header_end(lines):
+    """Index of the first heading line (the end of the navigation and header block), or 0 without one"""
+    for index, line in enumerate(lines):
+        if ' '.join(line.split()).lower() in HEADER_END_HEADINGS:
+            return index
+    return 0
+
+
+_default_cleaner = LinkedInTextCleaner()
+
+
+def clean_linkedin_text(text):
+    """Clean a LinkedIn paste with the shared cleaner (see LinkedInTextCleaner.clean)"""
+    return _default_cleaner.clean(text)
+
+
+def split_sections(text):
+    """
+    Split cleaned profile text at its section headings
+
+    Args:
+        text (str): Output of clean_linkedin_text
+
+    Returns:
+        dict: Section name ('header' for the lines before the first heading) -> section text
+    """
+    sections = {}
+    name, lines = 'header', []
+
+    def close():
+        body = '\n'.join(lines).strip()
+        # A heading seen twice (e.g. a second Experience block) continues its section
+        sections[name] = f"{sections[name]}\n\n{body}".strip() if name in sections else body
+
+    for line in text.split('\n'):
+        lowered = line.strip().lower()
+        if lowered in SECTION_HEADINGS:
+            close()
+            name, lines = SECTION_ALIASES.get(lowered, lowered), []
+        else:
+            lines.append(line)
+    close()
+    return sections
+
+
+def strip_ui_lines(text):
+    """
+    Remove boilerplate lines and inline artifacts only (no dedupe or sidebar detection)
+
+    Navigation words are only removed above the first heading; text without one (most
+    job descriptions and About sections) keeps them.
+    """
+    kept = []
+    lines = (text or '').splitlines()
+    header_end = _header_end(lines)
+    for index, line in enumerate(lines):
+        stripped = line.strip()
+        lowered = stripped.lower()
+        if stripped and (lowered in BOILERPLATE_EXACT or (index < header_end and lowered in NAVIGATION_EXACT)
+                         or BOILERPLATE_PATTERN.match(stripped)):
+            continue
+        kept.append(INLINE_ARTIFACTS.sub('', line) if '…' in line or 'ee less' in line else line)
+    return '\n'.join(kept)
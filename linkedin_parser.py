@@ -1,101 +1,275 @@
 import re
 import os
-import json
-from dotenv import load_dotenv
+from llm_client import get_llm_client
+from prompt_builder import PromptBuilder, MEDIUM
+from linkedin_cleaner import clean_linkedin_text, split_sections
+from instrumentation import timed, count
+from json_extract import extract_json, json_schema, JSONExtractionError
 
-load_dotenv()
+# Token allowance for the Gemini parsing prompt (the old hard cap was 8000 raw characters)
+PARSE_TOKEN_BUDGET = int(os.getenv('PARSE_TOKEN_BUDGET', '2500'))
 
-# Try to import Gemini, fallback to manual parsing if not available
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-    
-    # Configure Gemini
-    api_key = os.getenv('GEMINI_API_KEY')
-    if api_key:
-        genai.configure(api_key=api_key)
-    else:
-        GEMINI_AVAILABLE = False
-except ImportError:
-    GEMINI_AVAILABLE = False
+# hybrid: local extraction first, Gemini only for fields scored below PARSE_CONFIDENCE_THRESHOLD
+# (sent just those fields' sections); llm: Gemini on the whole paste, local extraction if it fails
+PARSE_STRATEGY = os.getenv('PARSE_STRATEGY', 'hybrid')
+PARSE_CONFIDENCE_THRESHOLD = float(os.getenv('PARSE_CONFIDENCE_THRESHOLD', '0.7'))
+
+# The profile shape every downstream generator expects
+PROFILE_SCHEMA = {
+    'required': {'name': str},
+    'defaults': {
+        'headline': '',
+        'about': '',
+        'experience': [],
+        'education': [],
+        'skills': [],
+        'contact': {}
+    }
+}
+# Structured-output schema for the parse call (top-level keys and types)
+PROFILE_RESPONSE_SCHEMA = json_schema(PROFILE_SCHEMA)
+
+# Paste section each field is read from ('header' is the text above the first section heading)
+FIELD_SECTIONS = {
+    'name': 'header',
+    'headline': 'header',
+    'about': 'about',
+    'experience': 'experience',
+    'education': 'education',
+    'skills': 'skills',
+    'contact': 'header'
+}
+
+# JSON example per field in the parse prompts
+FIELD_EXAMPLES = {
+    'name': '"Full Name"',
+    'headline': '"Professional headline or job title"',
+    'about': '"About/summary section (if available)"',
+    'experience': '''[
+        {
+            "title": "Job Title",
+            "company": "Company Name",
+            "duration": "Start Date - End Date",
+            "description": "Job description or achievements"
+        }
+    ]''',
+    'education': '''[
+        {
+            "school": "School/University Name",
+            "degree": "Degree Name",
+            "field": "Field of Study",
+            "dates": "Start Year - End Year"
+        }
+    ]''',
+    'skills': '["Skill 1", "Skill 2", "Skill 3"]',
+    'contact': '''{
+        "email": "email@example.com",
+        "phone": "phone number",
+        "location": "City, Country"
+    }'''
+}
+
+MONTH = r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)'
+# Position dates, e.g. "Jul 2014 - Present" or "2014 - 2021"
+DATE_RANGE = re.compile(rf'({MONTH}\s+\d{{4}}|\d{{4}})\s*[-–]\s*(Present|{MONTH}\s+\d{{4}}|\d{{4}})', re.IGNORECASE)
+# Study dates, e.g. "2009 - 2011"
+YEAR_RANGE = re.compile(r'(\d{4})\s*[-–]\s*(\d{4})')
+# Total time at a company above grouped positions, e.g. "Full-time · 3 yrs 2 mos"
+TENURE = re.compile(r'\b\d+\s+(?:yrs?|mos?)\b')
+# "Austin, Texas, United States" or "Greater Seattle Area"
+LOCATION_LINE = re.compile(r"^(?:[A-Z][\w.' -]*(?:, [A-Z][\w.' -]*){1,3}|[A-Z][\w.' -]* Area)$")
+EMAIL = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+# Workplace line under a position, e.g. "Remote" or "London · Hybrid"
+WORKPLACE = re.compile(r'\b(?:Remote|On-site|Hybrid)$')
 
 
 class LinkedInParser:
     """Parse LinkedIn profile data from copy-pasted text"""
     
+    @timed('parse')
     def parse_linkedin_text(self, text):
         """
         Parse LinkedIn profile text and extract structured data
-        Uses Gemini AI if available, falls back to regex parsing
+        
+        Fields are extracted locally first; Gemini only re-reads the sections whose fields
+        scored below PARSE_CONFIDENCE_THRESHOLD (PARSE_STRATEGY=llm sends it the whole paste first).
         
         Args:
             text (str): Full text copied from LinkedIn profile page
-            
+        
         Returns:
             dict: Structured profile data
         """
         if not text:
             return None
         
+        cleaned = self._clean_paste(text)
+        text = cleaned.text
+        llm = get_llm_client()
+        
+        if PARSE_STRATEGY != 'llm':
+            profile_data, fields, sections = self._parse_locally(text, cleaned.repeats)
+            result_text = None
+            if fields and llm.available:
+                try:
+                    result_text = llm.generate(self._create_fields_prompt(sections, fields), endpoint='linkedin_parse',
+                                               response_schema=json_schema(self._fields_schema(fields)))
+                except Exception as e:
+                    print(f"❌ Gemini API error: {str(e)}")
+            return self._merge_fields(profile_data, fields, result_text)
+        
         # Try Gemini AI first
-        if GEMINI_AVAILABLE and os.getenv('GEMINI_API_KEY'):
+        if llm.available:
             print("Using Gemini AI for parsing...")
-            gemini_result = self._parse_with_gemini(text)
+            gemini_result = self._parse_with_gemini(text, llm)
             if gemini_result:
                 return gemini_result
             print("Gemini parsing failed, falling back to regex...")
         
         # Fallback to manual parsing
+        return self._parse_with_regex(text, cleaned.repeats)
+    
+    @timed('parse')
+    async def parse_linkedin_text_async(self, text):
+        """Async version of parse_linkedin_text for the async/ASGI endpoints"""
+        if not text:
+            return None
+        
+        cleaned = self._clean_paste(text)
+        text = cleaned.text
+        llm = get_llm_client()
+        
+        if PARSE_STRATEGY != 'llm':
+            profile_data, fields, sections = self._parse_locally(text, cleaned.repeats)
+            result_text = None
+            if fields and llm.available:
+                try:
+                    result_text = await llm.generate_async(self._create_fields_prompt(sections, fields),
+                                                           endpoint='linkedin_parse',
+                                                           response_schema=json_schema(self._fields_schema(fields)))
+                except Exception as e:
+                    print(f"❌ Gemini API error: {str(e)}")
+            return self._merge_fields(profile_data, fields, result_text)
+        
+        if llm.available:
+            print("Using Gemini AI for parsing...")
+            try:
+                result_text = await llm.generate_async(self._create_prompt(text), endpoint='linkedin_parse',
+                                                     response_schema=PROFILE_RESPONSE_SCHEMA)
+                gemini_result = self._parse_gemini_response(result_text)
+            except Exception as e:
+                print(f"❌ Gemini API error: {str(e)}")
+                gemini_result = None
+            if gemini_result:
+                return gemini_result
+            print("Gemini parsing failed, falling back to regex...")
+        
+        return self._parse_with_regex(text, cleaned.repeats)
+    
+    @timed('clean')
+    def _clean_paste(self, text):
+        """Strip navigation, endorsements, duplicates and sidebars once for both paths"""
+        cleaned = clean_linkedin_text(text)
+        self.last_clean_stats = cleaned.stats
+        print(f"🧹 Cleaned LinkedIn paste: removed {cleaned.stats['removed_pct']}% "
+              f"({cleaned.stats['chars_in']} → {cleaned.stats['chars_out']} chars)")
+        return cleaned
+    
+    @timed('local_parse')
+    def _parse_locally(self, text, repeats=None):
+        """
+        Extract every field locally and pick the ones worth sending to Gemini
+        
+        Returns:
+            tuple: (profile data, fields below the confidence threshold whose section is
+                in the paste, sections by name)
+        """
+        sections = split_sections(text)
+        profile_data, confidence = self._extract_fields(text, sections, repeats)
+        self.last_confidence = confidence
+        fields = [field for field, score in confidence.items()
+                  if score < PARSE_CONFIDENCE_THRESHOLD and sections.get(FIELD_SECTIONS[field])]
+        for field in confidence:
+            if field not in fields:
+                count('app_profile_fields_total', field=field, source='local')
+        if fields:
+            print(f"🔍 Low-confidence fields for Gemini: {', '.join(fields)}")
+        else:
+            print("⚡ All fields parsed locally")
+        return profile_data, fields, sections
+    
+    @timed('regex_fallback')
+    def _parse_with_regex(self, text, repeats=None):
+        """Manual regex parsing of cleaned profile text"""
         print("Using manual regex parsing...")
-        profile_data = {
-            'name': self._extract_name(text),
-            'headline': self._extract_headline(text),
-            'about': self._extract_about(text),
-            'experience': self._extract_experience(text),
-            'education': self._extract_education(text),
-            'skills': self._extract_skills(text),
-            'contact': self._extract_contact(text)
-        }
+        profile_data, self.last_confidence = self._extract_fields(text, split_sections(text), repeats)
+        return profile_data
+    
+    def _extract_fields(self, text, sections, repeats=None):
+        """
+        Run every field extractor on its section
         
+        Returns:
+            tuple: (profile data, confidence 0-1 per field)
+        """
+        header = sections.get('header', '')
+        extracted = {
+            'name': self._extract_name(header or text, repeats),
+            'about': self._extract_about(sections.get('about')),
+            'experience': self._extract_experience(sections.get('experience')),
+            'education': self._extract_education(sections.get('education')),
+            'skills': self._extract_skills(sections.get('skills')),
+            'contact': self._extract_contact(text, header)
+        }
+        extracted['headline'] = self._extract_headline(header, extracted['name'][0])
+        profile_data = {field: extracted[field][0] for field in FIELD_SECTIONS}
+        confidence = {field: extracted[field][1] for field in FIELD_SECTIONS}
+        return profile_data, confidence
+    
+    def _fields_schema(self, fields):
+        """Extraction schema requiring just the given fields"""
+        return {'required': {field: str if field == 'name' else type(PROFILE_SCHEMA['defaults'][field])
+                             for field in fields},
+                'defaults': {}}
+    
+    def _merge_fields(self, profile_data, fields, result_text):
+        """Replace low-confidence fields with Gemini's values; local values stay if it fails"""
+        refined = {}
+        if result_text:
+            try:
+                refined = extract_json(result_text, self._fields_schema(fields), name='linkedin_parse')
+            except JSONExtractionError as e:
+                print(f"❌ JSON parsing error: {e}")
+        for field in fields:
+            if refined.get(field):
+                profile_data[field] = refined[field]
+                count('app_profile_fields_total', field=field, source='gemini')
+            else:
+                count('app_profile_fields_total', field=field, source='local_fallback')
         return profile_data
     
-    def _parse_with_gemini(self, text):
+    def _parse_with_gemini(self, text, llm):
         """Use Gemini AI to parse LinkedIn profile text"""
         try:
-            # Initialize Gemini model
-            model = genai.GenerativeModel('gemini-2.0-flash')
-            
-            prompt = f"""
+            result_text = llm.generate(self._create_prompt(text), endpoint='linkedin_parse',
+                                       response_schema=PROFILE_RESPONSE_SCHEMA)
+            return self._parse_gemini_response(result_text)
+        except Exception as e:
+            print(f"❌ Gemini API error: {str(e)}")
+            return None
+    
+    def _structure(self, fields):
+        """JSON example object for the given fields"""
+        return '{\n' + ',\n'.join(f'    "{field}": {FIELD_EXAMPLES[field]}' for field in fields) + '\n}'
+    
+    def _create_prompt(self, text):
+        """Build the profile extraction prompt within PARSE_TOKEN_BUDGET"""
+        builder = PromptBuilder('linkedin_parse', token_budget=PARSE_TOKEN_BUDGET)
+        builder.add(f"""
 You are a LinkedIn profile data extractor. Parse the following LinkedIn profile text and extract structured information.
 
 Return ONLY a valid JSON object (no markdown, no code blocks, no explanations) with this exact structure:
-{{
-    "name": "Full Name",
-    "headline": "Professional headline or job title",
-    "about": "About/summary section (if available)",
-    "experience": [
-        {{
-            "title": "Job Title",
-            "company": "Company Name",
-            "duration": "Start Date - End Date",
-            "description": "Job description or achievements"
-        }}
-    ],
-    "education": [
-        {{
-            "school": "School/University Name",
-            "degree": "Degree Name",
-            "field": "Field of Study",
-            "dates": "Start Year - End Year"
-        }}
-    ],
-    "skills": ["Skill 1", "Skill 2", "Skill 3"],
-    "contact": {{
-        "email": "email@example.com",
-        "phone": "phone number",
-        "location": "City, Country"
-    }}
-}}
+{self._structure(FIELD_SECTIONS)}
 
 Important instructions:
 1. Extract the PROFILE OWNER's name, not the viewer's name
@@ -110,40 +284,55 @@ Important instructions:
 10. Return ONLY the JSON object, nothing else
 
 LinkedIn Profile Text:
-{text[:8000]}
-"""
-            
-            response = model.generate_content(prompt)
-            
-            if response and response.text:
-                # Clean up the response (remove markdown code blocks if present)
-                json_text = response.text.strip()
-                
-                # Remove markdown code blocks
-                if json_text.startswith('```'):
-                    json_text = re.sub(r'^```json\s*\n', '', json_text)
-                    json_text = re.sub(r'^```\s*\n', '', json_text)
-                    json_text = re.sub(r'\n```$', '', json_text)
-                    json_text = json_text.strip()
-                
-                # Parse JSON
-                profile_data = json.loads(json_text)
-                
-                print(f"✅ Successfully parsed with Gemini: {profile_data.get('name', 'Unknown')}")
-                return profile_data
-                
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON parsing error: {e}")
-            print(f"Response text: {response.text[:500] if response and response.text else 'No response'}")
+""")
+        builder.add(text, priority=MEDIUM)
+        return builder.build()
+    
+    def _create_fields_prompt(self, sections, fields):
+        """Prompt for just the low-confidence fields, carrying only their sections of the paste"""
+        builder = PromptBuilder('linkedin_parse', token_budget=PARSE_TOKEN_BUDGET)
+        builder.add(f"""
+You are a LinkedIn profile data extractor. The text below is part of a LinkedIn profile; extract only the fields listed.
+
+Return ONLY a valid JSON object (no markdown, no code blocks, no explanations) with this exact structure:
+{self._structure(fields)}
+
+Important instructions:
+1. Extract the PROFILE OWNER's details, not the viewer's
+2. Include up to 5 most recent positions, 3 institutions and 10 skills
+3. If a field is not available, use empty string "" or empty array []
+4. Keep "about" and each experience "description" SHORT - around 250 characters
+5. Return ONLY the JSON object, nothing else
+
+LinkedIn Profile Text:
+""")
+        for section in dict.fromkeys(FIELD_SECTIONS[field] for field in fields):
+            heading = '' if section == 'header' else f"\n{section.title()}\n"
+            builder.add(heading + sections[section], priority=MEDIUM)
+        return builder.build()
+    
+    def _parse_gemini_response(self, result_text):
+        """Turn the Gemini reply into profile data (None if it is not valid JSON)"""
+        if not result_text:
             return None
-        except Exception as e:
-            print(f"❌ Gemini API error: {str(e)}")
+        
+        try:
+            profile_data = extract_json(result_text, PROFILE_SCHEMA, name='linkedin_parse')
+        except JSONExtractionError as e:
+            print(f"❌ JSON parsing error: {e}")
+            print(f"Response text: {result_text[:500]}")
             return None
         
-        return None
+        print(f"✅ Successfully parsed with Gemini: {profile_data.get('name', 'Unknown')}")
+        return profile_data
     
-    def _extract_name(self, text):
-        """Extract name from the text"""
+    def _extract_name(self, text, repeats=None):
+        """
+        Extract name from the header text (repeats: duplicate-line counts removed by the cleaner)
+        
+        Returns:
+            tuple: (name, confidence)
+        """
         # The profile owner's name usually appears after certain keywords
         # and before "Follow" or "Message" buttons
         
@@ -153,7 +342,7 @@ LinkedIn Profile Text:
         # and is followed by headline/job title
         name_candidates = {}
         
-        skip_keywords = ['notifications', 'skip to', 'search', 'home', 'network', 'jobs', 
+        skip_keywords = ['notifications', 'skip to', 'search', 'home', 'network', 'jobs',
                         'messaging', 'for business', 'learning', 'more', 'follow', 'message',
                         'degree connection', 'contact info', 'connections', 'vedansh dhawan',
                         'me', 'my network', 'keyboard shortcuts', 'close jump menu']
@@ -170,6 +359,10 @@ LinkedIn Profile Text:
             if any(keyword in line.lower() for keyword in skip_keywords):
                 continue
             
+            # Locations ("Austin, Texas") and dates repeat as often as the name does
+            if ',' in line or any(char.isdigit() for char in line):
+                continue
+            
             # Check if it looks like a name (2-4 words, proper case)
             words = line.split()
             if 2 <= len(words) <= 4:
@@ -177,188 +370,229 @@ LinkedIn Profile Text:
                 if all(word[0].isupper() for word in words if word and word[0].isalpha()):
                     # Avoid common UI text
                     if line not in ['Show More', 'See More', 'View Profile', 'Contact Info']:
-                        # Count how many times this name appears
+                        # Count how many times this name appears (including cleaned-out copies)
+                        if line not in name_candidates and repeats:
+                            name_candidates[line] = repeats.get(line, 0)
                         name_candidates[line] = name_candidates.get(line, 0) + 1
         
         # The actual profile name typically appears 2-4 times near the top
         # Return the name that appears most frequently (but not too many times)
         if name_candidates:
             # Filter out names that appear too many times (likely UI elements)
-            valid_names = {name: count for name, count in name_candidates.items() 
+            valid_names = {name: count for name, count in name_candidates.items()
                           if 2 <= count <= 8}
             
             if valid_names:
                 # Return the most frequent name
-                return max(valid_names, key=valid_names.get)
+                return max(valid_names, key=valid_names.get), 0.9
             elif name_candidates:
                 # If no name appears 2+ times, take the first valid one
-                return list(name_candidates.keys())[0]
+                name = list(name_candidates.keys())[0]
+                return name, 0.75 if lines[0].strip() == name else 0.5
         
-        return "Name Not Found"
+        return "Name Not Found", 0.0
     
-    def _extract_headline(self, text):
-        """Extract headline/title"""
+    def _extract_headline(self, text, name=None):
+        """
+        Extract headline/title from the header text
+        
+        Returns:
+            tuple: (headline, confidence)
+        """
         # Headline usually comes after the name
         # Look for common patterns like "CEO at", "Engineer at", etc.
-        lines = text.split('\n')
+        lines = [line.strip() for line in text.split('\n') if line.strip() and line.strip() != name]
         
-        for i, line in enumerate(lines):
-            line = line.strip()
-            # Look for job title patterns
-            if any(word in line for word in [' at ', ' @ ', '|', 'CEO', 'CTO', 'Founder', 
-                                             'Engineer', 'Developer', 'Manager', 'Director']):
-                if len(line) > 10 and len(line) < 200:
-                    return line
+        for line in lines:
+            if len(line) > 10 and len(line) < 200:
+                if any(word in line for word in [' at ', ' @ ', '|']):
+                    return line, 0.9
+                # Look for job title patterns
+                if any(word in line for word in ['CEO', 'CTO', 'Founder', 'Engineer', 'Developer', 'Manager', 'Director']):
+                    return line, 0.8
+        
+        # Otherwise the first line under the name that is not the location
+        for line in lines:
+            if len(line) > 3 and not LOCATION_LINE.match(line):
+                return line, 0.6
         
-        return ""
+        return "", 0.5
     
     def _extract_about(self, text):
-        """Extract about/summary section"""
-        # Look for text after "About" section
-        about_match = re.search(r'(?:About|ABOUT|Summary)\s*\n(.*?)(?:Experience|EXPERIENCE|Education)', 
-                               text, re.DOTALL | re.IGNORECASE)
-        
-        if about_match:
-            about_text = about_match.group(1).strip()
-            # Clean up common artifacts
-            about_text = re.sub(r'…see more|…more|see less', '', about_text)
-            if len(about_text) > 20:
-                return about_text[:500]  # Limit length
-        
-        return ""
+        """
+        Extract about/summary section
+        
+        Returns:
+            tuple: (about text, confidence)
+        """
+        if not text:
+            return "", 1.0
+        
+        # Clean up common artifacts
+        about_text = re.sub(r'…see more|…more|see less', '', text).strip()
+        if len(about_text) > 20:
+            return about_text[:500], 0.95  # Limit length
+        
+        return "", 0.3
     
     def _extract_experience(self, text):
-        """Extract work experience"""
-        experiences = []
-        
-        # Find the Experience section
-        exp_match = re.search(r'(?:Experience|EXPERIENCE)(.*?)(?:Education|EDUCATION|Skills|$)', 
-                             text, re.DOTALL | re.IGNORECASE)
+        """
+        Extract work experience from the Experience section
         
-        if not exp_match:
-            return experiences
+        A position starts at each line that opens with a date range: title and company are the
+        lines above it (or, in older pastes, below it), then come the location and description.
+        Cleaned Ctrl+A pastes have no blank lines between positions, so blocks are not relied on.
         
-        exp_text = exp_match.group(1)
+        Returns:
+            tuple: (positions, confidence)
+        """
+        experiences = []
         
-        # Split by common separators
-        # Look for job titles followed by company names and dates
-        lines = exp_text.split('\n')
+        if not text:
+            return experiences, 1.0
         
-        current_exp = {}
-        for i, line in enumerate(lines):
-            line = line.strip()
+        # A date range inside a description may be a position the split missed
+        ambiguous = False
+        for block in text.split('\n\n'):
+            lines = [line.strip() for line in block.split('\n') if len(line.strip()) >= 3]
+            dated = [i for i, line in enumerate(lines) if DATE_RANGE.match(line)]
             
-            if not line or len(line) < 3:
+            if not dated:
+                # A description paragraph that continues the previous position
+                if experiences and lines and len(experiences[-1]['description']) < 300:
+                    experiences[-1]['description'] = ' '.join([experiences[-1]['description']] + lines).strip()
+                ambiguous = ambiguous or any(DATE_RANGE.search(line) for line in lines)
                 continue
             
-            # Look for date patterns (e.g., "Jul 2014 - Present", "2014 - 2021")
-            date_pattern = r'((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{4}|[\d]{4})\s*[-–]\s*(Present|(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{4}|[\d]{4})'
-            date_match = re.search(date_pattern, line, re.IGNORECASE)
+            # Header of each position: (title, company, first header line)
+            headers = []
+            group_company = ''
+            for k, d in enumerate(dated):
+                floor = dated[k - 1] + 1 if k else 0
+                if d == 0:
+                    # Older pastes: dates, then title and company
+                    headers.append((lines[1] if len(lines) > 1 else '', lines[2] if len(lines) > 2 else '', 0))
+                elif d - 3 >= floor and TENURE.search(lines[d - 2]) and not DATE_RANGE.search(lines[d - 2]):
+                    # Several positions grouped under one company: company, tenure, title, dates
+                    group_company = lines[d - 3]
+                    headers.append((lines[d - 1], group_company, d - 3))
+                elif group_company and (d - 2 < floor or len(lines[d - 2]) >= 100 or lines[d - 2].endswith('.')):
+                    # A later position of the same group: only its title is above the dates
+                    headers.append((lines[d - 1], group_company, d - 1))
+                elif d - 2 >= floor:
+                    group_company = ''
+                    headers.append((lines[d - 2], lines[d - 1], d - 2))
+                else:
+                    group_company = ''
+                    headers.append((lines[d - 1], '', d - 1))
             
-            if date_match:
-                if current_exp and current_exp.get('title'):
-                    experiences.append(current_exp)
-                current_exp = {
-                    'title': '',
-                    'company': '',
-                    'duration': date_match.group(0),
-                    'description': ''
-                }
-            elif current_exp and not current_exp.get('title') and len(line) < 100:
-                current_exp['title'] = line
-            elif current_exp and current_exp.get('title') and not current_exp.get('company') and len(line) < 100:
-                current_exp['company'] = line
-            elif current_exp and current_exp.get('company'):
-                # This might be description
-                if len(current_exp.get('description', '')) < 300:
-                    current_exp['description'] += ' ' + line
-        
-        # Add last experience
-        if current_exp and current_exp.get('title'):
-            experiences.append(current_exp)
-        
-        return experiences[:5]  # Limit to 5 most recent
+            for k, d in enumerate(dated):
+                title, company, _ = headers[k]
+                if d == 0:
+                    rest = lines[3:dated[k + 1] if k + 1 < len(dated) else len(lines)]
+                else:
+                    rest = lines[d + 1:headers[k + 1][2] if k + 1 < len(dated) else len(lines)]
+                
+                # Drop the location or workplace line under the dates
+                if rest and (LOCATION_LINE.match(rest[0]) or WORKPLACE.search(rest[0])):
+                    rest = rest[1:]
+                ambiguous = ambiguous or any(DATE_RANGE.search(line) for line in rest)
+                
+                experiences.append({
+                    'title': title if len(title) < 100 else '',
+                    'company': company.split(' · ')[0] if len(company) < 100 else '',
+                    'duration': DATE_RANGE.match(lines[d]).group(0),
+                    'description': ' '.join(rest)[:300]
+                })
+        
+        experiences = experiences[:5]  # Limit to 5 most recent
+        if not experiences:
+            return experiences, 0.1
+        complete = sum(1 for exp in experiences if exp['title'] and exp['company'])
+        confidence = 0.95 * complete / len(experiences)
+        if ambiguous:
+            # Let Gemini sort out where the positions start
+            confidence = min(confidence, PARSE_CONFIDENCE_THRESHOLD - 0.1)
+        return experiences, confidence
     
     def _extract_education(self, text):
-        """Extract education information"""
-        education = []
-        
-        # Find the Education section
-        edu_match = re.search(r'(?:Education|EDUCATION)(.*?)(?:Skills|SKILLS|Interests|$)', 
-                             text, re.DOTALL | re.IGNORECASE)
+        """
+        Extract education from the Education section: school, then degree and field, then dates
         
-        if not edu_match:
-            return education
+        Returns:
+            tuple: (institutions, confidence)
+        """
+        education = []
         
-        edu_text = edu_match.group(1)
-        lines = edu_text.split('\n')
+        if not text:
+            return education, 1.0
         
-        current_edu = {}
-        for line in lines:
-            line = line.strip()
+        for block in text.split('\n\n'):
+            # Skip common words
+            lines = [line.strip() for line in block.split('\n')
+                     if len(line.strip()) >= 3 and not line.strip().lower().startswith(('activities', 'grade'))]
+            year_match = next((YEAR_RANGE.search(line) for line in lines if YEAR_RANGE.search(line)), None)
             
-            if not line or len(line) < 3:
+            # A lone line without dates is a note, not an institution
+            if not lines or (len(lines) < 2 and not year_match) or YEAR_RANGE.search(lines[0]):
                 continue
             
-            # Look for year patterns (e.g., "2009 - 2011")
-            year_pattern = r'(\d{4})\s*[-–]\s*(\d{4})'
-            year_match = re.search(year_pattern, line)
-            
-            if year_match:
-                if current_edu and current_edu.get('school'):
-                    education.append(current_edu)
-                current_edu = {
-                    'school': '',
-                    'degree': '',
-                    'field': '',
-                    'dates': year_match.group(0)
-                }
-            elif current_edu and not current_edu.get('school') and len(line) < 100:
-                # Skip common words
-                if not any(word in line.lower() for word in ['activities', 'show all']):
-                    current_edu['school'] = line
-            elif current_edu and current_edu.get('school') and not current_edu.get('degree'):
+            current_edu = {
+                'school': lines[0] if len(lines[0]) < 100 else '',
+                'degree': '',
+                'field': '',
+                'dates': year_match.group(0) if year_match else ''
+            }
+            if len(lines) > 1 and not YEAR_RANGE.search(lines[1]):
                 # This might be degree
-                if ',' in line:
-                    parts = line.split(',')
+                if ',' in lines[1]:
+                    parts = lines[1].split(',')
                     current_edu['degree'] = parts[0].strip()
-                    if len(parts) > 1:
-                        current_edu['field'] = parts[1].strip()
+                    current_edu['field'] = parts[1].strip()
                 else:
-                    current_edu['degree'] = line
-        
-        # Add last education
-        if current_edu and current_edu.get('school'):
+                    current_edu['degree'] = lines[1]
             education.append(current_edu)
         
-        return education[:3]  # Limit to 3
+        education = education[:3]  # Limit to 3
+        if not education:
+            return education, 0.1
+        complete = sum(1 for edu in education if edu['school'] and (edu['degree'] or edu['dates']))
+        return education, 0.9 * complete / len(education)
     
     def _extract_skills(self, text):
-        """Extract skills"""
-        skills = []
+        """
+        Extract skills from the Skills section
         
-        # Find the Skills section
-        skills_match = re.search(r'(?:Skills|SKILLS)(.*?)(?:Interests|INTERESTS|Endorsements|$)', 
-                                text, re.DOTALL | re.IGNORECASE)
+        Returns:
+            tuple: (skills, confidence)
+        """
+        skills = []
         
-        if not skills_match:
-            return skills
+        if not text:
+            return skills, 1.0
         
-        skills_text = skills_match.group(1)
-        lines = skills_text.split('\n')
+        lines = [line.strip() for line in text.split('\n') if line.strip()]
         
         for line in lines[:20]:  # Check first 20 lines
-            line = line.strip()
-            # Skip endorsement counts and common UI elements
-            if line and len(line) > 2 and len(line) < 50:
-                if not any(word in line.lower() for word in ['endorsement', 'show all', 'endorsed by']):
-                    if not line.isdigit():
-                        skills.append(line)
-        
-        return skills[:10]  # Limit to 10 skills
+            # Endorsement counts and UI elements are removed by the cleaner
+            if len(line) > 2 and len(line) < 50 and not line.isdigit():
+                skills.append(line)
+        
+        skills = skills[:10]  # Limit to 10 skills
+        if not skills:
+            return skills, 0.2
+        # Lines like "Backend Engineer at Acme" are the positions a skill was used in
+        if any(' at ' in skill or len(skill.split()) > 4 for skill in skills):
+            return skills, 0.6
+        return skills, 0.9
     
-    def _extract_contact(self, text):
-        """Extract contact information"""
+    def _extract_contact(self, text, header=''):
+        """
+        Extract contact information: email anywhere, location from the header
+        
+        Returns:
+            tuple: (contact, confidence)
+        """
         contact = {
             'email': '',
             'phone': '',
@@ -366,19 +600,24 @@ LinkedIn Profile Text:
         }
         
         # Extract email
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        email_match = re.search(email_pattern, text)
+        email_match = EMAIL.search(text)
         if email_match:
             contact['email'] = email_match.group(0)
         
         # Extract location (usually appears near the top)
-        lines = text.split('\n')
-        for line in lines[:50]:
+        for line in header.split('\n'):
             line = line.strip()
-            # Look for common location patterns
-            if 'India' in line or 'United States' in line or 'UK' in line:
-                if len(line) < 100:
-                    contact['location'] = line
-                    break
-        
-        return contact
+            if LOCATION_LINE.match(line) and len(line) < 100:
+                contact['location'] = line
+                break
+        else:
+            for line in text.split('\n')[:50]:
+                line = line.strip()
+                # Look for common location patterns
+                if 'India' in line or 'United States' in line or 'UK' in line:
+                    if len(line) < 100:
+                        contact['location'] = line
+                        break
+        
+        # Contact details are often simply not in a paste, so their absence is not worth a Gemini call
+        return contact, 0.9 if contact['email'] or contact['location'] else 0.75
@@ -14,6 +14,7 @@ import time
 import os
 from dotenv import load_dotenv
 from linkedin_parser import LinkedInParser
+from instrumentation import span, timed
 
 load_dotenv()
 
@@ -147,17 +148,21 @@ class LinkedInURLScraper:
         try:
             # Setup driver
             if not self.driver:
-                self.setup_driver(headless=False)  # Set to True for production
+                with span('scrape_driver_setup'):
+                    self.setup_driver(headless=False)  # Set to True for production
             
             # Login if required
             if login_required:
-                if not self.login_to_linkedin(email, password):
+                with span('scrape_login'):
+                    logged_in = self.login_to_linkedin(email, password)
+                if not logged_in:
                     raise Exception("Failed to login to LinkedIn")
             
             # Navigate to profile
             print(f"🌐 Navigating to profile: {profile_url}")
-            self.driver.get(profile_url)
-            time.sleep(3)
+            with span('scrape_page_load'):
+                self.driver.get(profile_url)
+                time.sleep(3)
             
             # Scroll to load all content
             print("📜 Scrolling to load content...")
@@ -166,11 +171,12 @@ class LinkedInURLScraper:
             # Click "Show more" buttons
             self._expand_sections()
             
-            # Extract page source
-            page_source = self.driver.page_source
-            
-            # Also get text content
-            body_text = self.driver.find_element(By.TAG_NAME, 'body').text
+            with span('scrape_extract'):
+                # Extract page source
+                page_source = self.driver.page_source
+                
+                # Also get text content
+                body_text = self.driver.find_element(By.TAG_NAME, 'body').text
             
             print("✅ Profile data extracted")
             
@@ -183,6 +189,7 @@ class LinkedInURLScraper:
             print(f"❌ Scraping error: {str(e)}")
             return None
         
+    @timed('scrape_scroll')
     def _scroll_page(self):
         """Scroll the page to load all dynamic content"""
         try:
@@ -211,6 +218,7 @@ class LinkedInURLScraper:
         except Exception as e:
             print(f"⚠️  Scroll error: {str(e)}")
     
+    @timed('scrape_expand')
     def _expand_sections(self):
         """Click 'Show more' buttons to expand sections"""
         try:
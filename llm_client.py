@@ -0,0 +1,366 @@
+"""
+LLM Client
+Shared Gemini access for every analyzer, with blocking and asyncio entry points
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import requests
+from dotenv import load_dotenv
+from instrumentation import span, count
+from key_pool import KeyPool, get_key_pool, backoff_delay, LLM_MAX_RETRIES
+from llm_scheduler import get_llm_scheduler
+from hedging import HedgePolicy
+
+try:
+    import google.generativeai as genai
+    GEMINI_AVAILABLE = True
+except ImportError:
+    GEMINI_AVAILABLE = False
+
+load_dotenv()
+
+MODEL_NAME = os.getenv('GEMINI_MODEL', 'gemini-2.0-flash')
+
+# Upper bound on Gemini calls in flight per process from the async path
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '64'))
+
+# When set, prompts go to this Gemini-compatible REST endpoint instead of the SDK
+# (e.g. http://127.0.0.1:8090 for benchmarks/fake_gemini_server.py)
+GEMINI_BASE_URL = os.getenv('GEMINI_BASE_URL', '').rstrip('/')
+GEMINI_TIMEOUT = float(os.getenv('GEMINI_TIMEOUT', '60'))
+# Public REST endpoint, used instead of the SDK when there are several keys: the SDK
+# reads its key from process-global configuration, so it cannot switch keys per call
+GEMINI_API_URL = 'https://generativelanguage.googleapis.com'
+
+# Identical prompts sent while one is already in flight share its Gemini call
+LLM_COALESCE = os.getenv('LLM_COALESCE', 'true').lower() in ('1', 'true', 'yes')
+
+# Calls that pass a response schema ask Gemini for JSON output constrained to it
+# (responseMimeType + responseJsonSchema) instead of relying on the prompt alone. REST
+# path only: the pinned SDK (google-generativeai 0.3.x) has no response_mime_type
+LLM_JSON_MODE = os.getenv('LLM_JSON_MODE', 'true').lower() in ('1', 'true', 'yes')
+
+
+class GeminiHTTPError(RuntimeError):
+    """Non-200 reply from the generateContent REST method"""
+
+    def __init__(self, status, body, retry_after=None):
+        super().__init__(f"Gemini returned HTTP {status}: {body[:200]}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+def _retry_delay(response):
+    """Seconds the server asked us to wait: Retry-After, or the RetryInfo detail of a Gemini error"""
+    header = response.headers.get('Retry-After')
+    if header:
+        try:
+            return float(header)
+        except ValueError:
+            pass
+    try:
+        details = response.json()['error'].get('details', [])
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return None
+    for detail in details:
+        delay = detail.get('retryDelay') if isinstance(detail, dict) else None
+        if isinstance(delay, str) and delay.endswith('s'):
+            try:
+                return float(delay[:-1])
+            except ValueError:
+                pass
+    return None
+
+
+def _error_status(error):
+    """HTTP status behind a failed call (GeminiHTTPError or a google.api_core exception), or None"""
+    status = getattr(error, 'status', None)
+    if not isinstance(status, int):
+        status = getattr(error, 'code', None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def prompt_key(model_name, prompt, response_schema=None):
+    """Single-flight key: the model plus the prompt with whitespace runs collapsed (and the schema, if any)"""
+    normalized = ' '.join(prompt.split())
+    if response_schema is not None:
+        normalized += '\0' + json.dumps(response_schema, sort_keys=True)
+    return hashlib.sha256(f"{model_name}\0{normalized}".encode('utf-8')).hexdigest()
+
+
+class LLMClient:
+    """Thin wrapper around a Gemini model shared by all analyzers"""
+
+    def __init__(self, api_key=None, model_name=MODEL_NAME, base_url=None, coalesce=LLM_COALESCE,
+                 json_mode=LLM_JSON_MODE, keys=None, scheduler=None, hedging=None):
+        """
+        Args:
+            api_key (str): Single Gemini API key (defaults to the shared key pool)
+            model_name (str): Gemini model to call
+            base_url (str): Gemini-compatible REST endpoint (defaults to GEMINI_BASE_URL)
+            coalesce (bool): Share one call between concurrent identical prompts
+            json_mode (bool): Send response schemas as structured-output requests (REST only)
+            keys (KeyPool): Keys to spread calls over (defaults to GEMINI_API_KEYS / GEMINI_API_KEY)
+            scheduler (LLMScheduler): Admission control by priority class and tenant
+                (defaults to the process-wide scheduler)
+            hedging (HedgePolicy): When to send a duplicate request for a slow call
+                (defaults to the LLM_HEDGE settings)
+        """
+        self.keys = keys if keys is not None else (KeyPool([api_key]) if api_key else get_key_pool())
+        self.scheduler = scheduler or get_llm_scheduler()
+        self.hedging = hedging or HedgePolicy()
+        self.model_name = model_name
+        self.coalesce = coalesce
+        # In-flight calls by prompt_key; futures are thread-safe, so callers on any
+        # thread or event loop can wait on the same call
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+        self.base_url = base_url or GEMINI_BASE_URL or (GEMINI_API_URL if len(self.keys) > 1 else '')
+        self.base_url = self.base_url.rstrip('/')
+        self.model = None
+        self.session = None
+        if self.base_url and len(self.keys):
+            self.session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=LLM_MAX_CONCURRENCY)
+            self.session.mount('http://', adapter)
+            self.session.mount('https://', adapter)
+        elif len(self.keys) and GEMINI_AVAILABLE:
+            # One key: configured once here, never per call
+            genai.configure(api_key=self.keys.keys[0].secret)
+            self.model = genai.GenerativeModel(model_name)
+        # The SDK path sends the prompt alone
+        self.json_mode = json_mode and self.session is not None
+
+        # The SDK's own async client is bound to the event loop it was created on,
+        # and Flask runs each async view on a fresh loop, so async callers get the
+        # blocking call on a dedicated worker pool instead
+        self._executor = ThreadPoolExecutor(max_workers=LLM_MAX_CONCURRENCY, thread_name_prefix='llm')
+        # Requests of hedged calls (the original and its duplicate) run here, off the
+        # thread of the call that waits for the first of them
+        self._hedge_executor = ThreadPoolExecutor(max_workers=2 * LLM_MAX_CONCURRENCY, thread_name_prefix='llm-hedge')
+
+    @property
+    def available(self):
+        """True when a Gemini model or REST endpoint is configured"""
+        return self.model is not None or self.session is not None
+
+    def generate(self, prompt, endpoint='default', response_schema=None):
+        """
+        Send a prompt to Gemini and return the response text
+
+        Args:
+            prompt (str): Prompt text
+            endpoint (str): Calling feature, used for metrics and logging
+            response_schema (dict): JSON Schema of the expected reply; with JSON mode on,
+                Gemini is asked for JSON output that conforms to it
+
+        Returns:
+            str: Response text (stripped)
+        """
+        if not self.available:
+            raise RuntimeError("GEMINI_API_KEY not configured")
+        if not self.json_mode:
+            response_schema = None
+        with span('llm_call'):
+            if not self.coalesce:
+                return self.scheduler.run(lambda: self._call(prompt, endpoint, response_schema))
+
+            key = prompt_key(self.model_name, prompt, response_schema)
+            future, leader = self._join_flight(key, endpoint, Future)
+            if not leader:
+                return future.result()
+            # The first caller makes the call on its own thread (once the scheduler admits
+            # it, under its own class and tenant) and shares the outcome
+            try:
+                text = self.scheduler.run(lambda: self._call(prompt, endpoint, response_schema))
+                future.set_result(text)
+                return text
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            finally:
+                self._land(key)
+
+    def _generate_http(self, prompt, api_key, response_schema=None):
+        """Call the generateContent REST method on base_url with the given key"""
+        body = {'contents': [{'role': 'user', 'parts': [{'text': prompt}]}]}
+        if response_schema is not None:
+            body['generationConfig'] = {'responseMimeType': 'application/json', 'responseJsonSchema': response_schema}
+        response = self.session.post(
+            f"{self.base_url}/v1beta/models/{self.model_name}:generateContent",
+            params={'key': api_key},
+            json=body,
+            timeout=GEMINI_TIMEOUT
+        )
+        if response.status_code != 200:
+            raise GeminiHTTPError(response.status_code, response.text, _retry_delay(response))
+        parts = response.json()['candidates'][0]['content']['parts']
+        return ''.join(part.get('text', '') for part in parts).strip()
+
+    async def generate_async(self, prompt, endpoint='default', response_schema=None):
+        """
+        Async version of generate; the event loop stays free while Gemini responds
+
+        Args:
+            prompt (str): Prompt text
+            endpoint (str): Calling feature, used for metrics and logging
+            response_schema (dict): JSON Schema of the expected reply (see generate)
+
+        Returns:
+            str: Response text (stripped)
+        """
+        if not self.available:
+            raise RuntimeError("GEMINI_API_KEY not configured")
+        if not self.json_mode:
+            response_schema = None
+        # Queued calls wait in the scheduler, not on pool threads, so a backlog of batch
+        # work cannot hold the pool while interactive calls queue behind it
+        if not self.coalesce:
+            with span('llm_call'):
+                return await asyncio.wrap_future(self.scheduler.submit(
+                    self._executor, lambda: self._call(prompt, endpoint, response_schema)))
+
+        key = prompt_key(self.model_name, prompt, response_schema)
+        # Submitted to the pool rather than awaited on this loop, so the call still
+        # completes for the other waiters if this request is cancelled
+        future, _ = self._join_flight(
+            key, endpoint,
+            lambda: self.scheduler.submit(
+                self._executor, lambda: self._call_and_land(key, prompt, endpoint, response_schema)))
+        with span('llm_call'):
+            return await asyncio.wrap_future(future)
+
+    def _join_flight(self, key, endpoint, start):
+        """
+        Find the in-flight call for a prompt or register a new one
+
+        Args:
+            key (str): prompt_key of the prompt
+            endpoint (str): Calling feature, used for metrics
+            start: Returns the Future for a new call; run under the lock
+
+        Returns:
+            tuple: (Future, True if this caller started the call)
+        """
+        with self._flights_lock:
+            future = self._flights.get(key)
+            if future is not None:
+                count('app_llm_coalesced_total', endpoint=endpoint)
+                return future, False
+            future = self._flights[key] = start()
+            return future, True
+
+    def _land(self, key):
+        """Forget a finished call so later identical prompts go to Gemini again"""
+        with self._flights_lock:
+            self._flights.pop(key, None)
+
+    def _call_and_land(self, key, prompt, endpoint, response_schema=None):
+        """Pool task for a shared async call"""
+        try:
+            return self._call(prompt, endpoint, response_schema)
+        finally:
+            self._land(key)
+
+    def _call(self, prompt, endpoint, response_schema=None):
+        """
+        Run one Gemini call, hedged when the endpoint is configured for it (see hedging.py)
+
+        A hedged call sends a duplicate request once the first has been out for the endpoint's
+        p90 latency and returns whichever answers first. The slower request cannot be
+        interrupted mid-flight; it is told to stop retrying and its reply is discarded.
+        """
+        started = time.perf_counter()
+        delay = self.hedging.delay(endpoint) if self.hedging.applies(endpoint) else None
+        if delay is None:
+            text = self._request(prompt, endpoint, response_schema)
+            self.hedging.record_call(endpoint, time.perf_counter() - started)
+            return text
+
+        cancelled = threading.Event()
+        primary = self._hedge_executor.submit(self._request, prompt, endpoint, response_schema, cancelled)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self.hedging.try_spend(endpoint):
+            text = primary.result()
+            self.hedging.record_call(endpoint, time.perf_counter() - started)
+            return text
+
+        hedge = self._hedge_executor.submit(self._request, prompt, endpoint, response_schema, cancelled)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    cancelled.set()
+                    self.hedging.record_call(endpoint, time.perf_counter() - started, hedge_won=future is hedge)
+                    return future.result()
+                error = future.exception()
+        # Both requests failed
+        self.hedging.record_call(endpoint, time.perf_counter() - started, hedge_won=False)
+        raise error
+
+    def _request(self, prompt, endpoint, response_schema=None, cancelled=None):
+        """
+        Run one Gemini request and count its outcome
+
+        A 429 moves the request to another key at once, and fails it when no other key is
+        free (callers fall back to their local result rather than wait out the quota); a 5xx
+        is retried after a backoff. Up to LLM_MAX_RETRIES retries, none once cancelled (a
+        threading.Event) is set.
+        """
+        limited = []
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            key = self.keys.acquire(exclude=limited)
+            sent = time.perf_counter()
+            try:
+                text = self._send(prompt, key, response_schema)
+            except Exception as e:
+                status = _error_status(e)
+                if status == 429:
+                    self.keys.release(key, 'rate_limited', getattr(e, 'retry_after', None))
+                else:
+                    self.keys.release(key, 'error')
+                if status == 429 and key not in limited:
+                    limited.append(key)
+                retryable = (status or 0) >= 500 or (status == 429 and self.keys.has_free_key(exclude=limited))
+                if attempt == LLM_MAX_RETRIES or not retryable or (cancelled is not None and cancelled.is_set()):
+                    count('app_llm_requests_total', endpoint=endpoint, outcome='error')
+                    raise
+                count('app_llm_retries_total', endpoint=endpoint,
+                      reason='rate_limited' if status == 429 else 'server_error')
+                if status != 429:
+                    time.sleep(backoff_delay(attempt))
+                continue
+            self.keys.release(key, 'ok')
+            self.hedging.record_request(endpoint, time.perf_counter() - sent)
+            count('app_llm_requests_total', endpoint=endpoint, outcome='ok')
+            return text
+
+    def _send(self, prompt, key, response_schema=None):
+        """One request on the configured backend"""
+        if self.session is not None:
+            return self._generate_http(prompt, key.secret, response_schema)
+        return self.model.generate_content(prompt).text.strip()
+
+
+_client_lock = threading.Lock()
+_default_client = None
+
+
+def get_llm_client():
+    """Return the process-wide LLMClient (configures Gemini once instead of per analyzer)"""
+    global _default_client
+    if _default_client is None:
+        with _client_lock:
+            if _default_client is None:
+                _default_client = LLMClient()
+    return _default_client
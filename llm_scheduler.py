@@ -0,0 +1,254 @@
+"""
+LLM Scheduler
+Admission control for Gemini calls: priority classes with their own concurrency caps, and
+weighted fair queuing between tenants within a class
+
+Classes, highest priority first:
+    interactive   Dashboard requests a user is waiting on (the default)
+    background    Instant-response upgrades (upgrades.py)
+    batch         Bulk scoring and scheduled jobs
+
+When no slot is free, calls queue. A freed slot always goes to the highest class with work
+waiting and room under its cap, so queued batch work is pushed back by every interactive
+call that arrives. Within a class, tenants take turns in proportion to their weights
+(start-time fair queuing), so one tenant's 500-profile batch does not delay another's.
+
+Each request's class and tenant live in context variables set by app.py / asgi.py from
+the X-LLM-Priority and X-Tenant-ID headers (tenant defaults to the client address).
+"""
+import heapq
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import Future
+from contextvars import ContextVar
+from instrumentation import count, registry
+
+PRIORITY_CLASSES = ('interactive', 'background', 'batch')
+
+# Gemini calls in flight across all classes, and the share each class may take
+LLM_SCHEDULER_CAPACITY = int(os.getenv('LLM_SCHEDULER_CAPACITY', os.getenv('LLM_MAX_CONCURRENCY', '64')))
+CLASS_LIMITS = {
+    'interactive': int(os.getenv('LLM_INTERACTIVE_MAX_CONCURRENCY', str(LLM_SCHEDULER_CAPACITY))),
+    'background': int(os.getenv('LLM_BACKGROUND_MAX_CONCURRENCY', str(max(1, LLM_SCHEDULER_CAPACITY // 2)))),
+    'batch': int(os.getenv('LLM_BATCH_MAX_CONCURRENCY', str(max(1, LLM_SCHEDULER_CAPACITY // 4))))
+}
+
+# Relative shares within a class, e.g. "acme=3,internal=1" (unlisted tenants weigh 1)
+TENANT_WEIGHTS = {
+    name.strip(): float(weight)
+    for name, _, weight in (item.partition('=') for item in os.getenv('LLM_TENANT_WEIGHTS', '').split(','))
+    if name.strip() and weight
+}
+
+PRIORITY_HEADER = 'X-LLM-Priority'
+TENANT_HEADER = 'X-Tenant-ID'
+
+current_priority = ContextVar('llm_priority', default='interactive')
+current_tenant = ContextVar('llm_tenant', default='default')
+
+QUEUE_METRIC = 'app_llm_queue_seconds'
+
+
+def set_llm_context(priority=None, tenant=None):
+    """
+    Set the scheduling class and tenant for LLM calls made in this context
+
+    Unknown priorities are ignored (the class stays interactive).
+
+    Returns:
+        tuple: Tokens for reset_llm_context
+    """
+    priority = priority.lower() if isinstance(priority, str) else priority
+    return (current_priority.set(priority if priority in PRIORITY_CLASSES else current_priority.get()),
+            current_tenant.set(tenant or current_tenant.get()))
+
+
+def reset_llm_context(tokens):
+    """Restore the class and tenant that were active before set_llm_context"""
+    priority_token, tenant_token = tokens
+    current_tenant.reset(tenant_token)
+    current_priority.reset(priority_token)
+
+
+def _copy_outcome(source, target):
+    """Complete target with source's result or exception"""
+    error = source.exception()
+    if error is not None:
+        target.set_exception(error)
+    else:
+        target.set_result(source.result())
+
+
+class Ticket:
+    """A call waiting for (or holding) a slot"""
+
+    __slots__ = ('priority', 'tenant', 'finish', 'seq', 'start', 'queued_at')
+
+    def __init__(self, priority, tenant, finish, seq, start):
+        self.priority = priority
+        self.tenant = tenant
+        self.finish = finish
+        self.seq = seq
+        # Called with the ticket (outside the lock) once it is granted a slot
+        self.start = start
+        self.queued_at = time.perf_counter()
+
+    def __lt__(self, other):
+        return (self.finish, self.seq) < (other.finish, other.seq)
+
+
+class PriorityClass:
+    """Queue and virtual clock of one priority class"""
+
+    __slots__ = ('name', 'limit', 'running', 'queue', 'virtual_time', 'last_finish')
+
+    def __init__(self, name, limit):
+        self.name = name
+        self.limit = limit
+        self.running = 0
+        self.queue = []
+        self.virtual_time = 0.0
+        # Virtual finish time of each tenant's latest ticket
+        self.last_finish = {}
+
+
+class LLMScheduler:
+    """Hands out LLM call slots by priority class, then by weighted fair share between tenants"""
+
+    def __init__(self, capacity=LLM_SCHEDULER_CAPACITY, limits=None, weights=None):
+        """
+        Args:
+            capacity (int): Calls in flight across all classes
+            limits (dict): Class name -> calls in flight allowed for that class (defaults to CLASS_LIMITS)
+            weights (dict): Tenant -> relative share within a class (defaults to TENANT_WEIGHTS)
+        """
+        limits = {**CLASS_LIMITS, **(limits or {})}
+        self.capacity = capacity
+        self.classes = [PriorityClass(name, min(capacity, limits[name])) for name in PRIORITY_CLASSES]
+        self._by_name = {cls.name: cls for cls in self.classes}
+        self.weights = TENANT_WEIGHTS if weights is None else weights
+        self.running = 0
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def _enqueue(self, priority, tenant, start):
+        """Queue a ticket and grant whatever fits; start(ticket) runs once the ticket has a slot"""
+        cls = self._by_name.get(priority, self.classes[0])
+        with self._lock:
+            begin = max(cls.virtual_time, cls.last_finish.get(tenant, 0.0))
+            finish = begin + 1 / self.weights.get(tenant, 1.0)
+            cls.last_finish[tenant] = finish
+            ticket = Ticket(cls.name, tenant, finish, next(self._seq), start)
+            heapq.heappush(cls.queue, ticket)
+            granted = self._grant()
+        for granted_ticket in granted:
+            granted_ticket.start(granted_ticket)
+        return ticket
+
+    def _grant(self):
+        """Pop every ticket that fits now, highest class first (caller holds the lock)"""
+        granted = []
+        while self.running < self.capacity:
+            cls = next((cls for cls in self.classes if cls.queue and cls.running < cls.limit), None)
+            if cls is None:
+                break
+            ticket = heapq.heappop(cls.queue)
+            # The class clock follows the start tag of the ticket it serves
+            cls.virtual_time = max(cls.virtual_time, ticket.finish - 1 / self.weights.get(ticket.tenant, 1.0))
+            if not cls.queue:
+                # Idle class: forget old finish tags so returning tenants start level
+                cls.last_finish.clear()
+            cls.running += 1
+            self.running += 1
+            granted.append(ticket)
+            waited = time.perf_counter() - ticket.queued_at
+            registry.observe(QUEUE_METRIC, (('priority', cls.name),), waited)
+            count('app_llm_scheduled_total', priority=cls.name)
+        return granted
+
+    def _release(self, ticket):
+        """Free a ticket's slot and start whatever can use it"""
+        with self._lock:
+            self._by_name[ticket.priority].running -= 1
+            self.running -= 1
+            granted = self._grant()
+        for granted_ticket in granted:
+            granted_ticket.start(granted_ticket)
+
+    def run(self, fn, priority=None, tenant=None):
+        """
+        Run fn on this thread once a slot is free
+
+        Args:
+            fn: Callable making the LLM call
+            priority (str): Class name (defaults to the context's class)
+            tenant (str): Tenant (defaults to the context's tenant)
+
+        Returns:
+            Whatever fn returns
+        """
+        ready = threading.Event()
+        ticket = self._enqueue(priority or current_priority.get(), tenant or current_tenant.get(),
+                               lambda _: ready.set())
+        ready.wait()
+        try:
+            return fn()
+        finally:
+            self._release(ticket)
+
+    def submit(self, executor, fn, priority=None, tenant=None):
+        """
+        Queue fn and run it on executor once a slot is free, without blocking the caller
+
+        Returns:
+            concurrent.futures.Future: Completes with fn's result
+        """
+        future = Future()
+
+        def work(ticket):
+            try:
+                return fn()
+            finally:
+                self._release(ticket)
+
+        def started(ticket):
+            try:
+                inner = executor.submit(work, ticket)
+            except RuntimeError as e:
+                # Executor shut down
+                self._release(ticket)
+                future.set_exception(e)
+                return
+            inner.add_done_callback(lambda done: _copy_outcome(done, future))
+
+        self._enqueue(priority or current_priority.get(), tenant or current_tenant.get(), started)
+        return future
+
+    def stats(self):
+        """
+        Returns:
+            dict: Running and queued calls per class
+        """
+        with self._lock:
+            return {
+                'capacity': self.capacity,
+                'running': self.running,
+                'classes': {cls.name: {'limit': cls.limit, 'running': cls.running, 'queued': len(cls.queue)}
+                            for cls in self.classes}
+            }
+
+
+_scheduler_lock = threading.Lock()
+_default_scheduler = None
+
+
+def get_llm_scheduler():
+    """Return the process-wide LLMScheduler"""
+    global _default_scheduler
+    if _default_scheduler is None:
+        with _scheduler_lock:
+            if _default_scheduler is None:
+                _default_scheduler = LLMScheduler()
+    return _default_scheduler
@@ -0,0 +1,129 @@
+"""
+Request Profiling
+Opt-in cProfile capture for single requests, stored as pstats artifacts in a bounded directory
+
+Enable with PROFILING_ENABLED=true, then send a request with the header
+`X-Profile: 1` (or `?profile=1`). The response carries `X-Profile-Id`; the
+artifacts are <PROFILE_DIR>/<id>.pstats (load with pstats or snakeviz) and
+<id>.txt (top functions by cumulative time).
+"""
+import cProfile
+import io
+import os
+import pstats
+import re
+import threading
+import uuid
+from datetime import datetime
+
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+# When set, the X-Profile header must carry this value instead of 1
+PROFILE_TOKEN = os.getenv('PROFILE_TOKEN', '')
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', '50'))
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+SUMMARY_LINES = 40
+
+# cProfile hooks one thread at a time; a second concurrent request is served unprofiled
+_profile_lock = threading.Lock()
+
+ROUTE_SLUG = re.compile(r"[^a-z0-9]+")
+
+
+def profile_requested(header_value=None, query_value=None):
+    """
+    Decide whether a request asked to be profiled
+
+    Args:
+        header_value (str): Value of the X-Profile header, if any
+        query_value (str): Value of the ?profile= query parameter, if any
+
+    Returns:
+        bool: True when profiling is enabled and the request opted in
+    """
+    if not PROFILING_ENABLED:
+        return False
+    value = header_value or query_value
+    if not value:
+        return False
+    if PROFILE_TOKEN:
+        return value == PROFILE_TOKEN
+    return value.lower() in ('1', 'true', 'yes')
+
+
+class RequestProfiler:
+    """
+    Context manager that profiles the enclosed block and saves the artifact
+
+    Usage:
+        with RequestProfiler('/generate-interview-questions') as profiler:
+            ...
+        response.headers['X-Profile-Id'] = profiler.profile_id
+    """
+
+    def __init__(self, route):
+        self.route = route
+        self.profile_id = None
+        self._profiler = None
+
+    def __enter__(self):
+        if _profile_lock.acquire(blocking=False):
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._profiler is None:
+            return False
+        try:
+            self._profiler.disable()
+            self.profile_id = save_profile(self._profiler, self.route)
+        except OSError as e:
+            print(f"⚠️  Could not save profile: {e}")
+        finally:
+            self._profiler = None
+            _profile_lock.release()
+        return False
+
+    @property
+    def header_value(self):
+        """Value for the X-Profile-Id response header"""
+        return self.profile_id or 'busy'
+
+
+def save_profile(profiler, route):
+    """
+    Write a profiler's stats to PROFILE_DIR and prune old artifacts
+
+    Returns:
+        str: Profile id (artifact file name without extension)
+    """
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    slug = ROUTE_SLUG.sub('-', route.lower()).strip('-') or 'root'
+    profile_id = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{slug}-{uuid.uuid4().hex[:8]}"
+    base = os.path.join(PROFILE_DIR, profile_id)
+
+    profiler.dump_stats(base + '.pstats')
+
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(SUMMARY_LINES)
+    with open(base + '.txt', 'w', encoding='utf-8') as f:
+        f.write(f"route: {route}\n")
+        f.write(summary.getvalue())
+
+    _prune(PROFILE_DIR, PROFILE_MAX_FILES)
+    print(f"🔬 Saved request profile {profile_id}")
+    return profile_id
+
+
+def _prune(directory, keep):
+    """Delete the oldest profiles so at most `keep` remain"""
+    ids = sorted(name[:-len('.pstats')] for name in os.listdir(directory) if name.endswith('.pstats'))
+    for profile_id in ids[:max(0, len(ids) - keep)]:
+        for ext in ('.pstats', '.txt'):
+            try:
+                os.remove(os.path.join(directory, profile_id + ext))
+            except FileNotFoundError:
+                pass
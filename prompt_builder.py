@@ -0,0 +1,210 @@
+"""
+Prompt Builder
+Shared prompt assembly with token estimation, boilerplate stripping and budget-aware truncation
+"""
+import os
+import re
+import threading
+from linkedin_cleaner import strip_ui_lines
+from instrumentation import count
+
+# Rough but stable heuristic for Gemini/English text: ~4 characters per token
+CHARS_PER_TOKEN = 4
+
+DEFAULT_TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', '4000'))
+
+# Section priorities: higher survives longer when the prompt is over budget
+REQUIRED = 100
+HIGH = 75
+MEDIUM = 50
+LOW = 25
+
+TRUNCATION_MARKER = '…'
+
+MULTI_SPACE = re.compile(r"[ \t]{2,}")
+
+
+def estimate_tokens(text):
+    """
+    Estimate the number of model tokens in a text
+
+    Args:
+        text (str): Prompt text
+
+    Returns:
+        int: Approximate token count
+    """
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def strip_boilerplate(text):
+    """Remove UI-only lines and inline 'see more' artifacts from pasted text"""
+    return strip_ui_lines(text)
+
+
+def dedupe_lines(text):
+    """Drop repeated non-empty lines (keeping the first) and collapse blank runs"""
+    if not text:
+        return ''
+    seen = set()
+    kept = []
+    previous_blank = False
+    for line in text.splitlines():
+        stripped = MULTI_SPACE.sub(' ', line.strip())
+        if not stripped:
+            if not previous_blank and kept:
+                kept.append('')
+            previous_blank = True
+            continue
+        key = stripped.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        kept.append(stripped)
+        previous_blank = False
+    return '\n'.join(kept).strip()
+
+
+def compact_text(text):
+    """Strip boilerplate and repeated lines from free text before it goes into a prompt"""
+    return dedupe_lines(strip_boilerplate(text))
+
+
+def truncate_to_tokens(text, max_tokens):
+    """
+    Truncate text to roughly max_tokens, preferring a line or word boundary
+
+    Args:
+        text (str): Text to shorten
+        max_tokens (int): Token allowance
+
+    Returns:
+        str: Text that fits the allowance (with a trailing marker if cut)
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ''
+
+    limit = max(0, max_tokens * CHARS_PER_TOKEN - len(TRUNCATION_MARKER))
+    cut = text[:limit]
+    boundary = max(cut.rfind('\n'), cut.rfind(' '))
+    if boundary > limit * 0.6:
+        cut = cut[:boundary]
+    return cut.rstrip() + TRUNCATION_MARKER
+
+
+class PromptSection:
+    """One block of a prompt with its priority and minimum allowance"""
+
+    __slots__ = ('text', 'priority', 'min_tokens')
+
+    def __init__(self, text, priority, min_tokens):
+        self.text = text
+        self.priority = priority
+        self.min_tokens = min_tokens
+
+
+class PromptBuilder:
+    """Assemble a prompt from prioritized sections and fit it into a token budget"""
+
+    def __init__(self, name, token_budget=None):
+        """
+        Args:
+            name (str): Prompt name used for the tokens-per-request metrics
+            token_budget (int): Maximum prompt tokens (defaults to PROMPT_TOKEN_BUDGET)
+        """
+        self.name = name
+        self.token_budget = token_budget or DEFAULT_TOKEN_BUDGET
+        self.sections = []
+        self.raw_tokens = 0
+
+    def add(self, text, priority=REQUIRED, compact=False, min_tokens=0):
+        """
+        Append a section to the prompt
+
+        Args:
+            text (str): Section text
+            priority (int): REQUIRED sections are never truncated; lower ones are cut first
+            compact (bool): Strip UI boilerplate and duplicate lines (for user-pasted text)
+            min_tokens (int): Below this allowance the section is dropped instead of cut
+
+        Returns:
+            PromptBuilder: self, for chaining
+        """
+        text = text or ''
+        self.raw_tokens += estimate_tokens(text)
+        if compact:
+            text = compact_text(text)
+        self.sections.append(PromptSection(text, priority, min_tokens))
+        return self
+
+    def build(self):
+        """
+        Render the prompt, truncating the lowest-priority sections until it fits
+
+        Returns:
+            str: Final prompt text
+        """
+        sizes = [estimate_tokens(section.text) for section in self.sections]
+        overflow = sum(sizes) - self.token_budget
+
+        if overflow > 0:
+            order = sorted(
+                (i for i, section in enumerate(self.sections) if section.priority < REQUIRED),
+                key=lambda i: self.sections[i].priority
+            )
+            for i in order:
+                if overflow <= 0:
+                    break
+                section = self.sections[i]
+                allowance = sizes[i] - overflow
+                if allowance < max(section.min_tokens, 1):
+                    allowance = 0
+                section.text = truncate_to_tokens(section.text, allowance)
+                new_size = estimate_tokens(section.text)
+                overflow -= sizes[i] - new_size
+                sizes[i] = new_size
+
+        prompt = '\n'.join(section.text for section in self.sections if section.text)
+        record_prompt(self.name, self.raw_tokens, estimate_tokens(prompt))
+        return prompt
+
+
+_stats_lock = threading.Lock()
+_prompt_stats = {}
+
+
+def record_prompt(name, raw_tokens, sent_tokens):
+    """Record the estimated size of a prompt before and after compaction"""
+    with _stats_lock:
+        stats = _prompt_stats.setdefault(name, {'requests': 0, 'raw_tokens': 0, 'sent_tokens': 0})
+        stats['requests'] += 1
+        stats['raw_tokens'] += raw_tokens
+        stats['sent_tokens'] += sent_tokens
+    count('app_prompt_tokens_total', raw_tokens, prompt=name, kind='raw')
+    count('app_prompt_tokens_total', sent_tokens, prompt=name, kind='sent')
+
+
+def get_prompt_stats():
+    """
+    Tokens-per-request metrics for every prompt built in this process
+
+    Returns:
+        dict: Per prompt name - request count, average raw/sent tokens and savings
+    """
+    with _stats_lock:
+        report = {}
+        for name, stats in _prompt_stats.items():
+            requests = stats['requests']
+            report[name] = {
+                'requests': requests,
+                'avg_raw_tokens': round(stats['raw_tokens'] / requests, 1),
+                'avg_sent_tokens': round(stats['sent_tokens'] / requests, 1),
+                'tokens_saved_pct': round(
+                    100 * (1 - stats['sent_tokens'] / stats['raw_tokens']), 1
+                ) if stats['raw_tokens'] else 0.0
+            }
+        return report
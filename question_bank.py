@@ -0,0 +1,333 @@
+"""
+Question Bank
+Bundled interview questions indexed by skill, role family, category and difficulty, with
+retrieval that fills most of a request locally so Gemini only writes what is profile-specific
+"""
+import json
+import math
+import os
+from collections import defaultdict
+from functools import lru_cache
+from analysis_results import FrozenDict, freeze
+from career_graph import get_career_graph
+from job_matcher import tokenize, STOPWORDS
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+QUESTION_BANK_PATH = os.path.join(DATA_DIR, 'interview_questions.jsonl')
+
+# Share of the bank questions given to each kind, and the result list each kind fills
+KIND_SHARES = (('technical', 0.4), ('behavioral', 0.3), ('situational', 0.15), ('company_culture', 0.15))
+KIND_FIELDS = {
+    'technical': 'technical_questions',
+    'behavioral': 'behavioral_questions',
+    'situational': 'situational_questions',
+    'company_culture': 'company_culture_questions'
+}
+
+# Same mix the AI prompt asks for
+DIFFICULTY_SHARES = (('Easy', 0.4), ('Medium', 0.4), ('Hard', 0.2))
+
+# Fields copied from a bank entry into the question returned to the client
+QUESTION_FIELDS = ('question', 'difficulty', 'key_points', 'star_template', 'red_flags',
+                   'preparation_tip', 'good_approach')
+
+SKILL_MATCH_WEIGHT = 3
+JD_MATCH_WEIGHT = 2
+FAMILY_MATCH_WEIGHT = 2
+
+
+@lru_cache(maxsize=4096)
+def _key(text):
+    """Normalized form of a skill name or JD term ('REST APIs' -> 'rest api')"""
+    return ' '.join(tokenize(text))
+
+
+def question_key(text):
+    """
+    De-duplication key for a question
+
+    Case, punctuation, plurals and filler words are ignored, so the bank's wording and a
+    model's near-identical rewording of it collide.
+    """
+    return ' '.join(token for token in tokenize(text or '') if token not in STOPWORDS)
+
+
+class BankQuestion:
+    """A bank entry with its precomputed lookup keys"""
+
+    __slots__ = ('id', 'position', 'kind', 'difficulty', 'skills', 'skill_keys', 'families', 'key', 'payload')
+
+    def __init__(self, entry, position):
+        self.id = entry['id']
+        self.position = position
+        self.kind = entry['kind']
+        self.difficulty = entry['difficulty']
+        self.skills = tuple(entry.get('skills', ()))
+        self.skill_keys = tuple(_key(skill) for skill in self.skills)
+        self.families = frozenset(entry.get('families', ()))
+        self.key = question_key(entry['question'])
+        payload = {'question': entry['question'], 'category': entry['topic']}
+        payload.update((field, entry[field]) for field in QUESTION_FIELDS if field in entry)
+        self.payload = freeze(payload)
+
+    def __repr__(self):
+        return f"BankQuestion({self.id!r})"
+
+
+class QuestionBank:
+    """Index of the bundled questions and personalized retrieval over it"""
+
+    def __init__(self, path=QUESTION_BANK_PATH):
+        self.questions = []
+        self._index = {}
+        self._skill_keys = frozenset()
+        # Per kind: ranked entries for the questions not tied to any skill or role family
+        self._general = {}
+        self._load(path)
+        # Cached per instance: a posting is usually matched against many profiles
+        self._jd_skills = lru_cache(maxsize=256)(self._match_jd_skills)
+        # The selection only depends on the matched skills, role family and count, which
+        # repeat across requests (instant answer then upgrade, shards, similar profiles)
+        self._selection = lru_cache(maxsize=1024)(self._select)
+
+    def _load(self, path):
+        """Read the JSONL bank and index every entry by skill, family, kind and difficulty"""
+        if not os.path.exists(path):
+            print(f"⚠️  Warning: question bank not found at {path}")
+            return
+
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    self.questions.append(BankQuestion(json.loads(line), len(self.questions)))
+
+        for question in self.questions:
+            keys = [('kind', question.kind), ('difficulty', question.difficulty.lower())]
+            keys.extend(('skill', skill) for skill in question.skill_keys)
+            keys.extend(('family', family) for family in question.families)
+            for key in keys:
+                self._index.setdefault(key, []).append(question)
+        self._skill_keys = frozenset(skill for kind, skill in self._index if kind == 'skill')
+
+        # General questions score the same for everyone, so their ranking is built once
+        for kind, _ in KIND_SHARES:
+            self._general[kind] = tuple((0, q) for q in self._index.get(('kind', kind), ())
+                                        if not (q.skills or q.families))
+
+    def find(self, kind=None, difficulty=None, skill=None, family=None):
+        """
+        Bank questions matching every given criterion
+
+        Args:
+            kind (str): 'technical', 'behavioral', 'situational' or 'company_culture'
+            difficulty (str): 'Easy', 'Medium' or 'Hard'
+            skill (str): Skill name, matched after normalization
+            family (str): Career-graph role family ('backend', 'analytics', ...)
+
+        Returns:
+            list: BankQuestion objects in bank order
+        """
+        criteria = [('kind', kind), ('difficulty', difficulty and difficulty.lower()),
+                    ('skill', skill and _key(skill)), ('family', family)]
+        matches = None
+        for key in criteria:
+            if key[1] is None:
+                continue
+            found = self._index.get(key, ())
+            matches = list(found) if matches is None else [q for q in matches if q in found]
+        return self.questions[:] if matches is None else matches
+
+    def select(self, profile_data, job_description=None, count=25):
+        """
+        Pick up to count questions relevant to a profile and job
+
+        Technical questions need a skill or role-family match; the other kinds fall back to
+        general questions. Kinds and difficulties are balanced like the AI prompt asks.
+
+        Args:
+            profile_data (dict): User's profile data
+            job_description (str): Target job description (optional)
+            count (int): Maximum number of questions
+
+        Returns:
+            dict: Question lists keyed by result field ('technical_questions', ...)
+        """
+        if count <= 0 or not self.questions:
+            return {field: [] for field in KIND_FIELDS.values()}
+
+        profile_skills = {}
+        for skill in profile_data.get('skills', []):
+            key = _key(skill) if skill else None
+            if key in self._skill_keys:
+                profile_skills.setdefault(key, skill)
+        jd_skills = self._jd_skills(job_description) if job_description else frozenset()
+        selection = self._selection(tuple(profile_skills.items()), jd_skills, self._role_family(profile_data), count)
+        # Fresh lists per caller; the questions themselves are frozen and shared
+        return {field: list(questions) for field, questions in selection.items()}
+
+    def _select(self, profile_skills, jd_skills, family, count):
+        """
+        Uncached select() over the matched inputs
+
+        Args:
+            profile_skills (tuple): (normalized key, spelling on the profile) of bank skills the profile lists
+            jd_skills (frozenset): Normalized bank skills the job description names
+            family (str): Role family or None
+            count (int): Maximum number of questions
+
+        Returns:
+            dict: Question tuples keyed by result field
+        """
+        profile_skills = dict(profile_skills)
+        scored = self._score(profile_skills, jd_skills, family)
+        ranked = {}
+        chosen = {}
+        for kind, quota in self._quotas(count).items():
+            ranked[kind] = self._rank(kind, scored.get(kind, []))
+            chosen[kind] = self._balance(ranked[kind], quota)
+
+        # Kinds without enough relevant questions hand their unused quota to the others
+        missing = count - sum(len(entries) for entries in chosen.values())
+        for kind, _ in KIND_SHARES:
+            if missing <= 0:
+                break
+            taken = {entry[1].id for entry in chosen[kind]}
+            extra = [entry for entry in ranked[kind] if entry[1].id not in taken][:missing]
+            chosen[kind].extend(extra)
+            missing -= len(extra)
+
+        selected = {field: () for field in KIND_FIELDS.values()}
+        for kind, entries in chosen.items():
+            selected[KIND_FIELDS[kind]] = tuple(self._personalize(question, profile_skills, jd_skills)
+                                                for _, question in entries)
+        return selected
+
+    def _quotas(self, count):
+        """Split count between the kinds, largest remainders first"""
+        exact = [(kind, count * share) for kind, share in KIND_SHARES]
+        quotas = {kind: math.floor(value) for kind, value in exact}
+        leftover = count - sum(quotas.values())
+        for kind, value in sorted(exact, key=lambda item: quotas[item[0]] - item[1])[:leftover]:
+            quotas[kind] += 1
+        return quotas
+
+    def _match_jd_skills(self, job_description):
+        """Bank skills named in the job description (as a normalized unigram or bigram)"""
+        tokens = tokenize(job_description)
+        terms = set(tokens).union(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+        return self._skill_keys.intersection(terms)
+
+    def _role_family(self, profile_data):
+        """Career-graph family of the current title or headline, if either is recognized"""
+        experiences = profile_data.get('experience') or [{}]
+        graph = get_career_graph()
+        for title in (experiences[0].get('title'), profile_data.get('headline')):
+            role = graph.find_role(title) if title else None
+            if role:
+                return role.family
+        return None
+
+    def _score(self, profile_skills, jd_skills, family):
+        """
+        Score the questions tied to a matched skill or the role family
+
+        Only those questions are visited, so the cost follows the number of matches
+        rather than the size of the bank.
+
+        Returns:
+            dict: (negated score, bank position, BankQuestion) lists keyed by kind
+        """
+        scores = defaultdict(int)
+        for skill_key in profile_skills.keys() | jd_skills:
+            weight = SKILL_MATCH_WEIGHT if skill_key in profile_skills else JD_MATCH_WEIGHT
+            for question in self._index.get(('skill', skill_key), ()):
+                scores[question] += weight
+        for question in self._index.get(('family', family), ()):
+            scores[question] += FAMILY_MATCH_WEIGHT
+
+        scored = {}
+        for question, score in scores.items():
+            # Negated score and the unique bank position sort best first without a key function
+            scored.setdefault(question.kind, []).append((-score, question.position, question))
+        return scored
+
+    def _rank(self, kind, scored):
+        """
+        Order a kind's scored questions best first, followed by its general questions
+
+        Returns:
+            list: (score, BankQuestion) tuples
+        """
+        scored.sort()
+        ranked = [(-negated, question) for negated, _, question in scored]
+        ranked.extend(self._general.get(kind, ()))
+        return ranked
+
+    def _balance(self, ranked, quota):
+        """Take the best ranked entries while keeping the Easy/Medium/Hard mix"""
+        if quota <= 0:
+            return []
+        limits = {difficulty: math.ceil(quota * share) for difficulty, share in DIFFICULTY_SHARES}
+        chosen = []
+        skipped = []
+        for entry in ranked:
+            difficulty = entry[1].difficulty
+            if limits.get(difficulty, quota) > 0:
+                limits[difficulty] = limits.get(difficulty, quota) - 1
+                chosen.append(entry)
+            else:
+                skipped.append(entry)
+            if len(chosen) == quota:
+                break
+        # Not enough of some difficulty: fill with the best of the rest
+        chosen.extend(skipped[:quota - len(chosen)])
+        return chosen
+
+    def _personalize(self, question, profile_skills, jd_skills):
+        """Client-facing question, noting the first of its skills that made it relevant"""
+        for skill_key, skill in zip(question.skill_keys, question.skills):
+            if skill_key in profile_skills:
+                reason = f"You list {profile_skills[skill_key]} on your profile"
+                break
+            if skill_key in jd_skills:
+                reason = f"The job description asks for {skill}"
+                break
+        else:
+            return question.payload
+        # The payload's values are already frozen, so a shallow copy is enough
+        return FrozenDict(question.payload, why_asking=reason)
+
+
+_default_bank = None
+
+
+def get_question_bank():
+    """Return the shared QuestionBank so the bundled file is only indexed once per process"""
+    global _default_bank
+    if _default_bank is None:
+        _default_bank = QuestionBank()
+    return _default_bank
+
+
+# Test
+if __name__ == "__main__":
+    import time
+
+    bank = get_question_bank()
+    print(f"{len(bank.questions)} questions; {len(bank.find(kind='technical', skill='python'))} on Python")
+    profile = {
+        'headline': 'Senior Backend Engineer',
+        'skills': ['Python', 'PostgreSQL', 'Docker', 'Kubernetes', 'REST APIs'],
+        'experience': [{'title': 'Senior Backend Engineer', 'company': 'Acme'}]
+    }
+    jd = "We need a backend engineer with Go, Kafka and AWS experience to design distributed systems."
+
+    bank.select(profile, jd, 18)
+    start = time.perf_counter()
+    selected = bank.select(profile, jd, 18)
+    elapsed_us = (time.perf_counter() - start) * 1e6
+    for field, items in selected.items():
+        print(f"\n{field} ({len(items)})")
+        for item in items:
+            print(f"  [{item['difficulty']}] {item['question']}  <- {item.get('why_asking', 'general')}")
+    print(f"\nSelected in {elapsed_us:.0f} µs")
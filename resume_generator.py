@@ -5,16 +5,17 @@ from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
 from datetime import datetime
-import os
+import io
+import uuid
+from instrumentation import span
+from storage import get_storage
 
 
 class ResumeGenerator:
     """Generate PDF resumes from LinkedIn profile data"""
     
     def __init__(self):
-        self.output_folder = 'generated_resumes'
-        if not os.path.exists(self.output_folder):
-            os.makedirs(self.output_folder)
+        self.storage = get_storage()
     
     def create_resume(self, profile_data, template='modern'):
         """
@@ -25,15 +26,15 @@ class ResumeGenerator:
             template (str): Template style - 'modern', 'classic', 'executive', 'creative'
             
         Returns:
-            str: Path to generated PDF file
+            str: Name of the stored PDF (download it via /download/<name>)
         """
-        # Generate unique filename
+        # Generate unique filename (the suffix keeps same-second requests apart)
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"resume_{template}_{timestamp}.pdf"
-        filepath = os.path.join(self.output_folder, filename)
+        filename = f"resume_{template}_{timestamp}_{uuid.uuid4().hex[:8]}.pdf"
+        buffer = io.BytesIO()
         
         # Create PDF document
-        doc = SimpleDocTemplate(filepath, pagesize=letter,
+        doc = SimpleDocTemplate(buffer, pagesize=letter,
                               rightMargin=0.75*inch, leftMargin=0.75*inch,
                               topMargin=0.75*inch, bottomMargin=0.75*inch)
         
@@ -41,17 +42,20 @@ class ResumeGenerator:
         story = []
         
         # Select template and build resume
-        if template == 'classic':
-            story = self._build_classic_template(profile_data)
-        elif template == 'executive':
-            story = self._build_executive_template(profile_data)
-        elif template == 'creative':
-            story = self._build_creative_template(profile_data)
-        else:  # Default to modern
-            story = self._build_modern_template(profile_data)
+        with span('flowable_build'):
+            if template == 'classic':
+                story = self._build_classic_template(profile_data)
+            elif template == 'executive':
+                story = self._build_executive_template(profile_data)
+            elif template == 'creative':
+                story = self._build_creative_template(profile_data)
+            else:  # Default to modern
+                story = self._build_modern_template(profile_data)
         
         # Build PDF
-        doc.build(story)
+        with span('pdf_write'):
+            doc.build(story)
+            self.storage.save(filename, buffer.getvalue(), kind='resume')
         
         return filename
     
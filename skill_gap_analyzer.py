@@ -2,25 +2,95 @@
 Skill Gap Analyzer
 Compares user skills with job requirements and identifies gaps
 """
-import google.generativeai as genai
+import asyncio
+import json
 import os
-from dotenv import load_dotenv
-import re
+from llm_client import get_llm_client
+from instrumentation import count, timed
+from analysis_results import SkillGapResult, freeze
+from prompt_builder import PromptBuilder, HIGH, MEDIUM, LOW
+from wire_schema import SKILL_GAP_WIRE, compact_wire
+from jd_cache import job_description_prompt, get_jd_cache
+from job_matcher import get_keyword_matcher, tokenize
 
-load_dotenv()
+# Job descriptions accepted by one batch comparison
+SKILL_GAP_BATCH_MAX = int(os.getenv('SKILL_GAP_BATCH_MAX', '50'))
+# Best-ranked job descriptions of a batch that also get a Gemini analysis (0: local ranking only)
+SKILL_GAP_BATCH_AI_TOP = int(os.getenv('SKILL_GAP_BATCH_AI_TOP', '3'))
+
+# Keyword list for the basic matcher
+COMMON_SKILLS = (
+    'python', 'java', 'javascript', 'react', 'node.js', 'sql', 'aws',
+    'docker', 'kubernetes', 'git', 'agile', 'scrum', 'machine learning',
+    'data analysis', 'project management', 'leadership', 'communication',
+    'problem solving', 'teamwork', 'css', 'html', 'typescript', 'angular',
+    'vue', 'django', 'flask', 'mongodb', 'postgresql', 'redis', 'graphql',
+    'rest api', 'microservices', 'ci/cd', 'jenkins', 'terraform', 'azure'
+)
+
+# Shared by every basic analysis
+ALIGNED_RECOMMENDATIONS = freeze([
+    "Your skills align well with the job requirements",
+    "Continue building experience in your current areas",
+    "Stay updated with industry trends"
+])
+
+# Long-key reply format, used with WIRE_FORMAT=verbose
+SKILL_GAP_JSON_FORMAT = """Provide a detailed skill gap analysis in the following JSON format:
+{
+    "matching_skills": ["skill1", "skill2", ...],
+    "missing_skills": ["skill1", "skill2", ...],
+    "partially_matched_skills": ["skill1", "skill2", ...],
+    "skill_gap_score": 75,
+    "recommendations": [
+        "Specific recommendation 1",
+        "Specific recommendation 2",
+        ...
+    ],
+    "learning_resources": [
+        {
+            "skill": "Python",
+            "resources": ["Coursera Python Course", "Real Python tutorials"],
+            "priority": "high"
+        },
+        ...
+    ],
+    "experience_gap": {
+        "years_required": 5,
+        "years_you_have": 3,
+        "gap": "2 years",
+        "advice": "Focus on building projects that demonstrate advanced skills"
+    },
+    "summary": "Brief summary of the overall fit and what needs improvement"
+}"""
+
+
+def _skill_key(skill):
+    """Normalized tokens of a skill name ('REST APIs' -> 'rest api', 'C++' -> 'c++')"""
+    return ' '.join(tokenize(skill))
+
+
+def _skill_matches(skill_key, user_skill_keys):
+    """
+    True if a normalized skill is one of the user's, or a whole-word phrase of one
+    ('react' matches 'react native'); skills of one or two letters (C, R, Go) only match exactly
+    """
+    for user_key in user_skill_keys:
+        if skill_key == user_key:
+            return True
+        shorter, longer = sorted((skill_key, user_key), key=len)
+        if len(shorter) > 2 and f" {shorter} " in f" {longer} ":
+            return True
+    return False
 
 
 class SkillGapAnalyzer:
     """Analyze skill gaps between user profile and job requirements"""
     
     def __init__(self):
-        api_key = os.getenv('GEMINI_API_KEY')
-        if api_key:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-2.0-flash')
-            self.use_ai = True
-        else:
-            self.use_ai = False
+        self.llm = get_llm_client()
+        self.use_ai = self.llm.available
+        if not self.use_ai:
             print("Warning: GEMINI_API_KEY not found. Using basic skill matching.")
     
     def analyze_skill_gap(self, profile_data, job_description):
@@ -32,23 +102,165 @@ class SkillGapAnalyzer:
             job_description (str): Job description text
             
         Returns:
-            dict: Skill gap analysis with recommendations
+            SkillGapResult: Skill gap analysis with recommendations
         """
         if self.use_ai:
             return self._analyze_with_ai(profile_data, job_description)
         else:
             return self._basic_skill_analysis(profile_data, job_description)
     
+    async def analyze_skill_gap_async(self, profile_data, job_description, instant=False):
+        """
+        Async version of analyze_skill_gap for the async/ASGI endpoints
+        
+        With instant=True the keyword-based analysis is returned without calling Gemini.
+        """
+        if instant or not self.use_ai:
+            return self._basic_skill_analysis(profile_data, job_description)
+        
+        try:
+            prompt = self._create_prompt(profile_data, job_description)
+            result_text = await self.llm.generate_async(prompt, endpoint='skill_gap',
+                                                      response_schema=SkillGapResult.response_schema())
+            return self._parse_ai_response(result_text)
+        except Exception as e:
+            print(f"AI analysis failed: {e}")
+            return self._basic_skill_analysis(profile_data, job_description)
+    
+    def compare_job_descriptions(self, profile_data, job_descriptions, ai_top=SKILL_GAP_BATCH_AI_TOP):
+        """
+        Rank many job descriptions against one profile (see compare_job_descriptions_async)
+        """
+        return asyncio.run(self.compare_job_descriptions_async(profile_data, job_descriptions, ai_top))
+    
+    async def compare_job_descriptions_async(self, profile_data, job_descriptions, ai_top=SKILL_GAP_BATCH_AI_TOP):
+        """
+        Rank many job descriptions against one profile and analyze the best few with Gemini
+        
+        The profile is formatted and tokenized once; every posting is scored locally from its
+        cached requirements, then the ai_top best are sent to Gemini concurrently.
+        
+        Args:
+            profile_data (dict): User's profile data from LinkedIn
+            job_descriptions (list): Job description texts
+            ai_top (int): Best-ranked postings to analyze with Gemini (0 for none)
+            
+        Returns:
+            list: One comparison row per posting, best match first; the top rows carry a
+                SkillGapResult under 'analysis'
+        """
+        profile_summary = self._format_profile(profile_data)
+        ranking = self._rank_job_descriptions(profile_data, job_descriptions, profile_summary)
+        top = ranking[:max(0, ai_top)] if self.use_ai else []
+        
+        async def analyze(row):
+            job_description = job_descriptions[row['index']]
+            try:
+                prompt = self._create_prompt(profile_data, job_description, profile_summary)
+                result_text = await self.llm.generate_async(prompt, endpoint='skill_gap',
+                                                          response_schema=SkillGapResult.response_schema())
+                row['analysis'] = self._parse_ai_response(result_text)
+                count('app_skill_gap_batch_total', outcome='ai')
+            except Exception as e:
+                print(f"AI analysis failed for job description {row['index']}: {e}")
+                row['analysis'] = self._basic_skill_analysis(profile_data, job_description)
+                count('app_skill_gap_batch_total', outcome='ai_failed')
+        
+        await asyncio.gather(*(analyze(row) for row in top))
+        return ranking
+    
+    @timed('batch_rank')
+    def _rank_job_descriptions(self, profile_data, job_descriptions, profile_summary):
+        """Score every posting locally against the profile; rows sorted by match_score"""
+        cache = get_jd_cache()
+        requirements = [cache.get(job_description) for job_description in job_descriptions]
+        
+        # Keyword coverage of each posting, with the profile tokenized once
+        experience_text = '\n'.join(exp.get('description', '') for exp in profile_data.get('experience', []))
+        profile_text = f"{profile_summary}\n{profile_data.get('about', '')}\n{experience_text}"
+        keyword_scores = get_keyword_matcher().score_many(profile_text, job_descriptions,
+                                                          keywords=[req.keywords for req in requirements])
+        
+        user_skills = [_skill_key(skill) for skill in profile_data.get('skills', []) if skill]
+        ranking = []
+        for index, (req, keyword_score) in enumerate(zip(requirements, keyword_scores)):
+            matching_skills = []
+            missing_skills = []
+            for skill in req.required_skills:
+                if _skill_matches(_skill_key(skill), user_skills):
+                    matching_skills.append(skill)
+                else:
+                    missing_skills.append(skill)
+            
+            if req.required_skills:
+                skill_score = int(round(100 * len(matching_skills) / len(req.required_skills)))
+                match_score = int(round((skill_score + keyword_score['score']) / 2))
+            else:
+                skill_score = None
+                match_score = keyword_score['score']
+            
+            ranking.append({
+                'index': index,
+                'fingerprint': req.fingerprint,
+                'role_title': req.role_title,
+                'company': req.company,
+                'seniority': req.seniority,
+                'years_required': req.years_required,
+                'match_score': match_score,
+                'skill_score': skill_score,
+                'keyword_score': keyword_score['score'],
+                'matching_skills': matching_skills,
+                'missing_skills': missing_skills,
+                'missing_keywords': keyword_score['missing_keywords'][:10],
+                'analysis': None
+            })
+        
+        ranking.sort(key=lambda row: (-row['match_score'], row['index']))
+        for rank, row in enumerate(ranking, 1):
+            row['rank'] = rank
+        count('app_skill_gap_batch_total', outcome='ranked', amount=len(ranking))
+        return ranking
+    
     def _analyze_with_ai(self, profile_data, job_description):
         """Use Gemini AI to perform intelligent skill gap analysis"""
         
         try:
-            # Prepare profile summary
-            user_skills = profile_data.get('skills', [])
-            experiences = profile_data.get('experience', [])
-            education = profile_data.get('education', [])
-            
-            profile_summary = f"""
+            prompt = self._create_prompt(profile_data, job_description)
+            result_text = self.llm.generate(prompt, endpoint='skill_gap', response_schema=SkillGapResult.response_schema())
+            return self._parse_ai_response(result_text)
+                
+        except Exception as e:
+            print(f"AI analysis failed: {e}")
+            # Fallback to basic analysis
+            return self._basic_skill_analysis(profile_data, job_description)
+    
+    def _create_prompt(self, profile_data, job_description, profile_summary=None):
+        """Build the skill gap prompt within the token budget"""
+        if profile_summary is None:
+            profile_summary = self._format_profile(profile_data)
+        
+        builder = PromptBuilder('skill_gap')
+        builder.add("""
+You are a career development expert. Analyze the skill gap between this user's profile and the job requirements.
+""")
+        builder.add(profile_summary, priority=HIGH, min_tokens=100)
+        builder.add(f"About:\n{profile_data.get('about', 'N/A')}\n", priority=LOW, compact=True, min_tokens=30)
+        builder.add(job_description_prompt(job_description), priority=MEDIUM, compact=True, min_tokens=200)
+        response_format = SKILL_GAP_WIRE.describe() if compact_wire() else SKILL_GAP_JSON_FORMAT
+        builder.add(f"""
+{response_format}
+
+Be specific, actionable, and honest in your analysis. Focus on skills explicitly mentioned in the job description.
+""")
+        return builder.build()
+    
+    def _format_profile(self, profile_data):
+        """Profile summary block of the prompt"""
+        user_skills = profile_data.get('skills', [])
+        experiences = profile_data.get('experience', [])
+        education = profile_data.get('education', [])
+        
+        return f"""
 USER PROFILE:
 Name: {profile_data.get('name', 'N/A')}
 Headline: {profile_data.get('headline', 'N/A')}
@@ -60,90 +272,22 @@ Experience:
 
 Education:
 {self._format_education(education)}
-
-About:
-{profile_data.get('about', 'N/A')}
-"""
-            
-            prompt = f"""
-You are a career development expert. Analyze the skill gap between this user's profile and the job requirements.
-
-{profile_summary}
-
-JOB DESCRIPTION:
-{job_description}
-
-Provide a detailed skill gap analysis in the following JSON format:
-{{
-    "matching_skills": ["skill1", "skill2", ...],
-    "missing_skills": ["skill1", "skill2", ...],
-    "partially_matched_skills": ["skill1", "skill2", ...],
-    "skill_gap_score": 75,
-    "recommendations": [
-        "Specific recommendation 1",
-        "Specific recommendation 2",
-        ...
-    ],
-    "learning_resources": [
-        {{
-            "skill": "Python",
-            "resources": ["Coursera Python Course", "Real Python tutorials"],
-            "priority": "high"
-        }},
-        ...
-    ],
-    "experience_gap": {{
-        "years_required": 5,
-        "years_you_have": 3,
-        "gap": "2 years",
-        "advice": "Focus on building projects that demonstrate advanced skills"
-    }},
-    "summary": "Brief summary of the overall fit and what needs improvement"
-}}
-
-Be specific, actionable, and honest in your analysis. Focus on skills explicitly mentioned in the job description.
 """
-            
-            response = self.model.generate_content(prompt)
-            result_text = response.text.strip()
-            
-            # Extract JSON from response
-            json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
-            if json_match:
-                import json
-                analysis = json.loads(json_match.group())
-                return {
-                    'success': True,
-                    'analysis': analysis,
-                    'method': 'ai'
-                }
-            else:
-                raise ValueError("Could not parse AI response")
-                
-        except Exception as e:
-            print(f"AI analysis failed: {e}")
-            # Fallback to basic analysis
-            return self._basic_skill_analysis(profile_data, job_description)
     
+    def _parse_ai_response(self, result_text):
+        """Extract the JSON analysis from a Gemini response"""
+        return SkillGapResult.from_llm(result_text, 'skill_gap')
+    
+    @timed('fallback')
     def _basic_skill_analysis(self, profile_data, job_description):
         """Fallback: Basic keyword matching for skill analysis"""
         
         user_skills = [s.lower() for s in profile_data.get('skills', [])]
         job_desc_lower = job_description.lower()
         
-        # Common tech skills and keywords
-        common_skills = [
-            'python', 'java', 'javascript', 'react', 'node.js', 'sql', 'aws',
-            'docker', 'kubernetes', 'git', 'agile', 'scrum', 'machine learning',
-            'data analysis', 'project management', 'leadership', 'communication',
-            'problem solving', 'teamwork', 'css', 'html', 'typescript', 'angular',
-            'vue', 'django', 'flask', 'mongodb', 'postgresql', 'redis', 'graphql',
-            'rest api', 'microservices', 'ci/cd', 'jenkins', 'terraform', 'azure'
-        ]
-        
         # Find skills mentioned in job description
         required_skills = []
-        for skill in common_skills:
+        for skill in COMMON_SKILLS:
             if skill in job_desc_lower:
                 required_skills.append(skill)
         
@@ -182,30 +326,23 @@ Be specific, actionable, and honest in your analysis. Focus on skills explicitly
                 'priority': 'high' if skill in missing_skills[:3] else 'medium'
             })
         
-        return {
-            'success': True,
-            'analysis': {
-                'matching_skills': matching_skills,
-                'missing_skills': missing_skills,
-                'partially_matched_skills': [],
-                'skill_gap_score': score,  # Use full 0-100 range
-                'recommendations': recommendations if recommendations else [
-                    "Your skills align well with the job requirements",
-                    "Continue building experience in your current areas",
-                    "Stay updated with industry trends"
-                ],
-                'learning_resources': learning_resources,
-                'experience_gap': {
-                    'years_required': 'Not specified',
-                    'years_you_have': len(profile_data.get('experience', [])),
-                    'gap': 'Unknown',
-                    'advice': 'Focus on quality of experience over quantity'
-                },
-                'summary': f"You match {len(matching_skills)} out of {len(required_skills)} key skills. " + 
-                          ("Strong candidate!" if score >= 70 else "Focus on bridging skill gaps.")
+        return SkillGapResult(
+            method='basic',
+            matching_skills=matching_skills,
+            missing_skills=missing_skills,
+            partially_matched_skills=[],
+            skill_gap_score=score,  # Use full 0-100 range
+            recommendations=recommendations or ALIGNED_RECOMMENDATIONS,
+            learning_resources=learning_resources,
+            experience_gap={
+                'years_required': 'Not specified',
+                'years_you_have': len(profile_data.get('experience', [])),
+                'gap': 'Unknown',
+                'advice': 'Focus on quality of experience over quantity'
             },
-            'method': 'basic'
-        }
+            summary=f"You match {len(matching_skills)} out of {len(required_skills)} key skills. " +
+                    ("Strong candidate!" if score >= 70 else "Focus on bridging skill gaps.")
+        )
     
     def _format_experiences(self, experiences):
         """Format experience list for prompt"""
@@ -263,5 +400,19 @@ if __name__ == "__main__":
     
     result = analyzer.analyze_skill_gap(test_profile, test_job)
     
-    import json
-    print(json.dumps(result, indent=2))
+    print(json.dumps(result.to_json(), indent=2))
+    
+    saved_jobs = [test_job, """
+    Frontend Engineer at Pixel Labs
+    Requirements:
+    - 2+ years building web apps with React and TypeScript
+    - CSS, HTML and REST API experience
+    """, """
+    Data Engineer
+    Requirements:
+    - Spark, Airflow and Kafka pipelines on Azure
+    - Terraform and Kubernetes
+    """]
+    for row in analyzer.compare_job_descriptions(test_profile, saved_jobs, ai_top=0):
+        print(f"#{row['rank']} {row['role_title'] or 'Untitled'}: {row['match_score']} "
+              f"(missing {', '.join(row['missing_skills'][:5]) or 'nothing'})")
@@ -0,0 +1,394 @@
+"""
+Storage
+Lifecycle management for generated PDFs: a metadata index, per-file TTL, a total-size
+quota with least-recently-used eviction and a background sweeper, over a pluggable backend
+
+Backends:
+    local   Files in STORAGE_DIR (default generated_resumes/)
+    memory  In-process object-store stand-in (tests, benchmarks, read-only hosts)
+
+Each process keeps its own index. The local backend's index is rebuilt from the
+directory at startup, so files left by earlier runs are expired too, and a file another
+worker wrote is indexed on its first download.
+"""
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+from instrumentation import count
+
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'local')
+STORAGE_DIR = os.getenv('STORAGE_DIR', 'generated_resumes')
+# Seconds a file stays downloadable after it was written
+STORAGE_TTL = int(os.getenv('STORAGE_TTL', '86400'))
+# Total size kept before the least recently used files are evicted
+STORAGE_QUOTA_MB = float(os.getenv('STORAGE_QUOTA_MB', '500'))
+STORAGE_SWEEP_INTERVAL = int(os.getenv('STORAGE_SWEEP_INTERVAL', '300'))
+
+# File name prefixes the generators use, to label files indexed from an earlier run
+KNOWN_KINDS = ('cover_letter', 'resume')
+
+
+class StorageBackend:
+    """Interface for where file bytes live; names are flat (no directories)"""
+
+    def write(self, name, data):
+        """Store data (bytes) under name, replacing any existing file"""
+        raise NotImplementedError
+
+    def open(self, name):
+        """
+        Returns:
+            str or file-like object that Flask's send_file accepts, or None if missing
+        """
+        raise NotImplementedError
+
+    def delete(self, name):
+        """Remove a file; missing files are ignored"""
+        raise NotImplementedError
+
+    def list(self):
+        """
+        Returns:
+            list: (name, size in bytes, modified time as epoch seconds) per stored file
+        """
+        raise NotImplementedError
+
+    def stat(self, name):
+        """
+        Returns:
+            tuple: (size in bytes, modified time as epoch seconds), or None if missing
+        """
+        raise NotImplementedError
+
+
+class LocalDirectoryBackend(StorageBackend):
+    """Files in a local directory"""
+
+    def __init__(self, root=STORAGE_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    def write(self, name, data):
+        # Written under a temporary name and renamed so a download never sees half a file
+        path = self._path(name)
+        partial = f"{path}.partial"
+        with open(partial, 'wb') as f:
+            f.write(data)
+        os.replace(partial, path)
+
+    def open(self, name):
+        path = self._path(name)
+        return os.path.abspath(path) if os.path.isfile(path) else None
+
+    def delete(self, name):
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+    def list(self):
+        files = []
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                # Skips .gitkeep and interrupted .partial writes
+                if entry.is_file() and not entry.name.startswith('.') and not entry.name.endswith('.partial'):
+                    stat = entry.stat()
+                    files.append((entry.name, stat.st_size, stat.st_mtime))
+        return files
+
+    def stat(self, name):
+        try:
+            stat = os.stat(self._path(name))
+        except FileNotFoundError:
+            return None
+        return stat.st_size, stat.st_mtime
+
+
+class MemoryBackend(StorageBackend):
+    """Object-store stand-in that keeps file bytes in memory"""
+
+    def __init__(self):
+        self._objects = {}
+        self._lock = threading.Lock()
+
+    def write(self, name, data):
+        with self._lock:
+            self._objects[name] = (bytes(data), time.time())
+
+    def open(self, name):
+        with self._lock:
+            stored = self._objects.get(name)
+        return io.BytesIO(stored[0]) if stored else None
+
+    def delete(self, name):
+        with self._lock:
+            self._objects.pop(name, None)
+
+    def list(self):
+        with self._lock:
+            return [(name, len(data), modified) for name, (data, modified) in self._objects.items()]
+
+    def stat(self, name):
+        with self._lock:
+            stored = self._objects.get(name)
+        return (len(stored[0]), stored[1]) if stored else None
+
+
+BACKENDS = {
+    'local': LocalDirectoryBackend,
+    'memory': MemoryBackend
+}
+
+
+class StoredFile:
+    """Index entry for one stored file"""
+
+    __slots__ = ('name', 'size', 'kind', 'created', 'expires', 'last_access')
+
+    def __init__(self, name, size, kind, created, expires):
+        self.name = name
+        self.size = size
+        self.kind = kind
+        self.created = created
+        self.expires = expires
+        self.last_access = created
+
+    def to_json(self):
+        return {'name': self.name, 'size': self.size, 'kind': self.kind, 'created': self.created,
+                'expires': self.expires, 'last_access': self.last_access}
+
+
+class FileStore:
+    """Indexed storage with TTL expiry and a size quota enforced by LRU eviction"""
+
+    def __init__(self, backend=None, ttl=STORAGE_TTL, quota_bytes=int(STORAGE_QUOTA_MB * 1024 * 1024)):
+        """
+        Args:
+            backend (StorageBackend): Where bytes are kept (defaults to STORAGE_BACKEND)
+            ttl (int): Seconds a file is kept after it is written
+            quota_bytes (int): Total size kept before LRU eviction
+        """
+        self.backend = backend or BACKENDS[STORAGE_BACKEND]()
+        self.ttl = ttl
+        self.quota_bytes = quota_bytes
+        # Least recently used first
+        self._index = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._sweeper = None
+        self._stop = threading.Event()
+        self._load_index()
+
+    def _load_index(self):
+        """Index files already in the backend, oldest first, with TTLs from their mtime"""
+        for name, size, modified in sorted(self.backend.list(), key=lambda item: item[2]):
+            self._add(self._unindexed_record(name, size, modified))
+
+    def _unindexed_record(self, name, size, modified):
+        """Index entry for a file this process did not write, kind guessed from its name"""
+        kind = next((prefix for prefix in KNOWN_KINDS if name.startswith(prefix)), None)
+        return StoredFile(name, size, kind, modified, modified + self.ttl)
+
+    def _add(self, record):
+        """Insert or replace an index entry (caller holds the lock or is the constructor)"""
+        previous = self._index.pop(record.name, None)
+        if previous:
+            self._total_bytes -= previous.size
+        self._index[record.name] = record
+        self._total_bytes += record.size
+
+    def save(self, name, data, kind=None, ttl=None):
+        """
+        Store a generated file and evict others if the quota is exceeded
+
+        Args:
+            name (str): File name (no directories)
+            data (bytes): File contents
+            kind (str): Label for the index ('resume', 'cover_letter', ...)
+            ttl (int): Seconds to keep this file (defaults to the store's TTL)
+
+        Returns:
+            str: The file name
+        """
+        if os.path.basename(name) != name:
+            raise ValueError(f"Invalid file name: {name!r}")
+        self.backend.write(name, data)
+        now = time.time()
+        with self._lock:
+            self._add(StoredFile(name, len(data), kind, now, now + (self.ttl if ttl is None else ttl)))
+            evicted = self._evict_over_quota(keep=name)
+        self._delete(evicted, 'quota')
+        return name
+
+    def open(self, name):
+        """
+        Fetch a stored file for download and mark it recently used
+
+        Returns:
+            str or file-like object for send_file, or None if unknown or expired
+        """
+        if name not in self._index and not self._adopt(name):
+            return None
+        with self._lock:
+            record = self._index.get(name)
+            if record is None:
+                return None
+            now = time.time()
+            if record.expires <= now:
+                self._remove(record)
+                expired = [record]
+            else:
+                record.last_access = now
+                self._index.move_to_end(name)
+                expired = None
+        if expired:
+            self._delete(expired, 'ttl')
+            return None
+        return self.backend.open(name)
+
+    def _adopt(self, name):
+        """
+        Index a file another worker wrote (each process has its own index)
+
+        Returns:
+            bool: True if the backend has the file
+        """
+        # Same names list() skips: dotfiles and interrupted .partial writes
+        listed = os.path.basename(name) == name and not name.startswith('.') and not name.endswith('.partial')
+        found = self.backend.stat(name) if listed else None
+        if found is None:
+            return False
+        with self._lock:
+            if name not in self._index:
+                self._add(self._unindexed_record(name, *found))
+                evicted = self._evict_over_quota(keep=name)
+            else:
+                evicted = []
+        self._delete(evicted, 'quota')
+        return True
+
+    def delete(self, name):
+        """Remove a file and its index entry"""
+        with self._lock:
+            record = self._index.get(name)
+            if record:
+                self._remove(record)
+        if record:
+            self.backend.delete(name)
+
+    def sweep(self):
+        """
+        Delete expired files, then evict least recently used files over the quota
+
+        Returns:
+            int: Number of files removed
+        """
+        now = time.time()
+        with self._lock:
+            expired = [record for record in self._index.values() if record.expires <= now]
+            for record in expired:
+                self._remove(record)
+            evicted = self._evict_over_quota()
+        self._delete(expired, 'ttl')
+        self._delete(evicted, 'quota')
+        return len(expired) + len(evicted)
+
+    def _remove(self, record):
+        """Drop an index entry (caller holds the lock)"""
+        del self._index[record.name]
+        self._total_bytes -= record.size
+
+    def _evict_over_quota(self, keep=None):
+        """Remove LRU entries until the total fits the quota (caller holds the lock)"""
+        evicted = []
+        for record in list(self._index.values()):
+            if self._total_bytes <= self.quota_bytes:
+                break
+            if record.name != keep:
+                self._remove(record)
+                evicted.append(record)
+        return evicted
+
+    def _delete(self, records, reason):
+        """Delete evicted files from the backend outside the lock"""
+        for record in records:
+            self.backend.delete(record.name)
+            count('app_storage_evictions_total', kind=record.kind or 'unknown', reason=reason)
+
+    def start_sweeper(self, interval=STORAGE_SWEEP_INTERVAL):
+        """Run sweep() every interval seconds on a daemon thread (idempotent)"""
+        with self._lock:
+            if self._sweeper is not None:
+                return
+            self._sweeper = threading.Thread(target=self._sweep_loop, args=(interval,), name='storage-sweeper', daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        """Stop the sweeper thread, if running"""
+        self._stop.set()
+
+    def _sweep_loop(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                removed = self.sweep()
+                if removed:
+                    print(f"🧹 Storage sweep removed {removed} file(s)")
+            except Exception as e:
+                print(f"⚠️  Storage sweep failed: {str(e)}")
+
+    def stats(self):
+        """
+        Returns:
+            dict: File count, bytes used, quota and TTL
+        """
+        with self._lock:
+            return {
+                'backend': type(self.backend).__name__,
+                'files': len(self._index),
+                'bytes': self._total_bytes,
+                'quota_bytes': self.quota_bytes,
+                'ttl_seconds': self.ttl
+            }
+
+    def files(self):
+        """Index entries, least recently used first"""
+        with self._lock:
+            return [record.to_json() for record in self._index.values()]
+
+
+_default_store = None
+_store_lock = threading.Lock()
+
+
+def get_storage():
+    """Return the process-wide FileStore, starting its sweeper on first use"""
+    global _default_store
+    if _default_store is None:
+        with _store_lock:
+            if _default_store is None:
+                store = FileStore()
+                store.start_sweeper()
+                _default_store = store
+    return _default_store
+
+
+# Test
+if __name__ == "__main__":
+    store = FileStore(MemoryBackend(), ttl=60, quota_bytes=2500)
+    for i in range(4):
+        store.save(f"resume_modern_{i}.pdf", b'x' * 1000, kind='resume')
+        store.open('resume_modern_0.pdf')
+    print('After quota eviction:', [entry['name'] for entry in store.files()])
+
+    store.save('cover_letter_short.pdf', b'y' * 10, kind='cover_letter', ttl=0)
+    print('Expired file opens as:', store.open('cover_letter_short.pdf'))
+    print('Swept:', store.sweep(), store.stats())
+
+    other_worker = FileStore(store.backend, ttl=60, quota_bytes=2500)
+    store.save('resume_classic_9.pdf', b'z' * 10, kind='resume')
+    print('Written by another worker opens:', other_worker.open('resume_classic_9.pdf') is not None)
@@ -0,0 +1,154 @@
+"""
+Upgrades
+Two-tier responses: an analysis endpoint answers at once with its deterministic result and a
+pending_upgrade token, while the Gemini-backed result is computed in the background
+
+Send `"instant": true` in the request body. The response carries `pending_upgrade` and
+`upgrade_url`; poll GET /upgrades/<token> (202 while pending) or subscribe to
+GET /upgrades/<token>/events for a single Server-Sent Event when the upgrade finishes.
+"""
+import asyncio
+import os
+import threading
+import time
+import uuid
+from instrumentation import count, start_request
+from llm_scheduler import set_llm_context, current_tenant
+
+# Finished upgrades are kept this long (seconds) for clients to collect them
+UPGRADE_TTL = int(os.getenv('UPGRADE_TTL', '600'))
+# Seconds between SSE keep-alive comments while an upgrade is pending
+UPGRADE_KEEPALIVE = float(os.getenv('UPGRADE_KEEPALIVE', '15'))
+SSE_KEEPALIVE = ': keepalive\n\n'
+
+
+def wants_instant(data):
+    """True when a request body asks for the deterministic result first"""
+    value = data.get('instant')
+    if isinstance(value, str):
+        return value.lower() in ('1', 'true', 'yes')
+    return bool(value)
+
+
+def sse_message(data, event='upgrade'):
+    """Format one Server-Sent Event (data is already-encoded JSON on a single line)"""
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+class Upgrade:
+    """A background LLM run and the token clients use to collect it"""
+
+    __slots__ = ('token', 'name', 'created', 'future')
+
+    def __init__(self, token, name, future):
+        self.token = token
+        self.name = name
+        self.created = time.monotonic()
+        self.future = future
+
+    def response(self):
+        """
+        Body and HTTP status for a poll or SSE event
+
+        Returns:
+            tuple: (dict, int) -- 202 while pending; 200 once complete or failed
+        """
+        if not self.future.done():
+            return {'status': 'pending', 'token': self.token}, 202
+        try:
+            payload, status = self.future.result()
+        except Exception as e:
+            return {'status': 'failed', 'token': self.token, 'error': str(e)}, 200
+        return {'status': 'complete' if status < 400 else 'failed', 'token': self.token, 'result': payload}, 200
+
+
+class UpgradeStore:
+    """
+    Runs upgrades on one long-lived event loop thread and keeps their results for UPGRADE_TTL
+
+    Flask runs each async view on a loop that is closed when the view returns, so the
+    background work cannot live on the request's loop.
+    """
+
+    def __init__(self, ttl=UPGRADE_TTL):
+        self.ttl = ttl
+        self._upgrades = {}
+        self._lock = threading.Lock()
+        self._loop = None
+
+    def _event_loop(self):
+        """Start the background loop thread on first use"""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='upgrades', daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def start(self, handler, data):
+        """
+        Schedule a route handler to run in the background
+
+        Args:
+            handler: Async route handler returning (payload, status)
+            data (dict): Request body to run it with
+
+        Returns:
+            str: Token for polling the result
+        """
+        name = handler.__name__.replace('handle_', '', 1)
+        future = asyncio.run_coroutine_threadsafe(self._run(name, handler, data, current_tenant.get()),
+                                                  self._event_loop())
+        upgrade = Upgrade(uuid.uuid4().hex, name, future)
+        future.add_done_callback(lambda done: count('app_upgrades_total', feature=name, outcome=self._outcome(done)))
+        with self._lock:
+            self._expire()
+            self._upgrades[upgrade.token] = upgrade
+        count('app_upgrades_total', feature=name, outcome='started')
+        return upgrade.token
+
+    async def _run(self, name, handler, data, tenant):
+        """Run the handler with its stage timings labelled as an upgrade and its LLM calls in the background class"""
+        start_request(f"upgrade:{name}")
+        set_llm_context('background', tenant)
+        return await handler(data)
+
+    @staticmethod
+    def _outcome(future):
+        """Metric outcome of a finished upgrade future"""
+        if future.exception() is not None:
+            return 'failed'
+        return 'complete' if future.result()[1] < 400 else 'failed'
+
+    def get(self, token):
+        """
+        Returns:
+            Upgrade or None if the token is unknown or expired
+        """
+        with self._lock:
+            upgrade = self._upgrades.get(token)
+        if upgrade and upgrade.future.done() and time.monotonic() - upgrade.created > self.ttl:
+            return None
+        return upgrade
+
+    def _expire(self):
+        """Drop finished upgrades older than the TTL (caller holds the lock)"""
+        cutoff = time.monotonic() - self.ttl
+        expired = [token for token, upgrade in self._upgrades.items()
+                   if upgrade.created < cutoff and upgrade.future.done()]
+        for token in expired:
+            del self._upgrades[token]
+
+
+_default_store = None
+_store_lock = threading.Lock()
+
+
+def get_upgrade_store():
+    """Return the process-wide UpgradeStore"""
+    global _default_store
+    if _default_store is None:
+        with _store_lock:
+            if _default_store is None:
+                _default_store = UpgradeStore()
+    return _default_store
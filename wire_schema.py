@@ -0,0 +1,514 @@
+"""
+Wire Schema
+Compact reply formats for the analyzers. Gemini latency is dominated by output tokens, so
+the prompts ask for minified JSON with short keys, positional rows and one-letter codes,
+and the reply is expanded here into the documented response shape before validation.
+
+Expansion accepts the verbose shape too (unknown keys, dicts in place of rows and
+unknown codes pass through), so a model that ignores the compact format still parses.
+
+WIRE_FORMAT=verbose switches the prompts back to the long-key JSON examples.
+
+json_schema() turns the same declarations into the JSON Schema sent with JSON-mode
+requests, in whichever format the prompt asks for.
+"""
+import os
+
+WIRE_FORMAT = os.getenv('WIRE_FORMAT', 'compact')
+
+# Phrase every compact prompt starts with (the fake Gemini server keys on it)
+COMPACT_MARKER = 'COMPACT JSON'
+
+
+def compact_wire():
+    """True when prompts should ask for the compact format"""
+    return WIRE_FORMAT == 'compact'
+
+
+def _list_of_strings():
+    return {'type': 'array', 'items': {'type': 'string'}}
+
+
+class Field:
+    """One key: its short wire name, full response name, nested shape and a hint for the prompt"""
+
+    __slots__ = ('short', 'name', 'shape', 'hint', 'kind')
+
+    def __init__(self, short, name, shape=None, hint=None, kind=None):
+        """
+        Args:
+            kind (str): JSON Schema type of a scalar value; by default inferred from the
+                hint ('list ...' is a list of strings, 'integer'/'0-100' an integer) or string
+        """
+        self.short = short
+        self.name = name
+        self.shape = shape
+        self.hint = hint
+        self.kind = kind
+
+    def expand(self, value, legends):
+        return self.shape.expand(value, legends) if self.shape else value
+
+    def compact(self, value, legends):
+        return self.shape.compact(value, legends) if self.shape else value
+
+    def describe(self):
+        """Prompt text for the value: full name, shape and hint"""
+        parts = [self.name]
+        if self.shape:
+            parts.append(self.shape.describe())
+        if self.hint:
+            parts.append(f"({self.hint})")
+        return ' '.join(parts)
+
+    def schema(self, compact):
+        """JSON Schema for the value"""
+        if self.shape:
+            return self.shape.schema(compact)
+        if self.kind:
+            return {'type': self.kind}
+        hint = self.hint or ''
+        if hint.startswith('list'):
+            return _list_of_strings()
+        if 'integer' in hint or '0-100' in hint:
+            return {'type': 'integer'}
+        return {'type': 'string'}
+
+
+def _field(spec):
+    """Accept a Field or a bare name (for row positions)"""
+    return spec if isinstance(spec, Field) else Field(None, spec)
+
+
+class Obj:
+    """Object with short keys; a labelled one is described once and referred to by its label"""
+
+    def __init__(self, *fields, label=None):
+        self.fields = fields
+        self.label = label
+        self.by_short = {field.short: field for field in fields}
+        self.by_name = {field.name: field for field in fields}
+        # A short key that is another field's full name would make verbose replies ambiguous
+        clashes = [field.short for field in fields
+                   if field.short in self.by_name and self.by_name[field.short] is not field]
+        if clashes:
+            raise ValueError(f"Short keys clash with field names: {clashes}")
+
+    def expand(self, value, legends):
+        if not isinstance(value, dict):
+            return value
+        expanded = {}
+        for key, item in value.items():
+            field = self.by_short.get(key) or self.by_name.get(key)
+            if field is None:
+                expanded[key] = item
+            else:
+                expanded[field.name] = field.expand(item, legends)
+        return expanded
+
+    def compact(self, value, legends):
+        if not isinstance(value, dict):
+            return value
+        compacted = {}
+        for key, item in value.items():
+            field = self.by_name.get(key)
+            if field is None:
+                compacted[key] = item
+            else:
+                compacted[field.short] = field.compact(item, legends)
+        return compacted
+
+    def describe(self, inline=False):
+        if self.label and not inline:
+            return self.label
+        return '{' + ', '.join(f"{field.short}: {field.describe()}" for field in self.fields) + '}'
+
+    def schema(self, compact, inline=False):
+        if self.label and not inline:
+            return {'$ref': f"#/$defs/{self.label}"}
+        return {'type': 'object',
+                'properties': {field.short if compact else field.name: field.schema(compact) for field in self.fields}}
+
+
+class Each:
+    """List whose items share one shape"""
+
+    def __init__(self, shape):
+        self.shape = shape
+
+    def expand(self, value, legends):
+        if not isinstance(value, list):
+            return value
+        return [self.shape.expand(item, legends) for item in value]
+
+    def compact(self, value, legends):
+        if not isinstance(value, (list, tuple)):
+            return value
+        return [self.shape.compact(item, legends) for item in value]
+
+    def describe(self):
+        if getattr(self.shape, 'label', None):
+            return f"list of {self.shape.label}s"
+        return f"list of {self.shape.describe()}"
+
+    def schema(self, compact):
+        return {'type': 'array', 'items': self.shape.schema(compact)}
+
+
+class Row:
+    """Object sent as a positional list; trailing positions may be left out"""
+
+    def __init__(self, *fields):
+        self.fields = tuple(_field(spec) for spec in fields)
+        self.by_name = {field.name: field for field in self.fields}
+
+    def expand(self, value, legends):
+        if isinstance(value, dict):
+            return {key: self.by_name[key].expand(item, legends) if key in self.by_name else item
+                    for key, item in value.items()}
+        if not isinstance(value, list):
+            return value
+        return {field.name: field.expand(item, legends) for field, item in zip(self.fields, value)}
+
+    def compact(self, value, legends):
+        if not isinstance(value, dict):
+            return value
+        row = [field.compact(value.get(field.name), legends) for field in self.fields]
+        while row and row[-1] is None:
+            row.pop()
+        return row
+
+    def describe(self):
+        return 'row [' + ', '.join(field.describe() for field in self.fields) + ']'
+
+    def schema(self, compact):
+        if compact:
+            return {'type': 'array', 'prefixItems': [field.schema(compact) for field in self.fields]}
+        return {'type': 'object', 'properties': {field.name: field.schema(compact) for field in self.fields}}
+
+
+class Codes:
+    """Short codes for a fixed set of values ('H' -> 'Hard'); other values pass through"""
+
+    def __init__(self, values):
+        self.values = values
+        self.lookup = {code.lower(): value for code, value in values.items()}
+        self.codes = {value.lower(): code for code, value in values.items()}
+
+    def expand(self, value, legends):
+        if isinstance(value, str):
+            return self.lookup.get(value.lower(), value)
+        return value
+
+    def compact(self, value, legends):
+        if isinstance(value, str):
+            return self.codes.get(value.lower(), value)
+        return value
+
+    def describe(self):
+        return '(' + '|'.join(f"{code}={value}" for code, value in self.values.items()) + ')'
+
+    def schema(self, compact):
+        return {'type': 'string', 'enum': list(self.values if compact else self.values.values())}
+
+
+class Ref:
+    """Index into a top-level legend list, so repeated names are sent once"""
+
+    def __init__(self, legend):
+        self.legend = legend
+
+    def expand(self, value, legends):
+        entries = legends.get(self.legend)
+        if isinstance(value, int) and not isinstance(value, bool) and entries and 0 <= value < len(entries):
+            return entries[value]
+        return value
+
+    def compact(self, value, legends):
+        if not isinstance(value, str):
+            return value
+        entries = legends.setdefault(self.legend, [])
+        if value not in entries:
+            entries.append(value)
+        return entries.index(value)
+
+    def describe(self):
+        return f"(index into {self.legend})"
+
+    def schema(self, compact):
+        return {'type': 'integer' if compact else 'string'}
+
+
+class Numbered:
+    """Mapping with numbered keys ('year_1', 'year_2', ...) sent as a list, or keyed by number if sparse"""
+
+    def __init__(self, prefix, shape):
+        self.prefix = prefix
+        self.shape = shape
+
+    def expand(self, value, legends):
+        if isinstance(value, list):
+            return {f"{self.prefix}{index}": self.shape.expand(item, legends)
+                    for index, item in enumerate(value, 1)}
+        if isinstance(value, dict):
+            return {f"{self.prefix}{key}" if key.isdigit() else key: self.shape.expand(item, legends)
+                    for key, item in value.items()}
+        return value
+
+    def compact(self, value, legends):
+        if not isinstance(value, dict):
+            return value
+        numbered = {}
+        for key, item in value.items():
+            suffix = key[len(self.prefix):] if key.startswith(self.prefix) else ''
+            if not suffix.isdigit():
+                return value
+            numbered[int(suffix)] = self.shape.compact(item, legends)
+        if sorted(numbered) == list(range(1, len(numbered) + 1)):
+            return [numbered[number] for number in range(1, len(numbered) + 1)]
+        return {str(number): numbered[number] for number in sorted(numbered)}
+
+    def describe(self):
+        return f"list with one entry per {self.prefix.rstrip('_')} in order, each {self.shape.describe()}"
+
+    def schema(self, compact):
+        if compact:
+            return {'type': 'array', 'items': self.shape.schema(compact)}
+        return {'type': 'object', 'additionalProperties': self.shape.schema(compact)}
+
+
+class WireSchema:
+    """Compact reply format for one analyzer"""
+
+    def __init__(self, *fields, legends=None, shapes=()):
+        """
+        Args:
+            fields (Field): Top-level fields
+            legends (dict): Top-level legend lists referenced by Ref, mapped to a description
+            shapes (tuple): Labelled Obj shapes used by several fields, described once in the prompt
+        """
+        self.root = Obj(*fields)
+        self.legends = legends or {}
+        self.shapes = shapes
+
+    def expand(self, value):
+        """
+        Expand a compact reply into the full response shape
+
+        Args:
+            value (dict): Parsed reply (compact, verbose or a mix)
+
+        Returns:
+            dict: The reply with full key names
+        """
+        if not isinstance(value, dict):
+            return value
+        legends = {}
+        if self.legends:
+            value = dict(value)
+            for name in self.legends:
+                if isinstance(value.get(name), list):
+                    legends[name] = value.pop(name)
+        return self.root.expand(value, legends)
+
+    def compact(self, value):
+        """Inverse of expand: the compact form of a full response (for fixtures and benchmarks)"""
+        legends = {}
+        compacted = self.root.compact(value, legends)
+        return {**legends, **compacted} if legends else compacted
+
+    def describe(self, names=None):
+        """
+        Format instructions for a compact reply
+
+        Args:
+            names (iterable): Full names of the top-level fields to request (default: all)
+
+        Returns:
+            str: Prompt text listing each short key with its meaning
+        """
+        fields = [field for field in self.root.fields if names is None or field.name in names]
+        lines = [f"{COMPACT_MARKER}: reply with minified JSON (no spaces or line breaks) using these short keys. "
+                 "Rows are positional lists, letters in parentheses are codes, and optional fields "
+                 "you have nothing specific for are left out."]
+        described = self._describe_fields(fields)
+        lines.extend(f"{name}: {self.legends[name]}" for name in self._used_legends(described))
+        lines.extend(described)
+        return '\n'.join(lines)
+
+    def _used_shapes(self, fields):
+        """Labelled shapes the fields refer to"""
+        described = [field.describe() for field in fields]
+        return [shape for shape in self.shapes if any(shape.label in line for line in described)]
+
+    def _describe_fields(self, fields):
+        """Prompt lines for the fields, then for the labelled shapes they use"""
+        described = [f"{field.short}: {field.describe()}" for field in fields]
+        return described + [f"Each {shape.label} is {shape.describe(inline=True)}" for shape in self._used_shapes(fields)]
+
+    def _used_legends(self, described):
+        """Legends referenced by the described fields"""
+        text = ' '.join(described)
+        return [name for name in self.legends if f"index into {name}" in text]
+
+    def json_schema(self, names=None, required=()):
+        """
+        JSON Schema of the reply the prompt asks for (compact or verbose, per WIRE_FORMAT)
+
+        Args:
+            names (iterable): Full names of the top-level fields to request (default: all)
+            required (iterable): Full names of fields the reply must contain
+
+        Returns:
+            dict: Schema for structured-output requests
+        """
+        compact = compact_wire()
+        fields = [field for field in self.root.fields if names is None or field.name in names]
+        properties = {field.short if compact else field.name: field.schema(compact) for field in fields}
+        keys = [field.short if compact else field.name for field in fields if field.name in required]
+        if compact:
+            legends = self._used_legends(self._describe_fields(fields))
+            properties = {**{name: _list_of_strings() for name in legends}, **properties}
+            keys = legends + keys
+        schema = {'type': 'object', 'properties': properties, 'required': keys}
+        shapes = self._used_shapes(fields)
+        if shapes:
+            # Labelled shapes are defined once and referenced, which keeps the schema small
+            schema['$defs'] = {shape.label: shape.schema(compact, inline=True) for shape in shapes}
+        return schema
+
+
+DIFFICULTY = Codes({'E': 'Easy', 'M': 'Medium', 'H': 'Hard'})
+
+ATS_WIRE = WireSchema(
+    Field('o', 'overall_score', hint='integer 0-100, weighted average of the categories'),
+    Field('c', 'category_scores', Row(*(Field(None, name, kind='integer')
+                                        for name in ('formatting', 'keywords', 'experience', 'skills', 'education'))),
+          hint='integers 0-100'),
+    Field('s', 'strengths', hint='list of 3'),
+    Field('i', 'improvements', hint='list of 3 actionable suggestions'),
+    Field('m', 'missing_keywords', hint='list'),
+    Field('r', 'ats_friendly_rating', Codes({'E': 'Excellent', 'G': 'Good', 'F': 'Fair', 'P': 'Poor'}))
+)
+
+SKILL_GAP_WIRE = WireSchema(
+    Field('m', 'matching_skills', hint='list'),
+    Field('x', 'missing_skills', hint='list'),
+    Field('p', 'partially_matched_skills', hint='list'),
+    Field('g', 'skill_gap_score', hint='integer 0-100'),
+    Field('r', 'recommendations', hint='list of specific recommendations'),
+    Field('l', 'learning_resources',
+          Each(Row('skill', Field(None, 'resources', hint='list'),
+                   Field(None, 'priority', Codes({'h': 'high', 'm': 'medium', 'l': 'low'}))))),
+    Field('e', 'experience_gap', Row(Field(None, 'years_required', kind='integer'),
+                                     Field(None, 'years_you_have', kind='integer'),
+                                     Field(None, 'gap', hint='e.g. "2 years"'), 'advice')),
+    Field('s', 'summary', hint='brief summary of the overall fit and what needs improvement')
+)
+
+ROADMAP_ITEM = Each(Row('skill', Field(None, 'priority', Codes({'C': 'Critical', 'H': 'High', 'M': 'Medium'})),
+                        Field(None, 'learning_resources', hint='list'), 'estimated_time', 'reason'))
+
+CAREER_PATH_WIRE = WireSchema(
+    Field('lv', 'current_level', hint='Junior/Mid-level/Senior/Lead/Principal/Executive'),
+    Field('n', 'next_role_suggestions', Each(Obj(
+        Field('t', 'title'),
+        Field('tf', 'timeframe', hint='e.g. 1-2 years'),
+        Field('why', 'rationale'),
+        Field('rs', 'readiness_score', hint='0-100'),
+        Field('sk', 'required_skills', hint='list'),
+        Field('d', 'difficulty', DIFFICULTY)
+    )), hint='3-5 suggestions'),
+    Field('sr', 'skill_roadmap', Obj(
+        Field('now', 'immediate_focus', ROADMAP_ITEM),
+        Field('st', 'short_term', ROADMAP_ITEM, hint='next 6-12 months'),
+        Field('lt', 'long_term', ROADMAP_ITEM, hint='1-3 years')
+    )),
+    Field('tr', 'industry_trends', Obj(
+        Field('em', 'emerging_skills', hint='list'),
+        Field('dec', 'declining_skills', hint='list'),
+        Field('hot', 'hot_areas', hint='list'),
+        Field('dem', 'market_demand', hint='High/Medium/Low'),
+        Field('sal', 'salary_trends', hint='Growing/Stable/Declining'),
+        Field('rec', 'recommendations')
+    )),
+    Field('tl', 'career_timeline', Numbered('year_', Obj(
+        Field('f', 'focus'),
+        Field('p', 'target_position'),
+        Field('m', 'key_milestones', hint='list'),
+        Field('sk', 'skills_to_develop', hint='list'),
+        Field('$', 'expected_salary_range', hint='final year only')
+    ))),
+    Field('alt', 'alternative_paths', Each(Obj(
+        Field('p', 'path'),
+        Field('d', 'description'),
+        Field('pro', 'pros', hint='list'),
+        Field('con', 'cons', hint='list'),
+        Field('td', 'transition_difficulty', DIFFICULTY)
+    ))),
+    Field('cert', 'certifications', Each(Row('name', 'provider', Field(None, 'value', Codes({'H': 'High', 'M': 'Medium', 'L': 'Low'})),
+                                             Field(None, 'timeframe', hint='when to get it'), 'cost_estimate', 'roi'))),
+    Field('net', 'networking_strategy', Obj(
+        Field('who', 'target_connections'),
+        Field('pl', 'platforms', hint='list'),
+        Field('ev', 'events'),
+        Field('com', 'communities')
+    )),
+    Field('sum', 'summary', hint='2-3 sentences: career outlook and top recommendation')
+)
+
+QUESTION = Obj(
+    Field('q', 'question'),
+    Field('c', 'category', Ref('cat')),
+    Field('d', 'difficulty', DIFFICULTY),
+    Field('w', 'why_asking', hint='link to their resume'),
+    Field('k', 'key_points', hint='list'),
+    Field('s', 'star_template', Row('situation', 'task', 'action', 'result')),
+    Field('r', 'red_flags', hint='list'),
+    Field('f', 'follow_up_questions', hint='list'),
+    Field('g', 'good_answer_example'),
+    Field('tip', 'preparation_tip'),
+    Field('lf', 'likely_follow_ups', hint='list'),
+    Field('a', 'avoid', hint='list'),
+    Field('ap', 'good_approach'),
+    label='question'
+)
+
+INTERVIEW_WIRE = WireSchema(
+    Field('t', 'technical_questions', Each(QUESTION)),
+    Field('b', 'behavioral_questions', Each(QUESTION)),
+    Field('x', 'experience_based_questions', Each(QUESTION)),
+    Field('cu', 'company_culture_questions', Each(QUESTION)),
+    Field('si', 'situational_questions', Each(QUESTION)),
+    Field('wk', 'weakness_questions', Each(QUESTION)),
+    Field('ask', 'questions_to_ask_interviewer', Each(Obj(
+        Field('q', 'question'),
+        Field('w', 'why_effective'),
+        Field('c', 'category', Ref('cat'))
+    ))),
+    Field('st', 'overall_strategy', Obj(
+        Field('hi', 'strengths_to_highlight', hint='list'),
+        Field('con', 'potential_concerns', hint='list'),
+        Field('prep', 'preparation_priorities', hint='list'),
+        Field('res', 'company_research_checklist', hint='list')
+    )),
+    legends={'cat': 'list of the category names used (e.g. "System Design"); each item gives its category as an index into this list'},
+    shapes=(QUESTION,)
+)
+
+
+# Test
+if __name__ == "__main__":
+    import json
+    verbose = {
+        'technical_questions': [{'question': 'Design a rate limiter', 'category': 'System Design', 'difficulty': 'Hard',
+                                 'star_template': {'situation': 'S', 'task': 'T', 'action': 'A', 'result': 'R'}}],
+        'behavioral_questions': [{'question': 'Tell me about a conflict', 'category': 'Teamwork', 'difficulty': 'Medium'}],
+        'questions_to_ask_interviewer': [{'question': 'What does success look like?', 'category': 'Role Clarity'}]
+    }
+    compact = INTERVIEW_WIRE.compact(verbose)
+    print(json.dumps(compact, separators=(',', ':')))
+    print('Round trip OK:', INTERVIEW_WIRE.expand(compact) == verbose)
+    print('Verbose passes through:', INTERVIEW_WIRE.expand(verbose) == verbose)
+    print(INTERVIEW_WIRE.describe(['technical_questions']))
+    print(json.dumps(INTERVIEW_WIRE.json_schema(['technical_questions'], required=['technical_questions'])))